@@ -0,0 +1,96 @@
+"""
+Benchmark the column profiling used for dataset statistics against the previous per column implementation based
+on describe, on synthetic wide and tall frames. Figures are not created, only the column summaries are compared.
+
+Usage:
+    python -m benchmarks.bench_column_profiling [--repeat 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+from station.app.datasets.statistics import profile_columns
+
+
+def make_frame(n_rows: int, n_columns: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Synthetic clinical table, half of the columns are numeric with missing values and zeros, the other half are
+    categorical with a varying number of categories
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for i in range(n_columns):
+        if i % 2 == 0:
+            values = rng.normal(50, 10, n_rows).round(1)
+            values[rng.random(n_rows) < 0.05] = np.nan
+            values[rng.random(n_rows) < 0.02] = 0
+        else:
+            n_categories = [2, 5, 20, 200][i % 4]
+            values = rng.choice([f"c{j}" for j in range(n_categories)], n_rows)
+            values = pd.Series(values).where(rng.random(n_rows) > 0.05)
+        columns[f"feature_{i}"] = values
+    return pd.DataFrame(columns)
+
+
+def describe_columns(dataframe: pd.DataFrame) -> dict:
+    """
+    Column summaries as computed before, with one pass over the data per statistic and column
+    """
+    description = dataframe.describe(include="all")
+    profile = {}
+    for title in dataframe.columns:
+        column = {"count": description[title]["count"]}
+        column["nulls"] = dataframe[title].isna().sum()
+        if not is_numeric_dtype(dataframe[title]) or is_bool_dtype(dataframe[title]):
+            column["unique"] = description[title]["unique"]
+            column["top"] = description[title]["top"]
+            column["freq"] = description[title]["freq"]
+            if column["unique"] < 6:
+                column["value_counts"] = dict(dataframe[title].value_counts())
+        else:
+            column["zeros"] = dataframe[title][dataframe[title] == 0].count()
+            for key in ("mean", "std", "min", "max"):
+                column[key] = description[title][key]
+        profile[title] = column
+    return profile
+
+
+def measure(function, dataframe: pd.DataFrame, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(dataframe)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    shapes = {
+        "tall": (1_000_000, 10),
+        "medium": (50_000, 100),
+        "wide": (5_000, 1_000),
+        "very wide": (1_000, 5_000),
+    }
+    print(
+        f"{'frame':<10} {'shape':>16} {'describe':>10} {'profile':>10} {'speedup':>8}"
+    )
+    for name, (n_rows, n_columns) in shapes.items():
+        dataframe = make_frame(n_rows, n_columns)
+        baseline = measure(describe_columns, dataframe, args.repeat)
+        vectorized = measure(profile_columns, dataframe, args.repeat)
+        print(
+            f"{name:<10} {f'{n_rows} x {n_columns}':>16} {baseline:>9.3f}s "
+            f"{vectorized:>9.3f}s {baseline / vectorized:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark the latency of outbound requests against a local stub server. Compares module level requests calls, which
+open a new connection per request, with the pooled sessions and the async clients of the shared http layer. The stub
+adds a fixed delay to every response to simulate the processing time of a remote service.
+
+Usage:
+    python -m benchmarks.bench_http_clients [--requests 500] [--concurrency 20] [--delay 0.005]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Tuple
+
+import requests
+
+from station.common.clients.http import AsyncServiceClient, make_session
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog drops connections of concurrent clients
+    request_queue_size = 256
+
+
+def serve_stub(port: multiprocessing.Value, delay: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # headers and body are written separately, delayed acks would stall kept alive connections
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(delay)
+            body = b'{"status": "healthy"}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    port.value = server.server_address[1]
+    server.serve_forever()
+
+
+def start_stub_server(delay: float) -> Tuple[multiprocessing.Process, int]:
+    """
+    Run the stub in a separate process, so it does not compete with the clients for the interpreter lock
+    """
+    port = multiprocessing.Value("i", 0)
+    process = multiprocessing.Process(
+        target=serve_stub, args=(port, delay), daemon=True
+    )
+    process.start()
+    while not port.value:
+        time.sleep(0.01)
+    return process, port.value
+
+
+def measure_threads(
+    get: Callable[[str], None], url: str, n_requests: int, concurrency: int
+) -> List[float]:
+    def timed(_) -> float:
+        start = time.perf_counter()
+        get(url)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(timed, range(n_requests)))
+
+
+def measure_async(url: str, n_requests: int, concurrency: int) -> List[float]:
+    async def run() -> List[float]:
+        client = AsyncServiceClient(pool_size=concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed() -> float:
+            async with semaphore:
+                start = time.perf_counter()
+                r = await client.get(url)
+                r.raise_for_status()
+                return time.perf_counter() - start
+
+        try:
+            return await asyncio.gather(*(timed() for _ in range(n_requests)))
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+def report(name: str, latencies: List[float], total: float):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:<18} {p50:>8.2f}ms {p99:>8.2f}ms {len(latencies) / total:>10.0f}/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.005)
+    args = parser.parse_args()
+
+    server, port = start_stub_server(args.delay)
+    url = f"http://127.0.0.1:{port}/health"
+    session = make_session(pool_size=args.concurrency)
+
+    def unpooled(u: str):
+        requests.get(u).raise_for_status()
+
+    def pooled(u: str):
+        session.get(u).raise_for_status()
+
+    print(f"{'client':<18} {'p50':>10} {'p99':>10} {'throughput':>12}")
+    for name, get in (("requests.get", unpooled), ("pooled session", pooled)):
+        start = time.perf_counter()
+        latencies = measure_threads(get, url, args.requests, args.concurrency)
+        report(name, latencies, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    latencies = measure_async(url, args.requests, args.concurrency)
+    report("async client", latencies, time.perf_counter() - start)
+
+    session.close()
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,61 @@
-from io import BytesIO
 from typing import Any, List
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from fastapi.responses import StreamingResponse
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from loguru import logger
 from sqlalchemy.orm import Session
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 
 from station.app.api import dependencies
+from station.app.api.pagination import list_page
 from station.app.config import clients
 from station.app.crud import datasets
-from station.app.datasets import statistics
+from station.app.crud.crud_minio_objects import (
+    minio_objects,
+    object_prefix,
+    summarize_prefixes,
+)
+from station.app.crud.pagination import MAX_PAGE_SIZE, PAGE_SIZE
+from station.app.datasets import columnar, jobs, statistics, storage
+from station.app.object_index import list_dataset_files, object_index
+from station.app.response_cache import CachedRoute, cache_response
 from station.app.schemas.datasets import (
     DataSet,
     DataSetCreate,
+    DataSetFilesSummary,
+    DataSetSort,
     DataSetStatistics,
     DataSetUpdate,
+    DataType,
     MinioFile,
+    StatisticsJob,
+    StorageType,
+)
+from station.app.schemas.pagination import SortOrder
+from station.common.clients.minio.archive import ARCHIVE_MEDIA_TYPES
+from station.common.clients.minio.pagination import (
+    LIST_PAGE_SIZE,
+    MAX_LIST_PAGE_SIZE,
+    decode_continuation_token,
 )
-from station.common.constants import DataDirectories
+from station.common.clients.minio.shards import (
+    ShardIndex,
+    load_shard_index,
+    pack_dataset,
+)
+from station.common.constants import DATASET_DERIVED_DIRECTORIES, DataDirectories
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 
 @router.post("", response_model=DataSet)
@@ -53,12 +89,36 @@ def create_new_data_set(
 
 
 @router.get("", response_model=List[DataSet])
-def read_all_data_sets(db: Session = Depends(dependencies.get_db)) -> List[DataSet]:
-    all_datasets = datasets.get_multi(db=db, limit=None)
-    return all_datasets
+@cache_response(tags=("datasets",))
+def read_all_data_sets(
+    response: Response,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    continuation_token: str = None,
+    sort: DataSetSort = DataSetSort.created_at,
+    order: SortOrder = SortOrder.desc,
+    data_type: DataType = None,
+    storage_type: StorageType = None,
+    proposal_id: str = None,
+    db: Session = Depends(dependencies.get_db),
+) -> List[DataSet]:
+    return list_page(
+        datasets,
+        db,
+        response,
+        limit,
+        continuation_token,
+        sort=sort,
+        order=order,
+        filters={
+            "data_type": data_type,
+            "storage_type": storage_type,
+            "proposal_id": proposal_id,
+        },
+    )
 
 
 @router.get("/{data_set_id}", response_model=DataSet)
+@cache_response(tags=("datasets",))
 def get_data_set(
     data_set_id: Any, db: Session = Depends(dependencies.get_db)
 ) -> DataSet:
@@ -92,7 +152,7 @@ def delete_data_set(
     return db_data_set
 
 
-@router.post("/{dataset_id}/files")
+@router.post("/{dataset_id}/files", response_model=List[MinioFile])
 async def upload_data_set_file(
     dataset_id: str,
     files: List[UploadFile] = File(description="Multiple files as UploadFile"),
@@ -107,22 +167,130 @@ async def upload_data_set_file(
         if not file.filename:
             raise HTTPException(status_code=400, detail="No filename provided.")
 
-    # minio_client = MinioClient()
-    await clients.minio.save_dataset_files(db_dataset.id, files)
+    uploaded_files = await clients.minio.save_dataset_files(db_dataset.id, files)
+    minio_objects.add_files(db, DataDirectories.DATASETS.value, uploaded_files)
+    # sketches of overwritten files are outdated
+    datasets.remove_file_statistics(
+        db, db_dataset.id, [storage.dataset_file_path(file) for file in uploaded_files]
+    )
+    if db_dataset.data_type in {"hybrid", "structured"} and any(
+        statistics.is_tabular(file) for file in uploaded_files
+    ):
+        jobs.statistics_jobs.submit(db_dataset.id)
+    return uploaded_files
 
 
 @router.get("/{data_set_id}/files", response_model=List[MinioFile])
 async def get_data_set_files(
-    data_set_id: str, file_name: str = None, db: Session = Depends(dependencies.get_db)
+    data_set_id: str,
+    response: Response,
+    file_name: str = None,
+    prefix: str = None,
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=MAX_LIST_PAGE_SIZE),
+    continuation_token: str = None,
+    stream: bool = False,
+    db: Session = Depends(dependencies.get_db),
 ):
+    """
+    List the files of a dataset ordered by their names, page by page. If there are more files, the token to
+    request the next page is returned in the X-Continuation-Token header. With stream set, all files after the
+    continuation token are streamed as newline delimited json instead. The files are listed from the object index
+    once it is reconciled, otherwise from minio.
+    """
     db_dataset = datasets.get(db, data_set_id)
     if not db_dataset:
         raise HTTPException(status_code=404, detail=f"Dataset {data_set_id} not found.")
+    bucket = DataDirectories.DATASETS.value
+    derived = [
+        f"{data_set_id}/{directory}/" for directory in DATASET_DERIVED_DIRECTORIES
+    ]
+    use_index = object_index.is_ready(bucket)
 
-    items = clients.minio.get_minio_dir_items(DataDirectories.DATASETS, data_set_id)
+    # files are filtered by minio, the exact name is listed as prefix
     if file_name:
-        pass
-    return items
+        prefix = file_name
+
+    def matches(item: MinioFile) -> bool:
+        return not file_name or item.full_path == f"{data_set_id}/{file_name}"
+
+    if stream:
+        try:
+            start_after = (
+                decode_continuation_token(continuation_token, f"{data_set_id}/")
+                if continuation_token
+                else None
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        def iter_lines():
+            if use_index:
+                items = minio_objects.iter_files(
+                    db, bucket, data_set_id, prefix, start_after, derived
+                )
+            else:
+                items = clients.minio.iter_dataset_files(
+                    data_set_id, prefix, start_after
+                )
+            for item in items:
+                if matches(item):
+                    yield item.json() + "\n"
+
+        return StreamingResponse(
+            iterate_in_threadpool(iter_lines()), media_type="application/x-ndjson"
+        )
+
+    try:
+        if use_index:
+            items, next_token = minio_objects.list_page(
+                db,
+                bucket,
+                data_set_id,
+                limit,
+                continuation_token,
+                prefix,
+                exclude=derived,
+            )
+        else:
+            items, next_token = await run_in_threadpool(
+                clients.minio.list_dataset_files_page,
+                data_set_id,
+                limit,
+                continuation_token,
+                prefix,
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_token:
+        response.headers["X-Continuation-Token"] = next_token
+    return [item for item in items if matches(item)]
+
+
+@router.get("/{data_set_id}/files/summary", response_model=DataSetFilesSummary)
+def get_data_set_files_summary(
+    data_set_id: str, db: Session = Depends(dependencies.get_db)
+):
+    """
+    Get the number and size of the files of a dataset and of the classes given by its top level folders
+    """
+    db_dataset = datasets.get(db, data_set_id)
+    if not db_dataset:
+        raise HTTPException(status_code=404, detail=f"Dataset {data_set_id} not found.")
+    bucket = DataDirectories.DATASETS.value
+    if object_index.is_ready(bucket):
+        return minio_objects.get_summary(
+            db,
+            bucket,
+            data_set_id,
+            exclude=[
+                f"{data_set_id}/{directory}/"
+                for directory in DATASET_DERIVED_DIRECTORIES
+            ],
+        )
+    items = clients.minio.get_dataset_files(data_set_id)
+    return summarize_prefixes(
+        data_set_id, ((object_prefix(item.full_path), 1, item.size) for item in items)
+    )
 
 
 @router.delete("/{data_set_id}/files")
@@ -133,7 +301,18 @@ async def delete_file_from_dataset(
     if not db_dataset:
         raise HTTPException(status_code=404, detail=f"Dataset {data_set_id} not found.")
 
-    clients.minio.delete_file(DataDirectories.DATASETS.value, file_name)
+    object_name = file_name
+    if not object_name.startswith(f"{db_dataset.id}/"):
+        object_name = f"{db_dataset.id}/{file_name}"
+    clients.minio.delete_file(DataDirectories.DATASETS.value, object_name)
+    file_path = object_name.split("/", 1)[1]
+    storage.delete_columnar_copy(db_dataset.id, file_path)
+    minio_objects.remove_objects(
+        db,
+        DataDirectories.DATASETS.value,
+        [object_name, columnar.columnar_path(db_dataset.id, file_path)],
+    )
+    datasets.remove_file_statistics(db, db_dataset.id, [file_path])
 
 
 @router.get("/{data_set_id}/download", response_class=StreamingResponse)
@@ -145,70 +324,161 @@ async def download(
     db_dataset = datasets.get(db, data_set_id)
     if not db_dataset:
         raise HTTPException(status_code=404, detail="Dataset not found.")
-    items = clients.minio.get_minio_dir_items(DataDirectories.DATASETS, data_set_id)
+    if archive_type not in ARCHIVE_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown archive type {archive_type}."
+        )
+    items = await run_in_threadpool(list_dataset_files, db, data_set_id)
 
     if len(items) == 0:
         raise HTTPException(status_code=404, detail="No files found.")
     elif len(items) == 1:
-        data = clients.minio.get_file(
-            str(DataDirectories.DATASETS.value), items[0].full_path
+        content = clients.minio.stream_file(
+            DataDirectories.DATASETS.value, items[0].full_path
         )
-        obj = BytesIO(data)
-        return StreamingResponse(content=obj, media_type="application/octet-stream")
+        return StreamingResponse(content=content, media_type="application/octet-stream")
 
     else:
-        archive = clients.minio.make_dataset_archive(
+        archive = clients.minio.stream_dataset_archive(
             data_set_id, items=items, archive_type=archive_type
         )
-        return StreamingResponse(content=archive, media_type="application/zip")
+        return StreamingResponse(
+            content=archive, media_type=ARCHIVE_MEDIA_TYPES[archive_type]
+        )
 
 
-@router.get("/{data_set_id}/stats", response_model=DataSetStatistics)
+@router.post("/{data_set_id}/shards", status_code=202)
+def pack_data_set(
+    data_set_id: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(dependencies.get_db),
+):
+    """
+    Pack the files of a dataset into large tar shards in the background, training data loaders read the shards
+    sequentially instead of requesting every file
+    """
+    db_dataset = datasets.get(db, data_set_id)
+    if not db_dataset:
+        raise HTTPException(status_code=404, detail=f"Dataset {data_set_id} not found.")
+    background_tasks.add_task(pack_dataset, clients.minio, str(db_dataset.id))
+    return {"detail": f"Packing dataset {data_set_id}."}
+
+
+@router.get("/{data_set_id}/shards", response_model=ShardIndex)
+def get_data_set_shards(data_set_id: str, db: Session = Depends(dependencies.get_db)):
+    db_dataset = datasets.get(db, data_set_id)
+    if not db_dataset:
+        raise HTTPException(status_code=404, detail=f"Dataset {data_set_id} not found.")
+    index = load_shard_index(clients.minio, str(db_dataset.id))
+    if not index:
+        raise HTTPException(
+            status_code=404, detail=f"Dataset {data_set_id} is not packed."
+        )
+    return index
+
+
+@router.get(
+    "/{data_set_id}/stats",
+    response_model=DataSetStatistics,
+    responses={202: {"model": StatisticsJob}},
+)
 def get_data_set_statistics(
-    data_set_id: Any, file_name: str = None, db: Session = Depends(dependencies.get_db)
+    data_set_id: Any,
+    file_name: str = None,
+    partial: bool = False,
+    db: Session = Depends(dependencies.get_db),
 ):
+    """
+    Get the statistics of a dataset or a single file of it. If files need to be processed first, a background job
+    is started and its status is returned with status code 202. With partial set, the statistics of the already
+    processed files are returned while the job is running.
+    """
     db_dataset = datasets.get(db, data_set_id)
     if not db_dataset:
         raise HTTPException(status_code=404, detail="Dataset not found.")
 
-    items = clients.minio.get_minio_dir_items(DataDirectories.DATASETS, data_set_id)
+    items = list_dataset_files(db, data_set_id)
     if len(items) == 0 and not db_dataset.fhir_server:
         raise HTTPException(status_code=404, detail="No files found in the dataset.")
 
     if db_dataset.data_type in {"hybrid", "structured"}:
         if file_name:
-            items = [item for item in items if item.file_name == file_name]
+            items = [
+                item for item in items if storage.dataset_file_path(item) == file_name
+            ]
             if len(items) == 0:
                 raise HTTPException(
                     status_code=404, detail=f"File {file_name} not found."
                 )
 
-        try:
-            stats = statistics.load_stats(db_dataset.summary, file_name)
-            logger.info(f"Loaded stats for {file_name}")
-            return stats
-        except ValueError as e:
-            logger.info(
-                f"Could not load existing stats for {db_dataset.id} {file_name}. {e}"
-            )
-        try:
-            logger.info(f"Calculating stats for {db_dataset.id} {file_name}")
-            file_content = clients.minio.get_file(
-                DataDirectories.DATASETS, items[0].full_path
-            )
-            df = statistics.load_tabular(items[0], file_content)
-            stats = statistics.get_dataset_statistics(df)
-            datasets.add_stats(db, data_set_id, stats, items[0].file_name)
-            return stats
-
-        except TypeError:
+        items, outdated = jobs.split_outdated_files(
+            db, data_set_id, items, prune=not file_name
+        )
+        if len(items) == 0:
             raise HTTPException(
                 status_code=400,
-                detail=f"File {file_name} is not in a supported tabular format.",
+                detail=(
+                    f"File {file_name} is not in a supported tabular format."
+                    if file_name
+                    else "No tabular files found in the dataset."
+                ),
             )
 
+        if not outdated:
+            try:
+                stats = statistics.load_stats(db_dataset.summary, file_name)
+                logger.info(f"Loaded stats for {file_name}")
+                return stats
+            except ValueError as e:
+                logger.info(
+                    f"Could not load existing stats for {db_dataset.id} {file_name}. {e}"
+                )
+            # merging the stored sketches does not require to read any files
+            stats = jobs.get_merged_statistics(db, data_set_id, items)
+            datasets.add_stats(db, data_set_id, stats, file_name)
+            return stats
+
+        # a job that failed on the same files would fail again, its error is reported instead
+        failed = jobs.statistics_jobs.find_failed(
+            data_set_id, file_name, jobs.get_files_hash(items)
+        )
+        if failed:
+            raise HTTPException(status_code=422, detail=failed.error)
+
+        job = jobs.statistics_jobs.find_active(
+            data_set_id, file_name
+        ) or jobs.statistics_jobs.submit(data_set_id, file_name)
+        if partial and len(outdated) < len(items):
+            outdated_paths = {item.full_path for item in outdated}
+            processed = [item for item in items if item.full_path not in outdated_paths]
+            return jobs.get_merged_statistics(db, data_set_id, processed)
+        return JSONResponse(status_code=202, content=jsonable_encoder(job))
+
     else:
         raise HTTPException(
             status_code=400,
             detail=f"Data type {db_dataset.data_type} is not supported yet.",
         )
+
+
+@router.post("/{data_set_id}/stats/jobs", response_model=StatisticsJob, status_code=202)
+def start_data_set_statistics_job(
+    data_set_id: Any, file_name: str = None, db: Session = Depends(dependencies.get_db)
+):
+    db_dataset = datasets.get(db, data_set_id)
+    if not db_dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found.")
+    if db_dataset.data_type not in {"hybrid", "structured"}:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Data type {db_dataset.data_type} is not supported yet.",
+        )
+    return jobs.statistics_jobs.submit(db_dataset.id, file_name)
+
+
+@router.get("/{data_set_id}/stats/jobs/{job_id}", response_model=StatisticsJob)
+def get_data_set_statistics_job(data_set_id: Any, job_id: str):
+    job = jobs.statistics_jobs.get(job_id)
+    if not job or job.dataset_id != str(data_set_id):
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job
@@ -1,24 +1,40 @@
 from typing import List, Union
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from station.app.api import dependencies
-from station.app.crud.crud_docker_trains import docker_trains
+from station.app.api.pagination import list_page
+from station.app.crud.crud_docker_trains import (
+    CONFIG_RELATIONSHIPS,
+    TRAIN_RELATIONSHIPS,
+    docker_train_executions,
+    docker_trains,
+)
 from station.app.crud.crud_train_configs import docker_train_config
+from station.app.crud.pagination import MAX_PAGE_SIZE, PAGE_SIZE
+from station.app.response_cache import CachedRoute, cache_response
 from station.app.schemas.docker_trains import (
     DockerTrain,
     DockerTrainConfig,
     DockerTrainConfigCreate,
+    DockerTrainConfigSort,
     DockerTrainConfigUpdate,
     DockerTrainCreate,
     DockerTrainExecution,
+    DockerTrainExecutionSort,
     DockerTrainSavedExecution,
+    DockerTrainSort,
     DockerTrainState,
 )
+from station.app.schemas.pagination import SortOrder
 from station.app.trains.docker import airflow
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
+
+# tables the responses of the train endpoints are read from
+TRAIN_TABLES = ("docker_trains", "docker_train_states", "docker_train_configs")
+EXECUTION_TABLES = ("docker_trains", "docker_train_executions")
 
 
 @router.post("/sync", response_model=List[DockerTrain])
@@ -27,12 +43,32 @@ def synchronize_database(db: Session = Depends(dependencies.get_db)):
 
 
 @router.get("", response_model=List[DockerTrain])
-def get_available_trains(limit: int = 0, db: Session = Depends(dependencies.get_db)):
-    if limit != 0:
-        db_trains = docker_trains.get_multi(db, limit=limit)
-    else:
-        db_trains = docker_trains.get_multi(db)
-    return db_trains
+@cache_response(tags=TRAIN_TABLES)
+def get_available_trains(
+    response: Response,
+    # 0 selects the default page size
+    limit: int = Query(PAGE_SIZE, ge=0, le=MAX_PAGE_SIZE),
+    continuation_token: str = None,
+    sort: DockerTrainSort = DockerTrainSort.created_at,
+    order: SortOrder = SortOrder.desc,
+    is_active: bool = None,
+    proposal: str = None,
+    db: Session = Depends(dependencies.get_db),
+):
+    """
+    List the trains page by page, the token of the next page is returned in the X-Continuation-Token header
+    """
+    return list_page(
+        docker_trains,
+        db,
+        response,
+        limit or PAGE_SIZE,
+        continuation_token,
+        sort=sort,
+        order=order,
+        filters={"is_active": is_active, "proposal": proposal},
+        options=TRAIN_RELATIONSHIPS,
+    )
 
 
 @router.post("", response_model=DockerTrain)
@@ -49,13 +85,16 @@ def register_train(
 
 
 @router.get("/{train_id}", response_model=DockerTrain)
+@cache_response(tags=TRAIN_TABLES)
 def get_train_by_train_id(
     train_id: Union[int, str], db: Session = Depends(dependencies.get_db)
 ):
     if isinstance(train_id, str):
-        db_train = docker_trains.get_by_train_id(db, train_id)
+        db_train = docker_trains.get_by_train_id(
+            db, train_id, options=TRAIN_RELATIONSHIPS
+        )
     else:
-        db_train = docker_trains.get(db, id=train_id)
+        db_train = docker_trains.get(db, id=train_id, options=TRAIN_RELATIONSHIPS)
     if not db_train:
         raise HTTPException(
             status_code=404, detail=f"Train with id '{train_id}' not found."
@@ -106,6 +145,7 @@ def assign_config_to_docker_train(
 
 
 @router.get("/{train_id}/state", response_model=DockerTrainState)
+@cache_response(tags=TRAIN_TABLES)
 def get_state_for_train(train_id: str, db: Session = Depends(dependencies.get_db)):
     state = docker_trains.read_train_state(db, train_id)
     return state
@@ -120,11 +160,29 @@ def update_state_for_train(
 
 
 @router.get("/configs/all", response_model=List[DockerTrainConfig])
+@cache_response(tags=("docker_train_configs",))
 def get_all_docker_train_configs(
-    db: Session = Depends(dependencies.get_db), skip: int = 0, limit: int = 100
+    response: Response,
+    db: Session = Depends(dependencies.get_db),
+    skip: int = 0,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    continuation_token: str = None,
+    sort: DockerTrainConfigSort = DockerTrainConfigSort.created_at,
+    order: SortOrder = SortOrder.desc,
+    auto_execute: bool = None,
 ):
-    db_configs = docker_train_config.get_multi(db, skip=skip, limit=limit)
-    return db_configs
+    return list_page(
+        docker_train_config,
+        db,
+        response,
+        limit,
+        continuation_token,
+        skip,
+        sort=sort,
+        order=order,
+        filters={"auto_execute": auto_execute},
+        options=CONFIG_RELATIONSHIPS,
+    )
 
 
 @router.post("/config", response_model=DockerTrainConfig)
@@ -156,10 +214,11 @@ def update_docker_train_configuration(
 
 
 @router.get("/config/{config_id}", response_model=DockerTrainConfig)
+@cache_response(tags=("docker_train_configs",))
 def get_docker_train_configuration(
     config_id: int, db: Session = Depends(dependencies.get_db)
 ):
-    config = docker_train_config.get(db, config_id)
+    config = docker_train_config.get(db, config_id, options=CONFIG_RELATIONSHIPS)
     if not config:
         raise HTTPException(
             status_code=404, detail=f"Config with id '{config_id}' not found."
@@ -169,22 +228,53 @@ def get_docker_train_configuration(
 
 
 @router.get("/executions/all", response_model=List[DockerTrainSavedExecution])
+@cache_response(tags=EXECUTION_TABLES)
 def get_all_docker_train_executions(
-    skip: int = 0, limit: int = 100, db: Session = Depends(dependencies.get_db)
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    continuation_token: str = None,
+    sort: DockerTrainExecutionSort = DockerTrainExecutionSort.start,
+    order: SortOrder = SortOrder.desc,
+    config: int = None,
+    db: Session = Depends(dependencies.get_db),
 ):
-    db_executions = docker_trains.get_executions(db, skip=skip, limit=limit)
-    return db_executions
+    return list_page(
+        docker_train_executions,
+        db,
+        response,
+        limit,
+        continuation_token,
+        skip,
+        sort=sort,
+        order=order,
+        filters={"config": config},
+    )
 
 
 @router.get("/{train_id}/executions", response_model=List[DockerTrainSavedExecution])
+@cache_response(tags=EXECUTION_TABLES)
 def get_docker_train_executions(
     train_id: str,
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    continuation_token: str = None,
+    sort: DockerTrainExecutionSort = DockerTrainExecutionSort.start,
+    order: SortOrder = SortOrder.desc,
     db: Session = Depends(dependencies.get_db),
 ):
-    executions = docker_trains.get_train_executions(
+    db_train = docker_trains.get_by_train_id(db, train_id)
+    if not db_train:
+        raise HTTPException(status_code=404, detail=f"Train {train_id} not found")
+    return list_page(
+        docker_train_executions,
         db,
-        train_id,
+        response,
+        limit,
+        continuation_token,
+        skip,
+        sort=sort,
+        order=order,
+        filters={"train_id": db_train.id},
     )
-    return executions
@@ -1,19 +1,23 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 
 from station.app.api import dependencies
+from station.app.api.pagination import list_page
 from station.app.crud.crud_fhir_servers import fhir_servers
+from station.app.crud.pagination import MAX_PAGE_SIZE, PAGE_SIZE
 from station.app.fhir.server import get_server_statistics
+from station.app.response_cache import CachedRoute, cache_response
 from station.app.schemas.fhir import (
     FHIRServer,
     FHIRServerCreate,
     FHIRServerUpdate,
     ServerStatistics,
 )
+from station.app.schemas.pagination import CreatedSort, SortOrder
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 
 # todo error handling
@@ -28,11 +32,29 @@ def add_fhir_server(
 
 
 @router.get("", response_model=List[FHIRServer])
+@cache_response(tags=("fhir_servers",))
 def get_fhir_servers(
-    limit: int = 100, skip: int = 0, db: Session = Depends(dependencies.get_db)
+    response: Response,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    skip: int = 0,
+    continuation_token: str = None,
+    sort: CreatedSort = CreatedSort.created_at,
+    order: SortOrder = SortOrder.desc,
+    active: bool = None,
+    type: str = None,
+    db: Session = Depends(dependencies.get_db),
 ):
-    db_fhir_servers = fhir_servers.get_multi(db=db, skip=skip, limit=limit)
-    return db_fhir_servers
+    return list_page(
+        fhir_servers,
+        db,
+        response,
+        limit,
+        continuation_token,
+        skip,
+        sort=sort,
+        order=order,
+        filters={"active": active, "type": type},
+    )
 
 
 @router.put("/{server_id}", response_model=FHIRServer)
@@ -53,6 +75,7 @@ def delete_fhir_server(server_id: str, db: Session = Depends(dependencies.get_db
 
 
 @router.get("/{server_id}", response_model=FHIRServer)
+@cache_response(tags=("fhir_servers",))
 def get_fhir_server(server_id: str, db: Session = Depends(dependencies.get_db)):
     db_fhir_server = fhir_servers.get(db=db, id=server_id)
     return db_fhir_server
@@ -1,14 +1,20 @@
 from typing import List
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from station.app.api import dependencies
+from station.app.api.pagination import list_page
 from station.app.config import clients
-from station.app.crud.crud_local_train import local_train
+from station.app.crud.crud_local_train import LOCAL_TRAIN_RELATIONSHIPS, local_train
+from station.app.crud.crud_minio_objects import minio_objects
+from station.app.crud.pagination import MAX_PAGE_SIZE, PAGE_SIZE
+from station.app.object_index import object_index
 from station.app.schemas import local_trains
 from station.app.schemas.datasets import MinioFile
+from station.app.schemas.pagination import CreatedSort, SortOrder
 from station.common.constants import DataDirectories
 from station.trains.local.airflow import run_local_train
 
@@ -33,7 +39,7 @@ def create_local_train(
 
 @router.get("/{train_id}", response_model=local_trains.LocalTrain)
 def get_local_train(train_id: str, db: Session = Depends(dependencies.get_db)):
-    train = local_train.get(db, train_id)
+    train = local_train.get(db, train_id, options=LOCAL_TRAIN_RELATIONSHIPS)
     if not train:
         raise HTTPException(status_code=404, detail=f"Train ({train_id}) not found")
     return train
@@ -41,11 +47,28 @@ def get_local_train(train_id: str, db: Session = Depends(dependencies.get_db)):
 
 @router.get("", response_model=List[local_trains.LocalTrain])
 def get_local_trains(
-    db: Session = Depends(dependencies.get_db), skip: int = 0, limit: int = 100
+    response: Response,
+    db: Session = Depends(dependencies.get_db),
+    skip: int = 0,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    continuation_token: str = None,
+    sort: CreatedSort = CreatedSort.created_at,
+    order: SortOrder = SortOrder.desc,
+    master_image_id: UUID = None,
+    dataset_id: UUID = None,
 ):
-    trains = local_train.get_multi(db, skip=skip, limit=limit)
-
-    return trains
+    return list_page(
+        local_train,
+        db,
+        response,
+        limit,
+        continuation_token,
+        skip,
+        sort=sort,
+        order=order,
+        filters={"master_image_id": master_image_id, "dataset_id": dataset_id},
+        options=LOCAL_TRAIN_RELATIONSHIPS,
+    )
 
 
 @router.put("/{train_id}", response_model=local_trains.LocalTrain)
@@ -122,6 +145,15 @@ async def upload_train_files(
         )
 
     resp = await clients.minio.save_local_train_files(db_train.id, files)
+    # the returned paths include the bucket, the index stores the object names
+    minio_objects.add_files(
+        db,
+        DataDirectories.LOCAL_TRAINS.value,
+        [
+            file.copy(update={"full_path": f"{db_train.id}/{file.file_name}"})
+            for file in resp
+        ],
+    )
 
     state.configuration_status = (
         local_trains.LocalTrainConfigurationStep.files_uploaded.value
@@ -140,9 +172,11 @@ async def get_train_files(
             status_code=404, detail=f"Local train ({train_id}) not found."
         )
 
-    items = clients.minio.get_minio_dir_items(
-        DataDirectories.LOCAL_TRAINS.value, str(db_train.id)
-    )
+    bucket = DataDirectories.LOCAL_TRAINS.value
+    if object_index.is_ready(bucket):
+        items = list(minio_objects.iter_files(db, bucket, str(db_train.id)))
+    else:
+        items = clients.minio.get_minio_dir_items(bucket, str(db_train.id))
     if file_name:
         pass
     return items
@@ -1,13 +1,17 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from station.app.api import dependencies
+from station.app.api.pagination import list_page
 from station.app.crud.local_train_master_image import local_train_master_image
+from station.app.crud.pagination import MAX_PAGE_SIZE, PAGE_SIZE
+from station.app.response_cache import CachedRoute, cache_response
 from station.app.schemas import local_trains
+from station.app.schemas.pagination import CreatedSort, SortOrder
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 
 @router.post("", response_model=local_trains.LocalTrainMasterImage)
@@ -26,6 +30,7 @@ def add_master_image(
 
 
 @router.get("/{image_id}", response_model=local_trains.LocalTrainMasterImage)
+@cache_response(tags=("local_train_master_images",))
 def get_master_image(image_id: str, db: Session = Depends(dependencies.get_db)):
     image = local_train_master_image.get(db, image_id)
     if not image:
@@ -34,16 +39,32 @@ def get_master_image(image_id: str, db: Session = Depends(dependencies.get_db)):
 
 
 @router.get("", response_model=List[local_trains.LocalTrainMasterImage])
+@cache_response(tags=("local_train_master_images",), bypass=("sync",))
 def list_master_images(
+    response: Response,
     db: Session = Depends(dependencies.get_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    continuation_token: str = None,
+    sort: CreatedSort = CreatedSort.created_at,
+    order: SortOrder = SortOrder.desc,
+    group: str = None,
+    artifact: str = None,
     sync: bool = False,
 ):
     if sync:
         local_train_master_image.sync_with_harbor(db)
-    images = local_train_master_image.get_multi(db, skip=skip, limit=limit)
-    return images
+    return list_page(
+        local_train_master_image,
+        db,
+        response,
+        limit,
+        continuation_token,
+        skip,
+        sort=sort,
+        order=order,
+        filters={"group": group, "artifact": artifact},
+    )
 
 
 @router.put("/{image_id}", response_model=local_trains.LocalTrainMasterImage)
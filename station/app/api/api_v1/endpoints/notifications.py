@@ -1,15 +1,18 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 
 from station.app.api import dependencies
+from station.app.api.pagination import list_page
 from station.app.crud.crud_notifications import notifications
+from station.app.crud.pagination import MAX_PAGE_SIZE, PAGE_SIZE
 from station.app.schemas.notifications import (
     Notification,
     NotificationCreate,
     NotificationUpdate,
 )
+from station.app.schemas.pagination import CreatedSort, SortOrder
 
 router = APIRouter()
 
@@ -51,7 +54,25 @@ def get_notification(notification_id: int, db: Session = Depends(dependencies.ge
 
 @router.get("", response_model=List[Notification])
 def get_notifications(
-    limit: int = 100, skip: int = 0, db: Session = Depends(dependencies.get_db)
+    response: Response,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    skip: int = 0,
+    continuation_token: str = None,
+    sort: CreatedSort = CreatedSort.created_at,
+    order: SortOrder = SortOrder.desc,
+    is_read: bool = None,
+    topic: str = None,
+    target_user: str = None,
+    db: Session = Depends(dependencies.get_db),
 ):
-    db_notifications = notifications.get_multi(db=db, skip=skip, limit=limit)
-    return db_notifications
+    return list_page(
+        notifications,
+        db,
+        response,
+        limit,
+        continuation_token,
+        skip,
+        sort=sort,
+        order=order,
+        filters={"is_read": is_read, "topic": topic, "target_user": target_user},
+    )
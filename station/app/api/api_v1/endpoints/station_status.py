@@ -1,5 +1,8 @@
+import asyncio
+
 import psutil
 from fastapi import APIRouter
+from starlette.concurrency import run_in_threadpool
 
 from station.app.config import clients
 from station.app.schemas import station_status as status_schema
@@ -56,10 +59,26 @@ def get_hardware_resources_status():
     )
 
 
+async def service_health_check_async():
+    """
+    Check the health of all connected services concurrently without blocking the event loop
+    """
+    airflow, harbor, minio = await asyncio.gather(
+        clients.airflow.health_check_async(),
+        clients.harbor.health_check_async(),
+        run_in_threadpool(clients.minio.health_check),
+    )
+    services = {"airflow": airflow, "harbor": harbor, "minio": minio}
+    return [
+        status_schema.ServiceStatus(name=service, status=health)
+        for service, health in services.items()
+    ]
+
+
 @router.get("", response_model=status_schema.StationStatus)
 async def get_station_status():
     hardware = get_hardware_resources_status()
-    services = service_health_check()
+    services = await service_health_check_async()
 
     return status_schema.StationStatus(hardware=hardware, services=services)
 
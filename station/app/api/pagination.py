@@ -0,0 +1,54 @@
+from typing import Any, Dict, List, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from station.app.crud.base import CRUDBase
+from station.app.schemas.pagination import SortOrder
+
+CONTINUATION_TOKEN_HEADER = "X-Continuation-Token"
+
+
+def list_page(
+    crud: CRUDBase,
+    db: Session,
+    response: Response,
+    limit: int,
+    continuation_token: str = None,
+    skip: int = 0,
+    sort: str = None,
+    order: SortOrder = SortOrder.desc,
+    filters: Dict[str, Any] = None,
+    options: Sequence[LoaderOption] = (),
+) -> List:
+    """
+    Get a page of a list endpoint, the token of the next page is returned in the X-Continuation-Token header
+    :param crud: crud object of the listed table
+    :param db: database session
+    :param response: response of the endpoint
+    :param limit: page size
+    :param continuation_token: token of the previous page
+    :param skip: number of objects to skip after the continuation token
+    :param sort: column to sort by
+    :param order: sort order
+    :param filters: column values the listed objects have to match
+    :param options: loader options of the relationships serialized in the response
+    :return: objects of the page
+    """
+    try:
+        items, next_token = crud.get_page(
+            db,
+            limit=limit,
+            continuation_token=continuation_token,
+            skip=skip,
+            filters=filters,
+            sort=sort,
+            order=order,
+            options=options,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_token:
+        response.headers[CONTINUATION_TOKEN_HEADER] = next_token
+    return items
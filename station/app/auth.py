@@ -1,15 +1,16 @@
 from enum import Enum
 from typing import List
 
-import requests
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from loguru import logger
 from requests import HTTPError
 
-from station.app.cache import redis_cache
 from station.app.config import settings
 from station.app.schemas.users import User, UserPermission
+from station.app.token_cache import INVALID_TOKEN, user_tokens
+from station.common.clients.http import get_session
+from station.common.clients.tokens import get_token_manager
 
 
 class TokenCacheKeys(str, Enum):
@@ -18,45 +19,34 @@ class TokenCacheKeys(str, Enum):
 
 
 def get_robot_token(
-    robot_id: str = None, robot_secret: str = None, token_url: str = None
+    robot_id: str = None,
+    robot_secret: str = None,
+    token_url: str = None,
+    refresh: bool = False,
 ) -> str:
     """
-    Get robot token from auth server.
-    """
-    # todo token caching
-
-    logger.debug("Getting robot token")
+    Get the robot token of the station. The token is shared with the outbound clients using the same robot and is
+    refreshed in the background before it expires.
+    Args:
+        robot_id: id of the robot, the configured robot by default
+        robot_secret: secret of the robot
+        token_url: token url of the auth server
+        refresh: request a new token even if the current token did not expire
 
+    Returns:
+        the robot token
+    """
     if not token_url:
         token_url = settings.config.auth.token_url
     if not robot_id:
         robot_id = settings.config.auth.robot_id
     if not robot_secret:
-        robot_secret = settings.config.auth.robot_secret.get_secret_value()
+        robot_secret = settings.config.auth.robot_secret
 
-    # try to read the token from cache and return it if it exists
-    cached_token = redis_cache.get(TokenCacheKeys.robot_token.value)
-    if cached_token:
-        logger.debug("Found cached robot token")
-        return cached_token
-    else:
-        # get a new token from the auth server
-        logger.debug(f"Requesting new robot token from {token_url}")
-        data = {
-            "id": robot_id,
-            "secret": robot_secret,
-            "grant_type": "robot_credentials",
-        }
-
-        response = requests.post(token_url, data=data).json()
-
-        # parse values from response and set cache
-        token = response.get("access_token")
-        ttl = response.get("expires_in")
-
-        redis_cache.set(TokenCacheKeys.robot_token.value, token, ttl)
-
-        return token
+    tokens = get_token_manager(token_url, robot_id=robot_id, robot_secret=robot_secret)
+    if refresh:
+        return tokens.refresh()
+    return tokens.get_token()
 
 
 def validate_user_token(token: str, user_url: str = None) -> User:
@@ -69,13 +59,12 @@ def validate_user_token(token: str, user_url: str = None) -> User:
     Returns:
         User object parsed from the auth server response
     """
-    # todo token caching
     if user_url is None:
         user_url = settings.config.auth.user_url
     url = f"{user_url}/@me"
     logger.debug(f"Validating user token against {url}")
     headers = {"Authorization": f"Bearer {token}"}
-    r = requests.get(url, headers=headers)
+    r = get_session("auth").get(url, headers=headers)
     r.raise_for_status()
     user = User(**r.json())
     return user
@@ -83,7 +72,8 @@ def validate_user_token(token: str, user_url: str = None) -> User:
 
 def get_current_user(token: str, token_url: str = None) -> User:
     """
-    Validate a user token against the auth server and parse a user object from the response.
+    Validate a user token against the auth server and parse a user object from the response. Validated and
+    invalid tokens are cached, so repeated requests with the same token do not ask the auth server again.
     Args:
         token: token to validate
         robot_token: the robot token to request token validation
@@ -99,13 +89,19 @@ def get_current_user(token: str, token_url: str = None) -> User:
         settings.setup()
     if token_url is None:
         token_url = settings.config.auth.token_url
+    cached = user_tokens.get(token)
+    if cached is INVALID_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if cached:
+        return cached
     try:
         user = validate_user_token(token=token)
-
+        user_tokens.set_user(token, user)
         return user
     except HTTPError as e:
         logger.error(f"Error validating user token: {e}")
         if e.response.status_code == 401:
+            user_tokens.set_invalid(token)
             raise HTTPException(status_code=401, detail="Invalid token")
         elif e.response.status_code == 400:
             # attempt refresh robot token
@@ -115,9 +111,11 @@ def get_current_user(token: str, token_url: str = None) -> User:
                     robot_id=settings.config.auth.robot_id,
                     robot_secret=settings.config.auth.robot_secret.get_secret_value(),
                     token_url=token_url,
+                    refresh=True,
                 )
 
                 user = validate_user_token(token=token)
+                user_tokens.set_user(token, user)
                 return user
             except HTTPError:
                 raise HTTPException(status_code=401, detail="Invalid token")
@@ -130,7 +128,7 @@ def get_user_permissions(user: User, token_url: str = None) -> List[UserPermissi
         token_url = settings.config.auth.token_url
     url = f"{token_url}/introspect"
     headers = {"Authorization": f"Bearer {user.token}"}
-    r = requests.get(url, headers=headers)
+    r = get_session("auth").get(url, headers=headers)
     r.raise_for_status()
     permissions = [UserPermission(**p) for p in r.json().get("permissions")]
     return permissions
@@ -1,18 +1,90 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from enum import Enum
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 import redis
+from loguru import logger
+from pydantic import SecretStr
+
+# maximum number of values and time in seconds values are kept in the near cache of a process
+NEAR_CACHE_SIZE = 10_000
+NEAR_CACHE_TTL = 30
+# channel the keys of changed values are published on, so other processes drop them from their near cache
+INVALIDATION_CHANNEL = "station-cache-invalidation"
 
 
 class RedisJSONOps(str, Enum):
     SET = "JSON.SET"
     GET = "JSON.GET"
+    MGET = "JSON.MGET"
+
+
+class NearCache:
+    """
+    In process LRU cache of redis values with a time to live. Values are dropped when they expire or when another
+    process publishes a change of their key, the ttl bounds the staleness if an invalidation is missed.
+    """
+
+    def __init__(self, max_size: int = NEAR_CACHE_SIZE, ttl: float = NEAR_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._values: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._values[key]
+                return None
+            self._values.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: str, ttl: float = None):
+        ttl = min(ttl, self.ttl) if ttl else self.ttl
+        with self._lock:
+            self._values[key] = (time.monotonic() + ttl, value)
+            self._values.move_to_end(key)
+            while len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+
+    def delete(self, keys: Iterable[str]):
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
 
 
 class Cache:
-    def __init__(self, host="redis", port=6379, password=None, db=None):
+    def __init__(
+        self,
+        host="redis",
+        port=6379,
+        password=None,
+        db=None,
+        near_cache: bool = False,
+        near_cache_size: int = NEAR_CACHE_SIZE,
+        near_cache_ttl: float = NEAR_CACHE_TTL,
+    ):
         self.redis = redis.Redis(
             decode_responses=True, host=host, port=port, password=password, db=db
         )
+        # hot values are served from process memory if the near cache is enabled
+        self.near_cache = (
+            NearCache(near_cache_size, near_cache_ttl) if near_cache else None
+        )
+        self._id = uuid.uuid4().hex
+        self._subscriber = None
+        self._subscribe_lock = threading.Lock()
 
     def set(self, key: str, value: str, ttl: int = 3600) -> None:
         """
@@ -25,7 +97,7 @@ class Cache:
         Returns:
 
         """
-        self.redis.set(key, value, ex=ttl)
+        self.mset({key: value}, ttl)
 
     def get(self, key: str) -> str:
         """
@@ -36,11 +108,49 @@ class Cache:
         Returns:
             value of the key or None if not found
         """
-        return self.redis.get(key)
+        return self.mget([key])[0]
+
+    def mset(self, values: Dict[str, str], ttl: int = 3600) -> None:
+        """
+        Set several key/value pairs with a ttl in a single round trip
+        Args:
+            values: keys and their values
+            ttl: time until the keys expire
+        """
+        if not values:
+            return
+        pipeline = self.redis.pipeline(transaction=False)
+        for key, value in values.items():
+            pipeline.set(key, value, ex=ttl)
+        self._publish_invalidation(pipeline, list(values))
+        pipeline.execute()
+        self._store_local(values, ttl)
+
+    def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """
+        Get the values of several keys, values missing in the near cache are read in a single round trip
+        Args:
+            keys: keys to get
+
+        Returns:
+            values of the keys in the order of the keys, None for keys that are not found
+        """
+        return self._get_many(keys, self.redis.mget)
+
+    def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.delete(*keys)
+        self._publish_invalidation(pipeline, list(keys))
+        pipeline.execute()
+        if self.near_cache:
+            self.near_cache.delete(keys)
 
     def json_set(self, key: str, value: str, ttl: int = 3600) -> None:
         """
-        Adds a json string to the cache. With ttl.
+        Adds a json string to the cache. With ttl. The value and its expiration are set atomically in a single
+        round trip.
         Args:
             key: key under which the json string is stored
             value: json string
@@ -49,13 +159,12 @@ class Cache:
         Returns:
 
         """
-        self.redis.execute_command(
-            RedisJSONOps.SET.value,
-            key,
-            ".",
-            value,
-        )
-        self.redis.expire(key, ttl)
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.execute_command(RedisJSONOps.SET.value, key, ".", value)
+        pipeline.expire(key, ttl)
+        self._publish_invalidation(pipeline, [key])
+        pipeline.execute()
+        self._store_local({key: value}, ttl)
 
     def json_get(self, key) -> str:
         """
@@ -66,8 +175,98 @@ class Cache:
         Returns:
             json string or None if not found
         """
-        json_string = self.redis.execute_command(RedisJSONOps.GET.value, key, ".")
-        return json_string
+        return self.json_mget([key])[0]
+
+    def json_mget(self, keys: List[str]) -> List[Optional[str]]:
+        """
+        Get several json strings from the cache in a single round trip
+        Args:
+            keys: keys under which the json strings are stored
+
+        Returns:
+            json strings in the order of the keys, None for keys that are not found
+        """
+        return self._get_many(
+            keys,
+            lambda missing: self.redis.execute_command(
+                RedisJSONOps.MGET.value, *missing, "."
+            ),
+        )
+
+    def close(self):
+        if self._subscriber:
+            self._subscriber.stop()
+            self._subscriber = None
+
+    def _get_many(
+        self, keys: List[str], fetch: Callable[[List[str]], List[Optional[str]]]
+    ) -> List[Optional[str]]:
+        values = [self.near_cache.get(key) for key in keys] if self.near_cache else []
+        missing = [key for i, key in enumerate(keys) if not values or values[i] is None]
+        if not missing:
+            return values
+        fetched = dict(zip(missing, fetch(missing)))
+        self._store_local(
+            {key: value for key, value in fetched.items() if value is not None}
+        )
+        return [
+            fetched[key] if key in fetched else values[i] for i, key in enumerate(keys)
+        ]
+
+    def _store_local(self, values: Dict[str, str], ttl: int = None):
+        if not self.near_cache or not values:
+            return
+        self._subscribe()
+        for key, value in values.items():
+            self.near_cache.set(key, value, ttl)
+
+    def _publish_invalidation(self, pipeline, keys: List[str]):
+        # other processes may hold the keys in their near cache even if this one has none
+        pipeline.publish(INVALIDATION_CHANNEL, json.dumps([self._id, keys]))
+
+    def _subscribe(self):
+        if self._subscriber:
+            return
+        with self._subscribe_lock:
+            if self._subscriber is None:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{INVALIDATION_CHANNEL: self._on_invalidation})
+                self._subscriber = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def _on_invalidation(self, message: dict):
+        sender, keys = json.loads(message["data"])
+        if sender != self._id:
+            self.near_cache.delete(keys)
+
+
+def connect_redis(
+    host: str,
+    port: int = 6379,
+    password: SecretStr = None,
+    db: int = None,
+    near_cache: bool = False,
+) -> Optional[Cache]:
+    """
+    Connect to redis if it is reachable
+    Args:
+        host: redis host
+        port: redis port
+        password: optional redis password
+        db: redis database
+        near_cache: keep hot values in process memory
+
+    Returns:
+        The connected cache or None if redis is not reachable
+    """
+    if isinstance(password, SecretStr):
+        password = password.get_secret_value()
+    cache = Cache(host=host, port=port, password=password, db=db, near_cache=near_cache)
+    try:
+        cache.redis.ping()
+    except redis.RedisError as e:
+        logger.warning(f"Redis at {host}:{port} is not reachable: {e}")
+        return None
+    return cache
 
 
 redis_cache = None
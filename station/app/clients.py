@@ -44,10 +44,17 @@ class StationClients:
             password=registry_password,
         )
 
+        # only override the fetch defaults of the minio client if they are configured
+        minio_fetch_options = {
+            option: getattr(self.settings.config.minio, option)
+            for option in ("fetch_concurrency", "fetch_read_ahead")
+            if getattr(self.settings.config.minio, option) is not None
+        }
         self._minio = MinioClient(
             minio_server=self.settings.config.minio.server_url,
             access_key=self.settings.config.minio.access_key,
             secret_key=self.settings.config.minio.secret_key,
+            **minio_fetch_options,
         )
 
         self._minio.setup_buckets()
@@ -1,11 +1,29 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import operator
+from enum import Enum
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from sqlalchemy.sql.schema import Column
+from sqlalchemy import Column, and_, literal, or_, tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Query, Session
+from sqlalchemy.orm.interfaces import LoaderOption
 
+from station.app.crud.pagination import PAGE_SIZE, decode_cursor, encode_cursor
 from station.app.db.base_class import Base
+from station.app.response_cache import response_cache
+from station.app.schemas.pagination import SortOrder
+from station.common.clients.minio.pagination import take_page
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -24,22 +42,152 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
 
-    def get(self, db: Session, id: Any) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.id == id).first()
+    def invalidate_cache(self, *tags: str):
+        """
+        Remove cached responses read from the table of the model and the given tables
+        """
+        response_cache.invalidate(self.model.__tablename__, *tags)
+
+    def get(
+        self, db: Session, id: Any, options: Sequence[LoaderOption] = ()
+    ) -> Optional[ModelType]:
+        return (
+            db.query(self.model).options(*options).filter(self.model.id == id).first()
+        )
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: Optional[int] = 100,
+        filters: Dict[str, Any] = None,
+        sort: str = None,
+        order: SortOrder = SortOrder.desc,
+        options: Sequence[LoaderOption] = (),
     ) -> List[ModelType]:
-        if isinstance(self.model.__table__.columns.get("created_at", None), Column):
-            return (
-                db.query(self.model)
-                .order_by(self.model.created_at.desc())
-                .offset(skip)
-                .limit(limit)
-                .all()
+        query = self._filter(db.query(self.model).options(*options), filters)
+        query = query.order_by(*self._order_by(self._sort_key(sort), order))
+        return query.offset(skip).limit(limit).all()
+
+    def get_page(
+        self,
+        db: Session,
+        *,
+        limit: int = PAGE_SIZE,
+        continuation_token: str = None,
+        skip: int = 0,
+        filters: Dict[str, Any] = None,
+        sort: str = None,
+        order: SortOrder = SortOrder.desc,
+        options: Sequence[LoaderOption] = (),
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Get a page of objects with keyset pagination. Pages continue after the sort key of the last row of the
+        previous page, so every page is read with an index seek instead of scanning the skipped rows.
+        Args:
+            db: database session
+            limit: maximum number of objects of the page
+            continuation_token: token returned with the previous page
+            skip: number of objects to skip after the continuation token
+            filters: column names and the values they have to be equal to, None values are ignored
+            sort: column to sort by, the creation time or the primary key by default
+            order: sort order of the listing
+            options: loader options of the relationships used by the caller, e.g. selectinload
+
+        Returns:
+            Objects of the page and the token of the next page or None if there are no more objects
+        """
+        key = self._sort_key(sort)
+        columns = [self.model.__table__.columns[attribute.key] for attribute in key]
+        query = self._filter(db.query(self.model).options(*options), filters)
+        if continuation_token:
+            values = decode_cursor(continuation_token, key[0].key, order, columns)
+            query = query.filter(self._after(key, columns, values, order))
+        query = query.order_by(*self._order_by(key, order))
+        page, has_more = take_page(query.offset(skip).limit(limit + 1).all(), limit)
+        if not has_more:
+            return page, None
+        last = [getattr(page[-1], attribute.key) for attribute in key]
+        return page, encode_cursor(key[0].key, order, last)
+
+    def _filter(self, query: Query, filters: Optional[Dict[str, Any]]) -> Query:
+        for name, value in (filters or {}).items():
+            if value is None:
+                continue
+            if name not in self.model.__table__.columns:
+                raise ValueError(
+                    f"Unknown filter {name} for {self.model.__tablename__}"
+                )
+            if isinstance(value, Enum):
+                value = value.value
+            query = query.filter(getattr(self.model, name) == value)
+        return query
+
+    def _sort_key(self, sort: Optional[str]) -> Tuple[InstrumentedAttribute, ...]:
+        """
+        Columns a listing is sorted by, the primary key makes the order unique for rows with the same value
+        """
+        if isinstance(sort, Enum):
+            sort = sort.value
+        if sort is None:
+            sort = (
+                "created_at" if "created_at" in self.model.__table__.columns else "id"
             )
+        if sort not in self.model.__table__.columns:
+            raise ValueError(f"Can not sort {self.model.__tablename__} by {sort}")
+        if sort == "id":
+            return (self.model.id,)
+        return getattr(self.model, sort), self.model.id
+
+    @staticmethod
+    def _order_by(key: Sequence[InstrumentedAttribute], order: SortOrder) -> List:
+        """
+        Order of a listing, NULL values of nullable columns are sorted last in both directions to match the
+        bounds of the keyset pagination
+        """
+        clauses = []
+        for attribute in key:
+            clause = attribute.desc() if order == SortOrder.desc else attribute.asc()
+            if attribute.expression.nullable:
+                clause = clause.nulls_last()
+            clauses.append(clause)
+        return clauses
+
+    @staticmethod
+    def _after(
+        key: Sequence[InstrumentedAttribute],
+        columns: Sequence[Column],
+        values: Sequence[Any],
+        order: SortOrder,
+    ):
+        """
+        Condition selecting the rows sorted after the sort key of the last row of the previous page
+        Args:
+            key: columns the listing is sorted by, the primary key is the last column
+            columns: table columns of the sort key
+            values: sort key of the last row of the previous page
+            order: sort order of the listing
 
-        return db.query(self.model).offset(skip).limit(limit).all()
+        Returns:
+            Filter of the rows of the following pages
+        """
+        after = operator.lt if order == SortOrder.desc else operator.gt
+        if not key[0].expression.nullable:
+            bound = tuple_(
+                *(literal(value, column.type) for value, column in zip(values, columns))
+            )
+            return after(tuple_(*key), bound)
+        # comparisons with NULL are never true, NULL values are sorted after all other values
+        (attribute, primary_key), (value, last_id) = key, values
+        if value is None:
+            return and_(attribute.is_(None), after(primary_key, last_id))
+        value = literal(value, columns[0].type)
+        return or_(
+            after(attribute, value),
+            and_(attribute == value, after(primary_key, last_id)),
+            attribute.is_(None),
+        )
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in, exclude_none=True)
@@ -47,6 +195,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        self.invalidate_cache()
         return db_obj
 
     def update(
@@ -54,7 +203,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db: Session,
         *,
         db_obj: ModelType,
-        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
     ) -> ModelType:
 
         # todo check if automatic update of updated_at makes sense
@@ -69,10 +218,12 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        self.invalidate_cache()
         return db_obj
 
     def remove(self, db: Session, *, id: int) -> ModelType:
         obj = db.query(self.model).get(id)
         db.delete(obj)
         db.commit()
+        self.invalidate_cache()
         return obj
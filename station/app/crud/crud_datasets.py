@@ -1,13 +1,24 @@
 import json
-from typing import List, Union
+import os
+from datetime import datetime
+from typing import Iterable, List, Union
 
 import pandas as pd
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
+from station.app.datasets import columnar, storage
+from station.app.datasets.aggregates import TableAggregate
 from station.app.datasets.filesystem import get_file
-from station.app.models.datasets import DataSet
-from station.app.schemas.datasets import DataSetCreate, DataSetStatistics, DataSetUpdate
+from station.app.datasets.statistics import DATASET_SUMMARY_KEY
+from station.app.models.datasets import DataSet, DataSetFileStatistics
+from station.app.schemas.datasets import (
+    DataSetCreate,
+    DataSetStatistics,
+    DataSetUpdate,
+    MinioFile,
+)
+from station.app.settings import settings
 
 from .base import CreateSchemaType, CRUDBase, ModelType
 
@@ -25,21 +36,44 @@ class CRUDDatasets(CRUDBase[DataSet, DataSetCreate, DataSetUpdate]):
 
         db.add(db_obj)
         db.commit()
+        self.invalidate_cache()
         db.refresh(db_obj)
 
         return db_obj
 
     def get_data(
-        self, db: Session, data_set_id: str, file_name: Union[str, List[str]] = None
+        self,
+        db: Session,
+        data_set_id: str,
+        file_name: Union[str, List[str]] = None,
+        columns: List[str] = None,
     ):
+        """
+        Load the tabular data of a dataset. Files stored in minio are read from their columnar copies if they
+        exist, so only the selected columns are loaded.
+        """
         dataset = self.get(db, data_set_id)
         if dataset.data_type == "image":
             raise NotImplementedError
+        elif file_name and dataset.data_type in {"csv", "structured", "hybrid"}:
+            file_names = [file_name] if isinstance(file_name, str) else file_name
+            frames = [
+                storage.read_dataset_file(dataset.id, name, columns)
+                for name in file_names
+            ]
+            return pd.concat(frames, ignore_index=True)
         elif dataset.data_type == "csv":
             path = dataset.access_path
+            data_file = MinioFile(file_name=path)
+            if columnar.is_columnar(data_file) and dataset.storage_type == "local":
+                # local columnar files are memory mapped
+                local_path = os.path.join(settings.config.station_data_dir, path)
+                return columnar.read_columnar(data_file, local_path, columns)
             file = get_file(path, dataset.storage_type)
             with file as f:
-                csv_df = pd.read_csv(f)
+                if columnar.is_columnar(data_file):
+                    return columnar.read_columnar(data_file, f, columns)
+                csv_df = pd.read_csv(f, usecols=columns)
                 return csv_df
         elif dataset.data_type == "directory":
             raise NotImplementedError
@@ -60,20 +94,109 @@ class CRUDDatasets(CRUDBase[DataSet, DataSetCreate, DataSetUpdate]):
     ):
         dataset = self.get(db, data_set_id)
 
-        if file_name:
-            if dataset.summary:
-                stored_stats = json.loads(dataset.summary)
-            else:
-                stored_stats = {}
-            stored_stats[file_name] = stats
-            dataset.summary = jsonable_encoder(stored_stats)
-        else:
-            stats = jsonable_encoder(stats)
-            stats_json = json.dumps(stats)
-            dataset.summary = stats_json
+        stored_stats = dataset.summary or {}
+        if isinstance(stored_stats, str):
+            stored_stats = json.loads(stored_stats)
+        # summaries stored as a single statistics object can not hold per file statistics
+        if DATASET_SUMMARY_KEY not in stored_stats and "n_items" in stored_stats:
+            stored_stats = {}
+        stored_stats = dict(stored_stats)
+        stored_stats[file_name or DATASET_SUMMARY_KEY] = stats
+        dataset.summary = jsonable_encoder(stored_stats)
         db.commit()
         db.refresh(dataset)
         return dataset
 
+    def get_file_statistics(
+        self, db: Session, data_set_id: str
+    ) -> List[DataSetFileStatistics]:
+        return (
+            db.query(DataSetFileStatistics)
+            .filter(DataSetFileStatistics.dataset_id == data_set_id)
+            .all()
+        )
+
+    def set_file_statistics(
+        self,
+        db: Session,
+        data_set_id: str,
+        file_name: str,
+        aggregate: TableAggregate,
+        etag: str = None,
+    ) -> DataSetFileStatistics:
+        """
+        Store the mergeable sketches of a file, replacing previously stored sketches of the same file. Files are
+        identified by their path in the dataset, as files in different folders can share their name. Cached
+        summaries of the dataset are invalidated since they no longer match the stored sketches.
+        """
+        db_stats = (
+            db.query(DataSetFileStatistics)
+            .filter(
+                DataSetFileStatistics.dataset_id == data_set_id,
+                DataSetFileStatistics.file_name == file_name,
+            )
+            .first()
+        )
+        if db_stats:
+            db_stats.updated_at = datetime.now()
+        else:
+            db_stats = DataSetFileStatistics(
+                dataset_id=data_set_id, file_name=file_name
+            )
+            db.add(db_stats)
+        db_stats.etag = etag
+        db_stats.n_items = aggregate.n_items
+        db_stats.sketches = aggregate.to_dict()
+        self._invalidate_summary(db, data_set_id, [file_name])
+        db.commit()
+        db.refresh(db_stats)
+        return db_stats
+
+    def remove_file_statistics(
+        self, db: Session, data_set_id: str, file_names: Iterable[str]
+    ):
+        """
+        Remove the sketches and cached summaries of files that were changed or removed from the dataset
+        """
+        file_names = list(file_names)
+        if not file_names:
+            return
+        db.query(DataSetFileStatistics).filter(
+            DataSetFileStatistics.dataset_id == data_set_id,
+            DataSetFileStatistics.file_name.in_(file_names),
+        ).delete(synchronize_session=False)
+        self._invalidate_summary(db, data_set_id, file_names)
+        db.commit()
+
+    def get_merged_statistics(
+        self, db: Session, data_set_id: str, file_names: Iterable[str] = None
+    ) -> TableAggregate:
+        """
+        Merge the stored sketches of the given files, or of all files of the dataset if no file names are given
+        """
+        file_stats = self.get_file_statistics(db, data_set_id)
+        if file_names is not None:
+            file_names = set(file_names)
+            file_stats = [s for s in file_stats if s.file_name in file_names]
+        file_stats.sort(key=lambda s: s.file_name)
+        return TableAggregate.merge_all(
+            TableAggregate.from_dict(s.sketches) for s in file_stats
+        )
+
+    def _invalidate_summary(
+        self, db: Session, data_set_id: str, file_names: Iterable[str]
+    ):
+        dataset = self.get(db, data_set_id)
+        if not dataset or not dataset.summary:
+            return
+        if isinstance(dataset.summary, str):
+            dataset.summary = None
+            return
+        dataset.summary = {
+            key: value
+            for key, value in dataset.summary.items()
+            if key != DATASET_SUMMARY_KEY and key not in file_names
+        }
+
 
 datasets = CRUDDatasets(DataSet)
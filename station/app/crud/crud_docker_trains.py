@@ -1,11 +1,12 @@
 from builtins import str
 from datetime import datetime
-from typing import List, Tuple, Union
+from typing import List, Sequence, Tuple, Union
 
 from dateutil import parser
 from fastapi import HTTPException
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
 
 from station.app.config import clients, settings
 from station.app.models.docker_trains import (
@@ -24,6 +25,15 @@ from station.app.schemas.docker_trains import DockerTrainState as DockerTrainSta
 # TODO improve handling of proposals
 from .base import CRUDBase, ModelType
 
+# relationships serialized with a train, the state is joined and the executions of all trains are selected with a
+# single additional query, so listing trains takes two queries regardless of their number
+TRAIN_RELATIONSHIPS = (
+    joinedload(DockerTrain.state),
+    selectinload(DockerTrain.executions),
+)
+# trains serialized with a config
+CONFIG_RELATIONSHIPS = (selectinload(DockerTrainConfig.trains),)
+
 
 class CRUDDockerTrain(CRUDBase[DockerTrain, DockerTrainCreate, DockerTrainUpdate]):
     def create(self, db: Session, *, obj_in: DockerTrainCreate) -> ModelType:
@@ -68,27 +78,28 @@ class CRUDDockerTrain(CRUDBase[DockerTrain, DockerTrainCreate, DockerTrainUpdate
         train_state = DockerTrainState(train_id=db_train.id)
         db.add(train_state)
         db.commit()
+        self.invalidate_cache(
+            DockerTrainState.__tablename__, DockerTrainConfig.__tablename__
+        )
 
         db.refresh(db_train)
         return db_train
 
-    def get_by_train_id(self, db: Session, train_id: str) -> DockerTrain:
-        train = db.query(DockerTrain).filter(DockerTrain.train_id == train_id).first()
+    def get_by_train_id(
+        self, db: Session, train_id: str, options: Sequence[LoaderOption] = ()
+    ) -> DockerTrain:
+        train = (
+            db.query(DockerTrain)
+            .options(*options)
+            .filter(DockerTrain.train_id == train_id)
+            .first()
+        )
         return train
 
     def get_trains_by_active_status(
         self, db: Session, active=True, limit: int = 0
     ) -> List[DockerTrain]:
-        if limit != 0:
-            trains = (
-                db.query(DockerTrain)
-                .filter(DockerTrain.is_active == active)
-                .limit(limit)
-                .all()
-            )
-        else:
-            trains = db.query(DockerTrain).filter(DockerTrain.is_active == active).all()
-        return trains
+        return self.get_multi(db, limit=limit or None, filters={"is_active": active})
 
     def delete_by_train_id(self, db: Session, train_id: str) -> DockerTrain:
         db_train = self.get_by_train_id(db, train_id)
@@ -96,6 +107,7 @@ class CRUDDockerTrain(CRUDBase[DockerTrain, DockerTrainCreate, DockerTrainUpdate
             raise HTTPException(status_code=404, detail=f"Train {train_id} not found")
         db.delete(db_train)
         db.commit()
+        self.invalidate_cache(DockerTrainState.__tablename__)
         return db_train
 
     def add_if_not_exists(
@@ -123,10 +135,13 @@ class CRUDDockerTrain(CRUDBase[DockerTrain, DockerTrainCreate, DockerTrainUpdate
             train_state = DockerTrainState(train_id=db_train.id)
             db.add(train_state)
             db.commit()
+            self.invalidate_cache(DockerTrainState.__tablename__)
             return db_train
 
     def read_train_state(self, db: Session, train_id: str) -> DockerTrainState:
-        db_train = self.get_by_train_id(db, train_id)
+        db_train = self.get_by_train_id(
+            db, train_id, options=[joinedload(DockerTrain.state)]
+        )
         if not db_train:
             raise HTTPException(status_code=404, detail=f"Train {train_id} not found")
         state = db_train.state
@@ -145,12 +160,15 @@ class CRUDDockerTrain(CRUDBase[DockerTrain, DockerTrainCreate, DockerTrainUpdate
         db_state.status = state_in.status
 
         db.commit()
+        self.invalidate_cache(DockerTrainState.__tablename__)
         db.refresh(db_state)
 
         return db_state
 
     def get_train_executions(self, db: Session, train_id: str) -> DockerTrainExecution:
-        db_train = self.get_by_train_id(db, train_id)
+        db_train = self.get_by_train_id(
+            db, train_id, options=[selectinload(DockerTrain.executions)]
+        )
         if not db_train:
             raise HTTPException(status_code=404, detail=f"Train {train_id} not found")
         executions = db_train.executions
@@ -159,12 +177,8 @@ class CRUDDockerTrain(CRUDBase[DockerTrain, DockerTrainCreate, DockerTrainUpdate
     def get_executions(
         self, db: Session, skip: int = 0, limit: int = 100
     ) -> List[DockerTrainExecution]:
-        return (
-            db.query(DockerTrainExecution)
-            .order_by(DockerTrainExecution.start.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return docker_train_executions.get_multi(
+            db, skip=skip, limit=limit, sort="start"
         )
 
     def synchronize_central(self, db: Session) -> List[DockerTrain]:
@@ -198,6 +212,7 @@ class CRUDDockerTrain(CRUDBase[DockerTrain, DockerTrainCreate, DockerTrainUpdate
             db_state = self._train_state_from_central(db_train.id, train_dict)
             db.add(db_state)
             db.commit()
+            self.invalidate_cache(DockerTrainState.__tablename__)
             db.refresh(db_state)
 
             return db_train, db_state
@@ -252,3 +267,4 @@ class CRUDDockerTrain(CRUDBase[DockerTrain, DockerTrainCreate, DockerTrainUpdate
 
 
 docker_trains = CRUDDockerTrain(DockerTrain)
+docker_train_executions = CRUDBase(DockerTrainExecution)
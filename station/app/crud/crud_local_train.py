@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Any, Dict, Union
 
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from station.app.config import clients
 from station.app.crud.base import (
@@ -11,6 +11,7 @@ from station.app.crud.base import (
     ModelType,
     UpdateSchemaType,
 )
+from station.app.crud.crud_minio_objects import minio_objects
 from station.app.models.local_trains import (
     LocalTrain,
     LocalTrainExecution,
@@ -24,6 +25,9 @@ from station.app.schemas.local_trains import (
 from station.common.constants import DataDirectories
 from station.trains.local.update import update_configuration_status
 
+# the state is serialized with every local train
+LOCAL_TRAIN_RELATIONSHIPS = (joinedload(LocalTrain.state),)
+
 
 class CRUDLocalTrain(CRUDBase[LocalTrain, LocalTrainCreate, LocalTrainUpdate]):
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
@@ -77,6 +81,9 @@ class CRUDLocalTrain(CRUDBase[LocalTrain, LocalTrainCreate, LocalTrainUpdate]):
         clients.minio.delete_folder(
             bucket=str(DataDirectories.LOCAL_TRAINS.value), directory=train_id
         )
+        minio_objects.remove_directory(
+            db, DataDirectories.LOCAL_TRAINS.value, directory=train_id
+        )
 
         # remove sql database entries for LocalTrainExecution
         obj = (
@@ -0,0 +1,290 @@
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import func, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from station.app.models.minio_objects import MinioObject
+from station.app.schemas.datasets import (
+    ClassDistribution,
+    DataSetFilesSummary,
+    MinioFile,
+)
+from station.common.clients.minio.pagination import (
+    LIST_PAGE_SIZE,
+    decode_continuation_token,
+    next_continuation_token,
+    take_page,
+)
+
+from .base import CRUDBase
+
+# number of rows written or loaded per statement when the index is updated
+INDEX_BATCH_SIZE = 1000
+
+
+def object_prefix(name: str) -> str:
+    """
+    Directory of an object name without trailing slash, empty for objects in the root of a bucket
+    """
+    return name.rsplit("/", 1)[0] if "/" in name else ""
+
+
+def summarize_prefixes(
+    directory: str, prefixes: Iterable[Tuple[str, int, int]]
+) -> DataSetFilesSummary:
+    """
+    Summarize the number and size of the objects below a directory. The first level subdirectories of the
+    directory are the classes of the objects they contain.
+    :param directory: directory the objects are stored in
+    :param prefixes: tuples of the directory of objects, their number and their combined size
+    :return: summary of all objects and of the classes
+    """
+    summary = DataSetFilesSummary()
+    classes: Dict[str, ClassDistribution] = {}
+    for prefix, n_items, size in prefixes:
+        summary.n_items += n_items
+        summary.size += size or 0
+        relative = prefix[len(directory) :].strip("/")
+        if not relative:
+            continue
+        class_name = relative.split("/", 1)[0]
+        distribution = classes.setdefault(
+            class_name, ClassDistribution(class_name=class_name)
+        )
+        distribution.n_items += n_items
+        distribution.size += size or 0
+    summary.classes = sorted(classes.values(), key=lambda c: c.class_name)
+    return summary
+
+
+class CRUDMinioObjects(CRUDBase[MinioObject, MinioFile, MinioFile]):
+    def add_files(self, db: Session, bucket: str, files: Iterable[MinioFile]):
+        """
+        Add uploaded files to the index or update their entries if the objects were overwritten
+        """
+        files = {file.full_path: file for file in files}
+        if not files:
+            return
+        self._upsert(db, [self._to_row(bucket, file) for file in files.values()])
+        db.commit()
+
+    def remove_objects(self, db: Session, bucket: str, names: Iterable[str]):
+        names = list(names)
+        for start in range(0, len(names), INDEX_BATCH_SIZE):
+            db.query(self.model).filter(
+                self.model.bucket == bucket,
+                self.model.name.in_(names[start : start + INDEX_BATCH_SIZE]),
+            ).delete(synchronize_session=False)
+        db.commit()
+
+    def remove_directory(self, db: Session, bucket: str, directory: str):
+        self._directory_query(db, bucket, directory).delete(synchronize_session=False)
+        db.commit()
+
+    def iter_files(
+        self,
+        db: Session,
+        bucket: str,
+        directory: str,
+        prefix: str = None,
+        start_after: str = None,
+        exclude: Union[str, Sequence[str]] = None,
+    ) -> Iterator[MinioFile]:
+        """
+        Iterate over the indexed objects below a directory ordered by their names, the rows are loaded in batches
+        :param db: database session
+        :param bucket: bucket of the objects
+        :param directory: directory to list recursively
+        :param prefix: only list objects whose path relative to the directory starts with this prefix
+        :param start_after: only list objects with names after this object name
+        :param exclude: skip objects whose names start with this prefix or one of these prefixes
+        :return: Iterator over the indexed objects
+        """
+        query = self._listing_query(db, bucket, directory, prefix, start_after, exclude)
+        for row in query.order_by(self.model.name).yield_per(INDEX_BATCH_SIZE):
+            yield self._to_file(row)
+
+    def list_page(
+        self,
+        db: Session,
+        bucket: str,
+        directory: str,
+        limit: int = LIST_PAGE_SIZE,
+        continuation_token: str = None,
+        prefix: str = None,
+        exclude: Union[str, Sequence[str]] = None,
+    ) -> Tuple[List[MinioFile], Optional[str]]:
+        """
+        List a page of the indexed objects below a directory, the continuation tokens are the same as the ones
+        of the minio listings
+        """
+        start_after = None
+        if continuation_token:
+            start_after = decode_continuation_token(
+                continuation_token, prefix=f"{directory}/"
+            )
+        query = self._listing_query(db, bucket, directory, prefix, start_after, exclude)
+        rows = query.order_by(self.model.name).limit(limit + 1).all()
+        page, has_more = take_page((self._to_file(row) for row in rows), limit)
+        return page, next_continuation_token(page, has_more)
+
+    def get_summary(
+        self,
+        db: Session,
+        bucket: str,
+        directory: str,
+        exclude: Union[str, Sequence[str]] = None,
+    ) -> DataSetFilesSummary:
+        """
+        Get the number and size of the objects below a directory and of its subdirectories with a single
+        aggregate query
+        """
+        query = self._directory_query(
+            db,
+            bucket,
+            directory,
+            self.model.prefix,
+            func.count(self.model.id),
+            func.coalesce(func.sum(self.model.size), 0),
+        )
+        query = self._exclude(query, exclude)
+        return summarize_prefixes(directory, query.group_by(self.model.prefix).all())
+
+    def reconcile(
+        self,
+        db: Session,
+        bucket: str,
+        objects: Iterable[MinioFile],
+        directory: str = None,
+    ) -> Tuple[int, int, int]:
+        """
+        Synchronize the index of a bucket or a directory in it with a listing of the stored objects. Entries of
+        new or changed objects are written, entries of objects that no longer exist are removed. Entries of new
+        objects are upserted, as uploads and the reconciliations of other processes can add them concurrently.
+        :param db: database session
+        :param bucket: bucket that was listed
+        :param objects: all objects of the bucket or the directory
+        :param directory: optional directory that was listed
+        :return: number of added, updated and removed entries
+        """
+        if directory:
+            query = self._directory_query(
+                db,
+                bucket,
+                directory,
+                self.model.name,
+                self.model.id,
+                self.model.etag,
+                self.model.size,
+            )
+        else:
+            query = db.query(
+                self.model.name, self.model.id, self.model.etag, self.model.size
+            ).filter(self.model.bucket == bucket)
+        existing = {name: (id, etag, size) for name, id, etag, size in query}
+
+        added = updated = 0
+        inserts, updates = [], []
+        for item in objects:
+            entry = existing.pop(item.full_path, None)
+            if entry is None:
+                inserts.append(self._to_row(bucket, item))
+                added += 1
+            elif entry[1] != item.etag or entry[2] != item.size:
+                updates.append({"id": entry[0], **self._to_row(bucket, item)})
+                updated += 1
+            if len(inserts) + len(updates) >= INDEX_BATCH_SIZE:
+                self._upsert(db, inserts)
+                db.bulk_update_mappings(self.model, updates)
+                inserts, updates = [], []
+        self._upsert(db, inserts)
+        db.bulk_update_mappings(self.model, updates)
+
+        removed = [id for id, _, _ in existing.values()]
+        for start in range(0, len(removed), INDEX_BATCH_SIZE):
+            db.query(self.model).filter(
+                self.model.id.in_(removed[start : start + INDEX_BATCH_SIZE])
+            ).delete(synchronize_session=False)
+        db.commit()
+        return added, updated, len(removed)
+
+    def _upsert(self, db: Session, rows: List[dict]):
+        if not rows:
+            return
+        dialect = db.get_bind().dialect.name
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        statement = insert(self.model)
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.model.bucket, self.model.name],
+            set_={
+                column: statement.excluded[column]
+                for column in rows[0]
+                if column not in {"bucket", "name"}
+            },
+        )
+        db.execute(statement, rows)
+
+    def _listing_query(
+        self,
+        db: Session,
+        bucket: str,
+        directory: str,
+        prefix: Optional[str],
+        start_after: Optional[str],
+        exclude: Union[str, Sequence[str], None],
+    ):
+        query = self._directory_query(db, bucket, directory)
+        if prefix:
+            query = query.filter(
+                self.model.name.startswith(f"{directory}/{prefix}", autoescape=True)
+            )
+        if start_after:
+            query = query.filter(self.model.name > start_after)
+        return self._exclude(query, exclude)
+
+    def _exclude(self, query, exclude: Union[str, Sequence[str], None]):
+        if isinstance(exclude, str):
+            exclude = [exclude]
+        for prefix in exclude or []:
+            query = query.filter(~self.model.name.startswith(prefix, autoescape=True))
+        return query
+
+    def _directory_query(self, db: Session, bucket: str, directory: str, *columns):
+        directory = directory.strip("/")
+        query = db.query(*columns) if columns else db.query(self.model)
+        return query.filter(
+            self.model.bucket == bucket,
+            or_(
+                self.model.prefix == directory,
+                self.model.prefix.startswith(f"{directory}/", autoescape=True),
+            ),
+        )
+
+    @staticmethod
+    def _to_row(bucket: str, file: MinioFile) -> dict:
+        return {
+            "bucket": bucket,
+            "name": file.full_path,
+            "prefix": object_prefix(file.full_path),
+            "size": file.size or 0,
+            "etag": file.etag,
+            "content_type": file.content_type,
+            "last_modified": file.updated_at,
+            "indexed_at": datetime.now(),
+        }
+
+    @staticmethod
+    def _to_file(row: MinioObject) -> MinioFile:
+        return MinioFile(
+            file_name=row.name.split("/")[-1],
+            full_path=row.name,
+            size=row.size,
+            updated_at=row.last_modified,
+            etag=row.etag,
+            content_type=row.content_type,
+        )
+
+
+minio_objects = CRUDMinioObjects(MinioObject)
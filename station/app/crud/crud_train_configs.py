@@ -30,6 +30,7 @@ class CRUDDockerTrainConfig(
         )
         db.add(db_config)
         db.commit()
+        self.invalidate_cache()
         db.refresh(db_config)
         return db_config
 
@@ -40,6 +41,7 @@ class CRUDDockerTrainConfig(
         train.config_id = config_id
         train.updated_at = datetime.now()
         db.commit()
+        self.invalidate_cache(DockerTrain.__tablename__)
         db.refresh(train)
         return train
 
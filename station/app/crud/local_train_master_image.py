@@ -40,6 +40,7 @@ class CRUDLocalTrainMasterImage(
             )
             db.add(master_image)
             db.commit()
+        self.invalidate_cache()
 
 
 local_train_master_image = CRUDLocalTrainMasterImage(LocalTrainMasterImage)
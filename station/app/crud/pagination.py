@@ -0,0 +1,70 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Sequence
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Column
+
+from station.app.schemas.pagination import SortOrder
+
+# default and maximum number of rows returned per page of a list endpoint
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(sort: str, order: SortOrder, values: Sequence[Any]) -> str:
+    """
+    Encode the sort key of the last row of a page as opaque token to continue the listing after it
+    Args:
+        sort: name of the column the listing is sorted by
+        order: sort order of the listing
+        values: value of the sort column and primary key of the last row
+
+    Returns:
+        Continuation token of the next page
+    """
+    cursor = [sort, SortOrder(order).value, jsonable_encoder(list(values))]
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+
+def decode_cursor(
+    token: str, sort: str, order: SortOrder, columns: Sequence[Column]
+) -> List[Any]:
+    """
+    Decode a continuation token into the sort key the listing continues after
+    Args:
+        token: token returned with the previous page
+        sort: name of the column the listing is sorted by, tokens of differently sorted listings are rejected
+        order: sort order of the listing
+        columns: columns of the sort key, used to restore the types of the values
+
+    Returns:
+        Values of the sort key of the last row of the previous page
+    """
+    try:
+        token_sort, token_order, values = json.loads(
+            base64.urlsafe_b64decode(token.encode())
+        )
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError(f"Invalid continuation token {token}")
+    if (token_sort, token_order) != (sort, SortOrder(order).value):
+        raise ValueError(
+            f"Continuation token {token} does not belong to a listing sorted by {sort}"
+        )
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError(f"Invalid continuation token {token}")
+    try:
+        return [_parse_value(column, value) for column, value in zip(columns, values)]
+    except TypeError:
+        raise ValueError(f"Invalid continuation token {token}")
+
+
+def _parse_value(column: Column, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
@@ -0,0 +1,155 @@
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+from station.app.datasets.sketches import (
+    DistinctCounter,
+    Histogram,
+    Moments,
+    TDigest,
+    TopK,
+)
+
+
+class ColumnAggregate:
+    """
+    Mergeable single pass summary of a table column. Memory usage is bounded by the sketch sizes and does not
+    grow with the number of rows.
+    """
+
+    def __init__(self, title: str):
+        self.title = title
+        self.count = 0
+        self.nulls = 0
+        self.zeros = 0
+        # a column is numeric as long as all batches had a numeric dtype
+        self.is_numeric = True
+        self.moments = Moments()
+        self.quantiles = TDigest()
+        self.histogram = Histogram()
+        self.distinct = DistinctCounter()
+        self.top = TopK()
+
+    def update(self, column: pd.Series):
+        values = column.dropna()
+        self.nulls += len(column) - len(values)
+        self.count += len(values)
+
+        if is_numeric_dtype(column) and not is_bool_dtype(column):
+            numbers = values.to_numpy(dtype=np.float64)
+            self.zeros += int(np.count_nonzero(numbers == 0))
+            self.moments.update(numbers)
+            finite = numbers[np.isfinite(numbers)]
+            self.quantiles.update(finite)
+            self.histogram.update(finite)
+        else:
+            self.is_numeric = False
+
+        self.distinct.update(values)
+        self.top.update(values)
+
+    def merge(self, other: "ColumnAggregate"):
+        self.count += other.count
+        self.nulls += other.nulls
+        self.zeros += other.zeros
+        self.is_numeric = self.is_numeric and other.is_numeric
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        self.histogram.merge(other.histogram)
+        self.distinct.merge(other.distinct)
+        self.top.merge(other.top)
+
+    def to_dict(self) -> dict:
+        return {
+            "title": self.title,
+            "count": self.count,
+            "nulls": self.nulls,
+            "zeros": self.zeros,
+            "is_numeric": self.is_numeric,
+            "moments": self.moments.to_dict(),
+            "quantiles": self.quantiles.to_dict(),
+            "histogram": self.histogram.to_dict(),
+            "distinct": self.distinct.to_dict(),
+            "top": self.top.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ColumnAggregate":
+        column = cls(data["title"])
+        column.count = data["count"]
+        column.nulls = data["nulls"]
+        column.zeros = data["zeros"]
+        column.is_numeric = data["is_numeric"]
+        column.moments = Moments.from_dict(data["moments"])
+        column.quantiles = TDigest.from_dict(data["quantiles"])
+        column.histogram = Histogram.from_dict(data["histogram"])
+        column.distinct = DistinctCounter.from_dict(data["distinct"])
+        column.top = TopK.from_dict(data["top"])
+        return column
+
+
+class TableAggregate:
+    """
+    Aggregates of all columns of a table, updated batch by batch.
+    """
+
+    def __init__(self):
+        self.n_items = 0
+        self.columns: Dict[str, ColumnAggregate] = {}
+
+    def update(self, batch: pd.DataFrame):
+        # columns are added in the order they appear, columns missing in a batch count as null
+        for title in batch.columns:
+            if title not in self.columns:
+                column = ColumnAggregate(title)
+                column.nulls = self.n_items
+                self.columns[title] = column
+        for title, column in self.columns.items():
+            if title in batch.columns:
+                column.update(batch[title])
+            else:
+                column.nulls += len(batch)
+        self.n_items += len(batch)
+
+    def merge(self, other: "TableAggregate"):
+        for title, other_column in other.columns.items():
+            if title not in self.columns:
+                column = ColumnAggregate(title)
+                column.nulls = self.n_items
+                self.columns[title] = column
+            self.columns[title].merge(other_column)
+        for title, column in self.columns.items():
+            if title not in other.columns:
+                column.nulls += other.n_items
+        self.n_items += other.n_items
+
+    @property
+    def titles(self) -> List[str]:
+        return list(self.columns.keys())
+
+    def to_dict(self) -> dict:
+        """
+        Serialize the aggregates into a json compatible dictionary, which can be persisted and merged later on
+        """
+        return {
+            "n_items": self.n_items,
+            "columns": [column.to_dict() for column in self.columns.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TableAggregate":
+        aggregate = cls()
+        aggregate.n_items = data["n_items"]
+        for column_data in data["columns"]:
+            column = ColumnAggregate.from_dict(column_data)
+            aggregate.columns[column.title] = column
+        return aggregate
+
+    @classmethod
+    def merge_all(cls, aggregates: Iterable["TableAggregate"]) -> "TableAggregate":
+        merged = cls()
+        for aggregate in aggregates:
+            merged.merge(aggregate)
+        return merged
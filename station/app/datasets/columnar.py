@@ -0,0 +1,107 @@
+from typing import BinaryIO, Iterator, List, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from station.app.schemas.datasets import MinioFile
+from station.common.constants import DATASET_COLUMNAR_DIRECTORY
+
+# extensions of files that are already stored in a columnar format
+COLUMNAR_EXTENSIONS = {"parquet", "arrow", "feather"}
+# extensions of text or spreadsheet files that are converted into a columnar copy
+CONVERTIBLE_EXTENSIONS = {"csv", "xlsx"}
+# size of the blocks of csv files that are parsed at once, the column types are inferred from the first block
+CSV_BLOCK_SIZE = 16 * 1024 * 1024
+PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
+
+
+def file_extension(file_name: str) -> str:
+    return file_name.split(".")[-1].lower()
+
+
+def is_columnar(file: MinioFile) -> bool:
+    return file_extension(file.file_name) in COLUMNAR_EXTENSIONS
+
+
+def is_convertible(file: MinioFile) -> bool:
+    return file_extension(file.file_name) in CONVERTIBLE_EXTENSIONS
+
+
+def columnar_path(data_set_id: str, file_path: str) -> str:
+    """
+    Object name of the columnar copy of a dataset file, given the path of the file in the dataset
+    """
+    return f"{data_set_id}/{DATASET_COLUMNAR_DIRECTORY}/{file_path}.parquet"
+
+
+def write_parquet(file: MinioFile, stream: BinaryIO, sink: BinaryIO):
+    """
+    Convert a csv or xlsx file into parquet. CSV files are converted block by block without loading the whole file.
+    :param file: File to convert
+    :param stream: Binary stream of the file content
+    :param sink: Binary file object the parquet data is written to
+    """
+    extension = file_extension(file.file_name)
+    if extension == "csv":
+        reader = pa_csv.open_csv(
+            stream, read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE)
+        )
+        with pq.ParquetWriter(sink, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+    elif extension == "xlsx":
+        table = pa.Table.from_pandas(pd.read_excel(stream), preserve_index=False)
+        pq.write_table(table, sink)
+    else:
+        raise TypeError
+
+
+def read_columnar(
+    file: MinioFile, source: Union[str, BinaryIO], columns: List[str] = None
+) -> pd.DataFrame:
+    """
+    Read a parquet or arrow file, only the given columns are read from the source
+    :param file: File to read
+    :param source: Seekable binary file object or path of the file, paths of arrow files are memory mapped
+    :param columns: optional list of the columns to load
+    :return: Dataframe with the selected columns
+    """
+    extension = file_extension(file.file_name)
+    if extension == "parquet":
+        return pq.read_table(source, columns=columns).to_pandas()
+    elif extension in {"arrow", "feather"}:
+        return feather.read_table(
+            source, columns=columns, memory_map=isinstance(source, str)
+        ).to_pandas()
+    raise TypeError
+
+
+def iter_columnar_chunks(
+    file: MinioFile, source: BinaryIO, chunk_size: int, columns: List[str] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a parquet or arrow file in batches of rows
+    :param file: File to read
+    :param source: Seekable binary file object of the file
+    :param chunk_size: Maximum number of rows per batch
+    :param columns: optional list of the columns to load
+    :return: Iterator over dataframes with at most chunk_size rows
+    """
+    extension = file_extension(file.file_name)
+    if extension == "parquet":
+        parquet_file = pq.ParquetFile(source)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    elif extension in {"arrow", "feather"}:
+        reader = pa.ipc.open_file(pa.PythonFile(source, mode="r"))
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, max(batch.num_rows, 1), chunk_size):
+                yield batch.slice(start, chunk_size).to_pandas()
+    else:
+        raise TypeError
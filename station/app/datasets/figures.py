@@ -0,0 +1,109 @@
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from station.app.schemas.datasets import DataSetFigure, FigureData
+
+# number of equal width bins of the histograms of numerical columns
+HISTOGRAM_BINS = 32
+# maximum number of categories shown in the bar charts of categorical columns
+MAX_CATEGORIES = 50
+
+
+def numerical_figure(
+    title: str,
+    minimum: float,
+    q1: float,
+    median: float,
+    q3: float,
+    maximum: float,
+    mean: float,
+    edges: Sequence[float] = None,
+    counts: Sequence[int] = None,
+) -> DataSetFigure:
+    """
+    Create a plotly figure spec of a numerical column from its five-number summary and an optional histogram.
+    The size of the figure does not depend on the number of rows of the column.
+    :param title: title of the column
+    :param minimum: minimum of the column
+    :param q1: first quartile
+    :param median: median
+    :param q3: third quartile
+    :param maximum: maximum of the column
+    :param mean: mean of the column
+    :param edges: edges of the histogram bins, one more than counts
+    :param counts: number of values in each histogram bin
+    :return: DataSetFigure with a box plot and a histogram next to it
+    """
+    box = {
+        "type": "box",
+        "name": title,
+        "q1": [_number(q1)],
+        "median": [_number(median)],
+        "q3": [_number(q3)],
+        "lowerfence": [_number(minimum)],
+        "upperfence": [_number(maximum)],
+        "mean": [_number(mean)],
+        "boxpoints": False,
+    }
+    layout = {"title": {"text": title}, "yaxis": {"title": {"text": title}}}
+    data = [box]
+    if counts is not None and len(counts) > 0:
+        edges = np.asarray(edges, dtype=np.float64)
+        data.append(
+            {
+                "type": "bar",
+                "name": title,
+                "x": ((edges[:-1] + edges[1:]) / 2).tolist(),
+                "y": np.asarray(counts).tolist(),
+                "width": np.diff(edges).tolist(),
+                "xaxis": "x2",
+                "yaxis": "y2",
+                "showlegend": False,
+            }
+        )
+        layout.update(
+            {
+                "xaxis": {"domain": [0, 0.3]},
+                "xaxis2": {"domain": [0.4, 1], "title": {"text": title}},
+                "yaxis2": {"anchor": "x2", "title": {"text": "Anzahl"}},
+                "showlegend": False,
+            }
+        )
+    return DataSetFigure(fig_data=FigureData(data=data, layout=layout))
+
+
+def categorical_figure(
+    title: str, labels: Sequence[Any], counts: Sequence[int], pie: bool = False
+) -> DataSetFigure:
+    """
+    Create a plotly figure spec of the counts of the categories of a column. At most MAX_CATEGORIES categories
+    are included, so the size of the figure does not depend on the data.
+    :param title: title of the column
+    :param labels: categories ordered by descending count
+    :param counts: number of occurrences of each category
+    :param pie: create a pie chart instead of a bar chart
+    :return: DataSetFigure with the chart
+    """
+    labels = [_label(label) for label in labels[:MAX_CATEGORIES]]
+    counts = [int(count) for count in counts[:MAX_CATEGORIES]]
+    if pie:
+        trace = {"type": "pie", "labels": labels, "values": counts}
+        layout = {"title": {"text": title}}
+    else:
+        trace = {"type": "bar", "x": labels, "y": counts}
+        layout = {"title": {"text": title}, "yaxis": {"title": {"text": "Anzahl"}}}
+    return DataSetFigure(fig_data=FigureData(data=[trace], layout=layout))
+
+
+def _number(value: float) -> Optional[float]:
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def _label(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
@@ -0,0 +1,288 @@
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from station.app.crud import datasets
+from station.app.datasets import columnar, statistics, storage
+from station.app.db.session import SessionLocal
+from station.app.object_index import list_dataset_files
+from station.app.schemas.datasets import (
+    DataSetStatistics,
+    MinioFile,
+    StatisticsJob,
+    StatisticsJobStatus,
+)
+
+# number of statistics jobs processed in parallel
+STATS_JOB_WORKERS = 2
+# number of finished jobs whose status is kept for polling
+STATS_JOB_HISTORY = 100
+
+
+def split_outdated_files(
+    db: Session, data_set_id: str, items: List[MinioFile], prune: bool = True
+) -> Tuple[List[MinioFile], List[MinioFile]]:
+    """
+    Select the tabular files statistics are computed from and the files among them without sketches or whose
+    content changed since the sketches were computed
+    Args:
+        db: database session
+        data_set_id: id of the dataset
+        items: files of the dataset
+        prune: remove the sketches of files that are no longer part of the given files
+
+    Returns:
+        Tuple of the tabular files and the outdated files
+    """
+    file_stats = {
+        s.file_name: s.etag for s in datasets.get_file_statistics(db, data_set_id)
+    }
+    if prune:
+        removed = set(file_stats) - {storage.dataset_file_path(item) for item in items}
+        datasets.remove_file_statistics(db, data_set_id, removed)
+
+    tabular = [item for item in items if statistics.is_tabular(item)]
+    # sketches are identified by the path of the file in the dataset and the etag of its content
+    current = set(file_stats.items())
+    outdated = [
+        item
+        for item in tabular
+        if (storage.dataset_file_path(item), item.etag) not in current
+    ]
+    return tabular, outdated
+
+
+def get_files_hash(items: List[MinioFile]) -> str:
+    """
+    Digest of the paths and etags of files, it changes when a file is added, removed or its content changed
+    """
+    digest = hashlib.sha256()
+    for path, etag in sorted(
+        (storage.dataset_file_path(item), item.etag or "") for item in items
+    ):
+        digest.update(f"{path}\0{etag}\n".encode())
+    return digest.hexdigest()
+
+
+def get_merged_statistics(
+    db: Session, data_set_id: str, items: List[MinioFile]
+) -> DataSetStatistics:
+    """
+    Create the statistics of the given files from their stored sketches
+    """
+    aggregate = datasets.get_merged_statistics(
+        db, data_set_id, [storage.dataset_file_path(item) for item in items]
+    )
+    return statistics.get_aggregate_statistics(aggregate)
+
+
+def update_statistics(db: Session, job: StatisticsJob) -> DataSetStatistics:
+    """
+    Compute the sketches of all new or changed files of a dataset, merge them into the statistics of the dataset
+    or of the single file of the job and store these as the summary of the dataset. The progress is reported in
+    the job.
+    Args:
+        db: database session
+        job: job to run
+
+    Returns:
+        Statistics of the dataset or the file of the job
+    """
+    items = list_dataset_files(db, job.dataset_id)
+    if job.file_name:
+        items = [
+            item for item in items if storage.dataset_file_path(item) == job.file_name
+        ]
+    items, outdated = split_outdated_files(
+        db, job.dataset_id, items, prune=not job.file_name
+    )
+    job.files_hash = get_files_hash(items)
+    if len(items) == 0:
+        raise TypeError("No files in a supported tabular format found.")
+
+    job.files_total = len(outdated)
+    for item in outdated:
+        logger.info(f"Calculating stats for {job.dataset_id} {item.file_name}")
+        with storage.open_dataset_file(item) as stream:
+            chunks = statistics.iter_tabular_chunks(item, stream)
+            aggregate = statistics.get_table_aggregate(chunks)
+        datasets.set_file_statistics(
+            db,
+            job.dataset_id,
+            storage.dataset_file_path(item),
+            aggregate,
+            etag=item.etag,
+        )
+        if columnar.is_convertible(item):
+            try:
+                storage.create_columnar_copy(job.dataset_id, item)
+            except Exception as e:
+                # the statistics do not depend on the copy, readers fall back to the original file
+                logger.warning(
+                    f"Could not create columnar copy of {item.full_path}: {e}"
+                )
+        job.files_done += 1
+
+    stats = get_merged_statistics(db, job.dataset_id, items)
+    datasets.add_stats(db, job.dataset_id, stats, job.file_name)
+    return stats
+
+
+class StatisticsJobQueue:
+    """
+    In-process queue running statistics jobs in a bounded thread pool, so requests never wait for the download
+    and processing of dataset files. Job states are kept in memory and are polled through the api.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[Session, StatisticsJob], Any] = update_statistics,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_workers: int = STATS_JOB_WORKERS,
+        history: int = STATS_JOB_HISTORY,
+    ):
+        self._run = run
+        self._session_factory = session_factory
+        self._max_workers = max_workers
+        self._history = history
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, StatisticsJob] = OrderedDict()
+        self._futures: Dict[str, Future] = {}
+
+    def submit(self, dataset_id: str, file_name: str = None) -> StatisticsJob:
+        """
+        Queue a statistics job for a dataset or a single file of it. If an identical job is still waiting to be
+        started, that job is returned instead of queueing another one.
+        Args:
+            dataset_id: id of the dataset
+            file_name: optional path of the file in the dataset to compute the statistics for
+
+        Returns:
+            The queued job
+        """
+        dataset_id = str(dataset_id)
+        with self._lock:
+            pending = self._find(dataset_id, file_name, {StatisticsJobStatus.PENDING})
+            if pending:
+                return pending
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="stats-job"
+                )
+            job = StatisticsJob(
+                id=str(uuid.uuid4()), dataset_id=dataset_id, file_name=file_name
+            )
+            self._jobs[job.id] = job
+            self._futures[job.id] = self._executor.submit(self._execute, job)
+            self._prune()
+        logger.info(f"Queued statistics job {job.id} for {dataset_id} {file_name}")
+        return job
+
+    def get(self, job_id: str) -> Optional[StatisticsJob]:
+        return self._jobs.get(job_id)
+
+    def find_active(
+        self, dataset_id: str, file_name: str = None
+    ) -> Optional[StatisticsJob]:
+        """
+        Get the most recent pending or running job for a dataset or a file
+        """
+        with self._lock:
+            return self._find(
+                str(dataset_id),
+                file_name,
+                {StatisticsJobStatus.PENDING, StatisticsJobStatus.RUNNING},
+            )
+
+    def find_failed(
+        self, dataset_id: str, file_name: str = None, files_hash: str = None
+    ) -> Optional[StatisticsJob]:
+        """
+        Get the most recent job for a dataset or a file if it failed and the files did not change since, so the
+        error is reported instead of running the job again
+        Args:
+            dataset_id: id of the dataset
+            file_name: optional path of the file in the dataset
+            files_hash: digest of the current files, see get_files_hash
+
+        Returns:
+            The failed job or None if the most recent job did not fail or processed different files
+        """
+        with self._lock:
+            job = self._find(str(dataset_id), file_name, set(StatisticsJobStatus))
+        if (
+            job
+            and job.status == StatisticsJobStatus.FAILED
+            and job.files_hash is not None
+            and job.files_hash == files_hash
+        ):
+            return job
+        return None
+
+    def wait(self, job_id: str, timeout: float = None) -> Optional[StatisticsJob]:
+        """
+        Block until a job is finished
+        """
+        future = self._futures.get(job_id)
+        if future:
+            future.result(timeout=timeout)
+        return self.get(job_id)
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _execute(self, job: StatisticsJob):
+        job.status = StatisticsJobStatus.RUNNING
+        job.started_at = datetime.now()
+        db = self._session_factory()
+        try:
+            self._run(db, job)
+            job.status = StatisticsJobStatus.COMPLETED
+        except TypeError as e:
+            logger.warning(f"Statistics job {job.id} failed: {e}")
+            job.error = str(e) or "File is not in a supported tabular format."
+            job.status = StatisticsJobStatus.FAILED
+        except Exception as e:
+            logger.exception(f"Statistics job {job.id} failed")
+            job.error = str(e)
+            job.status = StatisticsJobStatus.FAILED
+        finally:
+            db.close()
+            job.finished_at = datetime.now()
+            with self._lock:
+                self._futures.pop(job.id, None)
+
+    def _find(
+        self, dataset_id: str, file_name: Optional[str], states: set
+    ) -> Optional[StatisticsJob]:
+        for job in reversed(self._jobs.values()):
+            if (
+                job.dataset_id == dataset_id
+                and job.file_name == file_name
+                and job.status in states
+            ):
+                return job
+        return None
+
+    def _prune(self):
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status in {StatisticsJobStatus.COMPLETED, StatisticsJobStatus.FAILED}
+        ]
+        for job_id in finished[: max(len(finished) - self._history, 0)]:
+            del self._jobs[job_id]
+
+
+statistics_jobs = StatisticsJobQueue()
@@ -0,0 +1,511 @@
+import base64
+import math
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# maximum number of hashes of the exact distinct set that are persisted, larger sets fall back to the estimate
+# and the all_distinct flag of the counter
+PERSISTED_EXACT_LIMIT = 1024
+
+
+class Moments:
+    """
+    Count, mean, sum of squared deviations, min and max of a stream of numbers. Batches are combined with the
+    parallel variant of Welford's algorithm, so two instances can be merged without revisiting the data.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray):
+        """
+        Add a batch of float values without missing values
+        """
+        if len(values) == 0:
+            return
+        batch = Moments()
+        batch.count = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: "Moments"):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": _finite_or_none(self.mean),
+            "m2": _finite_or_none(self.m2),
+            "min": _finite_or_none(self.min),
+            "max": _finite_or_none(self.max),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Moments":
+        moments = cls()
+        moments.count = data["count"]
+        moments.mean = _none_to(data["mean"], math.nan)
+        moments.m2 = _none_to(data["m2"], math.nan)
+        moments.min = _none_to(data["min"], math.inf)
+        moments.max = _none_to(data["max"], -math.inf)
+        return moments
+
+    @property
+    def variance(self) -> float:
+        """
+        Sample variance, same as pandas with one delta degree of freedom
+        """
+        if self.count < 2:
+            return math.nan
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class TDigest:
+    """
+    Merging t-digest for approximate quantiles. Values are kept as weighted centroids that are small at the tails
+    and larger around the median, the number of centroids is bounded by the compression.
+    """
+
+    def __init__(self, compression: int = 200):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray):
+        """
+        Add a batch of float values without missing values
+        """
+        if len(values) == 0:
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._merge_centroids(values, np.ones(len(values), dtype=np.float64))
+
+    def merge(self, other: "TDigest"):
+        if len(other.means) == 0:
+            return
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._merge_centroids(other.means, other.weights)
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def to_dict(self) -> dict:
+        return {
+            "compression": self.compression,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+            "min": _finite_or_none(self.min),
+            "max": _finite_or_none(self.max),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TDigest":
+        digest = cls(data["compression"])
+        digest.means = np.asarray(data["means"], dtype=np.float64)
+        digest.weights = np.asarray(data["weights"], dtype=np.float64)
+        digest.min = _none_to(data["min"], math.inf)
+        digest.max = _none_to(data["max"], -math.inf)
+        return digest
+
+    def quantile(self, q: float) -> float:
+        if len(self.means) == 0:
+            return math.nan
+        # interpolate between the centers of the centroids, anchored at the exact minimum and maximum
+        total = self.weights.sum()
+        positions = np.concatenate(
+            [[0.0], np.cumsum(self.weights) - self.weights / 2, [total]]
+        )
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * total, positions, values))
+
+    def _merge_centroids(self, means: np.ndarray, weights: np.ndarray):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+
+        # assign each centroid to a bucket of the arcsine scale function based on its quantile
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(2 * q - 1)
+        buckets = np.floor(k - k.min()).astype(np.int64)
+
+        # combine all centroids in the same bucket into one
+        bucket_weights = np.bincount(buckets, weights=weights)
+        bucket_sums = np.bincount(buckets, weights=means * weights)
+        non_empty = bucket_weights > 0
+        self.weights = bucket_weights[non_empty]
+        self.means = bucket_sums[non_empty] / self.weights
+
+
+class HyperLogLog:
+    """
+    HyperLogLog sketch for approximate distinct counts of 64 bit hashes. The relative error is about
+    1.04 / sqrt(2 ** precision), sketches with the same precision are merged by taking the register maximum.
+    """
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(2**precision, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        index = hashes >> np.uint64(64 - self.precision)
+        # the guard bit limits the rank for hashes with only zeros after the index bits
+        rest = (hashes << np.uint64(self.precision)) | np.uint64(
+            1 << (self.precision - 1)
+        )
+        rank = (64 - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index.astype(np.int64), rank)
+
+    def merge(self, other: "HyperLogLog"):
+        if other.precision != self.precision:
+            raise ValueError(
+                f"Can not merge sketches with precision {self.precision} and {other.precision}"
+            )
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def to_dict(self) -> dict:
+        return {
+            "precision": self.precision,
+            "registers": _encode_array(self.registers),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HyperLogLog":
+        hll = cls(data["precision"])
+        hll.registers = _decode_array(data["registers"], np.uint8)
+        return hll
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m**2 / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # linear counting for small cardinalities
+        if estimate <= 2.5 * m and zeros > 0:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class DistinctCounter:
+    """
+    Distinct count that is exact as long as the number of distinct values stays below exact_limit and falls back
+    to a HyperLogLog estimate afterwards. Whether all values are distinct is tracked separately: a duplicate is
+    always detected within a batch or while the exact set is kept. Once the exact set was dropped, the flag of
+    merged counters is unknown (None) unless one of them contains a duplicate, because the overlap of their
+    values can only be estimated.
+    """
+
+    def __init__(self, exact_limit: int = 10000, precision: int = 12):
+        self.exact_limit = exact_limit
+        self.hll = HyperLogLog(precision)
+        self.exact: Optional[np.ndarray] = np.empty(0, dtype=np.uint64)
+        self.all_distinct: Optional[bool] = True
+
+    def update(self, values: Union[pd.Series, np.ndarray]):
+        if len(values) == 0:
+            return
+        hashes = pd.util.hash_array(np.asarray(values))
+        self.hll.update(hashes)
+        unique = np.unique(hashes)
+        if len(unique) < len(hashes):
+            self.all_distinct = False
+        if self.exact is None:
+            self._unknown_overlap()
+            return
+        # skip the exact set if the estimate is far beyond the limit
+        if self.hll.estimate() > 2 * self.exact_limit:
+            if len(self.exact) > 0:
+                self._unknown_overlap()
+            self.exact = None
+            return
+        self._update_exact(unique)
+
+    def merge(self, other: "DistinctCounter"):
+        self.hll.merge(other.hll)
+        if self.exact is not None and len(self.exact) == 0:
+            # nothing was added yet, so the values of the other counter can not overlap
+            self.exact = None if other.exact is None else other.exact.copy()
+            self.all_distinct = other.all_distinct
+            return
+        if other.all_distinct is False:
+            self.all_distinct = False
+        elif other.all_distinct is None:
+            self._unknown_overlap()
+        if other.exact is None:
+            self.exact = None
+            self._unknown_overlap()
+        else:
+            self._update_exact(other.exact)
+
+    @property
+    def is_exact(self) -> bool:
+        return self.exact is not None
+
+    def estimate(self) -> int:
+        if self.exact is not None:
+            return len(self.exact)
+        return self.hll.estimate()
+
+    def to_dict(self) -> dict:
+        # large exact sets are dropped to keep the persisted sketch small, the distinct flag is kept
+        exact = None
+        if self.exact is not None and len(self.exact) <= PERSISTED_EXACT_LIMIT:
+            exact = _encode_array(self.exact)
+        return {
+            "exact_limit": self.exact_limit,
+            "hll": self.hll.to_dict(),
+            "exact": exact,
+            "all_distinct": self.all_distinct,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DistinctCounter":
+        counter = cls(exact_limit=data["exact_limit"])
+        counter.hll = HyperLogLog.from_dict(data["hll"])
+        counter.exact = None
+        if data["exact"] is not None:
+            counter.exact = _decode_array(data["exact"], np.uint64)
+        # sketches persisted before the flag was added
+        counter.all_distinct = data.get("all_distinct")
+        return counter
+
+    def _update_exact(self, hashes: np.ndarray):
+        if self.exact is None:
+            self._unknown_overlap()
+            return
+        size = len(self.exact)
+        self.exact = np.union1d(self.exact, hashes)
+        if len(self.exact) < size + len(hashes):
+            self.all_distinct = False
+        if len(self.exact) > self.exact_limit:
+            self.exact = None
+
+    def _unknown_overlap(self):
+        # values added without an exact set might repeat earlier values
+        if self.all_distinct:
+            self.all_distinct = None
+
+
+class TopK:
+    """
+    Mergeable Misra-Gries summary of the most frequent values. Counts are exact as long as the number of distinct
+    values does not exceed the capacity, otherwise they are underestimated by at most n / (capacity + 1).
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.is_exact = True
+
+    def update(self, values: pd.Series):
+        if len(values) == 0:
+            return
+        value_counts = values.value_counts()
+        if len(value_counts) > self.capacity:
+            # reduce the batch to a summary of the same capacity before merging
+            value_counts = value_counts - value_counts.iloc[self.capacity]
+            value_counts = value_counts.iloc[: self.capacity]
+            value_counts = value_counts[value_counts > 0]
+            self.is_exact = False
+        batch = TopK(self.capacity)
+        batch.counts = {str(value): int(count) for value, count in value_counts.items()}
+        self.merge(batch)
+
+    def merge(self, other: "TopK"):
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+        self.is_exact = self.is_exact and other.is_exact
+        if len(self.counts) > self.capacity:
+            threshold = sorted(self.counts.values(), reverse=True)[self.capacity]
+            self.counts = {
+                value: count - threshold
+                for value, count in self.counts.items()
+                if count > threshold
+            }
+            self.is_exact = False
+
+    def most_common(self, n: int = None) -> List[Tuple[str, int]]:
+        items = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return items[:n] if n else items
+
+    def to_dict(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "counts": self.counts,
+            "is_exact": self.is_exact,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TopK":
+        top = cls(data["capacity"])
+        top.counts = dict(data["counts"])
+        top.is_exact = data["is_exact"]
+        return top
+
+
+class Histogram:
+    """
+    Histogram with a bin width that is a power of two. When the values do not fit into max_bins bins anymore,
+    the width is doubled and neighbouring bins are combined. Two histograms are merged exactly after aligning them
+    to the larger bin width.
+    """
+
+    def __init__(self, max_bins: int = 64):
+        self.max_bins = max_bins
+        self.exponent: Optional[int] = None
+        self.bins: Dict[int, int] = {}
+
+    @property
+    def width(self) -> float:
+        return math.ldexp(1.0, self.exponent)
+
+    def update(self, values: np.ndarray):
+        """
+        Add a batch of finite float values
+        """
+        if len(values) == 0:
+            return
+        low, high = float(values.min()), float(values.max())
+        exponent = self._fitting_exponent(low, high)
+        if self.exponent is None:
+            self.exponent = exponent
+        elif exponent > self.exponent:
+            self._coarsen(exponent)
+
+        indices, counts = np.unique(
+            np.floor(values / self.width).astype(np.int64), return_counts=True
+        )
+        for index, count in zip(indices.tolist(), counts.tolist()):
+            self.bins[index] = self.bins.get(index, 0) + count
+        self._shrink()
+
+    def merge(self, other: "Histogram"):
+        if other.exponent is None:
+            return
+        if self.exponent is None:
+            self.exponent = other.exponent
+        exponent = max(self.exponent, other.exponent)
+        self._coarsen(exponent)
+        shift = exponent - other.exponent
+        for index, count in other.bins.items():
+            index = index >> shift
+            self.bins[index] = self.bins.get(index, 0) + count
+        self._shrink()
+
+    def edges_and_counts(self) -> Tuple[List[float], List[int]]:
+        """
+        Get the left edges and counts of all bins between the lowest and highest filled bin
+        """
+        if not self.bins:
+            return [], []
+        indices = range(min(self.bins), max(self.bins) + 1)
+        edges = [index * self.width for index in indices]
+        counts = [self.bins.get(index, 0) for index in indices]
+        return edges, counts
+
+    def to_dict(self) -> dict:
+        return {
+            "max_bins": self.max_bins,
+            "exponent": self.exponent,
+            "indices": list(self.bins.keys()),
+            "counts": list(self.bins.values()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Histogram":
+        histogram = cls(data["max_bins"])
+        histogram.exponent = data["exponent"]
+        histogram.bins = dict(zip(data["indices"], data["counts"]))
+        return histogram
+
+    def _fitting_exponent(self, low: float, high: float) -> int:
+        # the bin indices of the values have to stay exactly representable as floats
+        magnitude = max(abs(low), abs(high))
+        exponent = math.frexp(magnitude)[1] - 52 if magnitude > 0 else 0
+        if high > low:
+            exponent = max(exponent, math.ceil(math.log2((high - low) / self.max_bins)))
+        if self.exponent is not None:
+            exponent = max(exponent, self.exponent)
+        return exponent
+
+    def _coarsen(self, exponent: int):
+        shift = exponent - self.exponent
+        if shift <= 0:
+            return
+        bins = {}
+        for index, count in self.bins.items():
+            index = index >> shift
+            bins[index] = bins.get(index, 0) + count
+        self.bins = bins
+        self.exponent = exponent
+
+    def _shrink(self):
+        while self.bins and max(self.bins) - min(self.bins) + 1 > self.max_bins:
+            self._coarsen(self.exponent + 1)
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """
+    Vectorized int.bit_length for uint64 arrays. The halves are converted separately, so the float conversion
+    is exact.
+    """
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    high_bits = np.frexp(high)[1]
+    low_bits = np.frexp(low)[1]
+    return np.where(high > 0, high_bits + 32, low_bits).astype(np.int64)
+
+
+def _encode_array(values: np.ndarray) -> str:
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def _decode_array(data: str, dtype: np.dtype) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype=dtype).copy()
+
+
+def _finite_or_none(value: float) -> Optional[float]:
+    return value if math.isfinite(value) else None
+
+
+def _none_to(value: Optional[float], default: float) -> float:
+    return default if value is None else value
@@ -1,7 +1,9 @@
 import io
 import json
-from typing import Optional, Union
+import warnings
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.io
@@ -9,23 +11,37 @@ from loguru import logger
 from pandas.api.types import is_bool_dtype, is_numeric_dtype
 from plotly.graph_objects import Figure
 
+from station.app.datasets import columnar, figures
+from station.app.datasets.aggregates import ColumnAggregate, TableAggregate
+from station.app.datasets.columnar import COLUMNAR_EXTENSIONS
+from station.app.datasets.figures import HISTOGRAM_BINS, MAX_CATEGORIES
 from station.app.schemas.datasets import DataSetFigure, DataSetStatistics, MinioFile
 
+# number of rows read per batch when computing statistics from a stream
+STATS_CHUNK_SIZE = 100000
+# file extensions that statistics can be computed for
+TABULAR_EXTENSIONS = {"csv", "jsonl", "ndjson", "xlsx", "json"} | COLUMNAR_EXTENSIONS
+# key of the statistics of the whole dataset in the stored summary, the other keys are file names
+DATASET_SUMMARY_KEY = "__dataset__"
 
-def get_dataset_statistics(dataframe: pd.DataFrame) -> Optional[DataSetStatistics]:
+
+def get_dataset_statistics(
+    dataframe: pd.DataFrame, compact_figures: bool = True
+) -> Optional[DataSetStatistics]:
     """
     Computes statistical information of a dataset
     :param dataframe: Dataset as dataframe object
+    :param compact_figures: create figures from precomputed summaries instead of plotly figures of all data points
     :return: Dataset statistics
     """
     if not (isinstance(dataframe, pd.DataFrame)):
         raise TypeError
     shape = dataframe.shape
-    description = dataframe.describe(include="all")
+    profile = profile_columns(dataframe)
 
     n_items = shape[0]
     n_features = shape[1]
-    columns_inf = get_column_information(dataframe, description)
+    columns_inf = get_column_information(dataframe, profile, compact_figures)
 
     schema_data = {
         "n_items": n_items,
@@ -37,33 +53,174 @@ def get_dataset_statistics(dataframe: pd.DataFrame) -> Optional[DataSetStatistic
     return statistics
 
 
-def get_column_information(dataframe: pd.DataFrame, description: pd.DataFrame) -> dict:
+def profile_columns(dataframe: pd.DataFrame) -> Dict[str, dict]:
+    """
+    Summarize all columns of a dataframe with a few vectorized operations over the whole frame instead of separate
+    passes over every column. Numeric columns are reduced as a single two dimensional array, the values of all
+    other columns are hashed once and counted per column.
+    :param dataframe: Dataframe to summarize
+    :return: Dictionary mapping the column titles to their count, nulls, zeros, mean, std, min, max, quartiles and
+        histogram for numeric columns or their count, nulls, unique, top, freq, frequent_values and value_counts for
+        categorical columns
+    """
+    n_rows = len(dataframe)
+    numeric = np.array(
+        [
+            is_numeric_dtype(dtype) and not is_bool_dtype(dtype)
+            for dtype in dataframe.dtypes
+        ],
+        dtype=bool,
+    )
+    profile = {}
+    if numeric.any():
+        profile.update(_profile_numeric(dataframe.iloc[:, numeric], n_rows))
+    if not numeric.all():
+        profile.update(_profile_categorical(dataframe.iloc[:, ~numeric], n_rows))
+    # keep the order of the columns
+    return {title: profile[title] for title in dataframe.columns}
+
+
+def _profile_numeric(dataframe: pd.DataFrame, n_rows: int) -> Dict[str, dict]:
+    values = dataframe.to_numpy(dtype=np.float64, na_value=np.nan)
+    defined = ~np.isnan(values)
+    count = defined.sum(axis=0)
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        # all nan columns and columns with a single value result in nan as in describe
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0, ddof=1)
+        minimum = np.nanmin(values, axis=0)
+        maximum = np.nanmax(values, axis=0)
+        quartiles = np.nanquantile(values, [0.25, 0.5, 0.75], axis=0)
+    zeros = (values == 0).sum(axis=0)
+    edges, counts = _fixed_bin_histograms(values)
+
+    return {
+        title: {
+            "numeric": True,
+            "count": int(count[i]),
+            "nulls": n_rows - int(count[i]),
+            "zeros": int(zeros[i]),
+            "mean": float(mean[i]),
+            "std": float(std[i]),
+            "min": float(minimum[i]),
+            "max": float(maximum[i]),
+            "quartiles": quartiles[:, i].tolist(),
+            "histogram": (edges[i], counts[i]),
+        }
+        for i, title in enumerate(dataframe.columns)
+    }
+
+
+def _fixed_bin_histograms(
+    values: np.ndarray, bins: int = HISTOGRAM_BINS
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Histograms with equal width bins between the finite minimum and maximum of each column of a two dimensional
+    array, computed with a single bincount over all columns
+    """
+    n_columns = values.shape[1]
+    finite = np.isfinite(values)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        low = np.nanmin(np.where(finite, values, np.nan), axis=0)
+        high = np.nanmax(np.where(finite, values, np.nan), axis=0)
+    low = np.nan_to_num(low)
+    width = np.nan_to_num(high - low) / bins
+    # columns with a single value have all values in the first bin
+    scale = np.divide(1, width, out=np.zeros_like(width), where=width > 0)
+
+    with np.errstate(invalid="ignore"):
+        indices = np.clip(((values - low) * scale).astype(np.int64), 0, bins - 1)
+    flat = (indices + np.arange(n_columns) * bins)[finite]
+    counts = np.bincount(flat, minlength=n_columns * bins).reshape(n_columns, bins)
+    edges = low[:, np.newaxis] + width[:, np.newaxis] * np.arange(bins + 1)
+    return edges, counts
+
+
+def _profile_categorical(dataframe: pd.DataFrame, n_rows: int) -> Dict[str, dict]:
+    n_columns = dataframe.shape[1]
+    # values of all columns one column after the other
+    values = dataframe.to_numpy(dtype=object).ravel(order="F")
+    column_codes = np.repeat(np.arange(n_columns), n_rows)
+    defined = ~pd.isna(values)
+    values = values[defined]
+    column_codes = column_codes[defined]
+
+    # count the occurrences of every (column, value) pair, pairs are numbered in the order of their first occurrence
+    value_codes, uniques = pd.factorize(values)
+    pair_codes, pair_keys = pd.factorize(
+        column_codes.astype(np.int64) * max(len(uniques), 1) + value_codes
+    )
+    pair_counts = np.bincount(pair_codes, minlength=len(pair_keys))
+    pair_columns = pair_keys // max(len(uniques), 1)
+    # position of the first occurrence of each pair, to report the values as they appear in their column
+    first = np.ones(len(pair_codes), dtype=bool)
+    first[1:] = pair_codes[1:] > np.maximum.accumulate(pair_codes)[:-1]
+    pair_values = values[first]
+
+    # pairs of each column by descending count, ties in the order of their first occurrence like value_counts
+    order = np.lexsort((np.arange(len(pair_keys)), -pair_counts, pair_columns))
+    unique = np.bincount(pair_columns, minlength=n_columns)
+    count = np.bincount(column_codes, minlength=n_columns)
+    starts = np.concatenate(([0], np.cumsum(unique)[:-1]))
+
+    profile = {}
+    for i, title in enumerate(dataframe.columns):
+        column = {
+            "numeric": False,
+            "count": int(count[i]),
+            "nulls": n_rows - int(count[i]),
+            "unique": int(unique[i]),
+            "top": np.nan,
+            "freq": np.nan,
+        }
+        if unique[i] > 0:
+            top = order[starts[i]]
+            column["top"] = pair_values[top]
+            column["freq"] = int(pair_counts[top])
+        column_pairs = order[starts[i] : starts[i] + min(unique[i], MAX_CATEGORIES)]
+        column["frequent_values"] = [
+            (pair_values[pair], int(pair_counts[pair])) for pair in column_pairs
+        ]
+        if unique[i] < 6:
+            column["value_counts"] = dict(column["frequent_values"])
+        profile[title] = column
+    return profile
+
+
+def get_column_information(
+    dataframe: pd.DataFrame, profile: Dict[str, dict], compact_figures: bool = True
+) -> dict:
     """
     Extract information out of dataframe and summarize it in a dictionary
     :param dataframe: Dataframe to summarize
-    :param description: Dataframe description as dataframe object
+    :param profile: Summary of the columns created by profile_columns
+    :param compact_figures: create figures from the summaries instead of the data points
     :return: Dictionary with column information
     """
     columns_inf = []
     columns = dataframe.columns.values.tolist()
     for i in range(len(columns)):
         title = columns[i]
-        count = description[title]["count"]
+        column_profile = profile[title]
         columns_inf.append({"title": title})
-        nan_count = dataframe[title].isna().sum()
-        if not (is_numeric_dtype(dataframe[title])) or is_bool_dtype(dataframe[title]):
+        if not column_profile["numeric"]:
             # extract information from categorical column
-            columns_inf[i]["not_na_elements"] = count - nan_count
+            columns_inf[i]["not_na_elements"] = (
+                column_profile["count"] - column_profile["nulls"]
+            )
             columns_inf, chart_json = process_categorical_column(
-                dataframe, columns_inf, i, description, title
+                dataframe, columns_inf, i, profile, title, compact_figures
             )
         else:
             # extract information from numerical column
-            zero_count = dataframe[title][dataframe[title] == 0].count()
-            undefined_count = nan_count + zero_count
-            columns_inf[i]["not_na_elements"] = count - undefined_count
+            undefined_count = column_profile["nulls"] + column_profile["zeros"]
+            columns_inf[i]["not_na_elements"] = (
+                column_profile["count"] - undefined_count
+            )
             columns_inf, chart_json = process_numerical_column(
-                dataframe, columns_inf, i, description, title
+                dataframe, columns_inf, i, profile, title, compact_figures
             )
 
         if chart_json is not None:
@@ -76,16 +233,18 @@ def process_numerical_column(
     dataframe: pd.DataFrame,
     columns_inf: dict,
     i: int,
-    description: pd.DataFrame,
+    description: Dict[str, dict],
     title: str,
+    compact_figures: bool = True,
 ) -> tuple[dict, DataSetFigure]:
     """
     Extract information from numerical column and create plot of column data
     :param dataframe: dataset as dataframe object
     :param columns_inf: array containing all information of different columns
     :param i: current column index
-    :param description: description of all dataset columns
+    :param description: summary of all dataset columns created by profile_columns
     :param title: title of column with index i
+    :param compact_figures: create the figure from the summary instead of the data points
     :return: array with column information, key and json to save chart in cache
     """
     columns_inf[i]["type"] = "numeric"
@@ -94,8 +253,25 @@ def process_numerical_column(
     columns_inf[i]["min"] = description[title]["min"]
     columns_inf[i]["max"] = description[title]["max"]
     # create boxplot for numerical data
-    fig = px.box(dataframe, y=title)
-    chart_json = create_figure(fig)
+    if compact_figures:
+        if description[title]["count"] == 0:
+            return columns_inf, None
+        q1, median, q3 = description[title]["quartiles"]
+        edges, counts = description[title]["histogram"]
+        chart_json = figures.numerical_figure(
+            title,
+            description[title]["min"],
+            q1,
+            median,
+            q3,
+            description[title]["max"],
+            description[title]["mean"],
+            edges,
+            counts,
+        )
+    else:
+        fig = px.box(dataframe, y=title)
+        chart_json = create_figure(fig)
     return columns_inf, chart_json
 
 
@@ -103,16 +279,18 @@ def process_categorical_column(
     dataframe: pd.DataFrame,
     columns_inf: dict,
     i: int,
-    description: pd.DataFrame,
+    description: Dict[str, dict],
     title: str,
+    compact_figures: bool = True,
 ) -> tuple[dict, DataSetFigure]:
     """
     Extract information from categorical column and create plot of column data
     :param dataframe: dataset as dataframe object
     :param columns_inf: array containing all information of different columns
     :param i: current column index
-    :param description: description of all dataset columns
+    :param description: summary of all dataset columns created by profile_columns
     :param title: title of column with index i
+    :param compact_figures: create the figure from the summary instead of the data points
     :return: array with column information, key and json to save chart in cache
     """
     count = columns_inf[i]["not_na_elements"]
@@ -143,16 +321,23 @@ def process_categorical_column(
             # pie chart if number of classes is below 6
             # value counts are provided if there are less then 6 classes
             if unique < 6:
-                columns_inf[i]["value_counts"] = dict(dataframe[title].value_counts())
-                fig = px.pie(dataframe, names=title, title=title)
+                columns_inf[i]["value_counts"] = description[title]["value_counts"]
+            if compact_figures:
+                labels, counts = zip(*description[title]["frequent_values"])
+                chart_json = figures.categorical_figure(
+                    title, labels, counts, pie=unique < 6
+                )
+            else:
+                if unique < 6:
+                    fig = px.pie(dataframe, names=title, title=title)
 
-            # histogram if number of classes is greater than 10
-            elif unique >= 6:
-                fig = px.histogram(dataframe, x=title, title=title)
-                fig.update_layout(yaxis_title="Anzahl")
+                # histogram if number of classes is greater than 10
+                elif unique >= 6:
+                    fig = px.histogram(dataframe, x=title, title=title)
+                    fig.update_layout(yaxis_title="Anzahl")
 
-            if fig is not None:
-                chart_json = create_figure(fig)
+                if fig is not None:
+                    chart_json = create_figure(fig)
 
         columns_inf[i]["type"] = column_type
 
@@ -179,20 +364,177 @@ def load_tabular(file: MinioFile, content: bytes) -> pd.DataFrame:
     :return: Dataframe with data from file
     """
 
-    extension = file.file_name.split(".")[-1].lower()
-    print("extension: ", extension)
+    extension = columnar.file_extension(file.file_name)
     if extension == "csv":
         dataframe = pd.read_csv(io.BytesIO(content))
     elif extension == "xlsx":
         dataframe = pd.read_excel(io.BytesIO(content))
     elif extension == "json":
         dataframe = pd.read_json(io.BytesIO(content))
+    elif extension in COLUMNAR_EXTENSIONS:
+        dataframe = columnar.read_columnar(file, io.BytesIO(content))
     else:
         raise TypeError
 
     return dataframe
 
 
+def iter_tabular_chunks(
+    file: MinioFile, stream: BinaryIO, chunk_size: int = STATS_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    Read tabular data from a stream in batches of rows. CSV and JSON lines files are parsed incrementally, parquet
+    and arrow files are read batch by batch and require a seekable stream, other formats can not be split and are
+    loaded at once before being batched
+    :param file: File to load
+    :param stream: Binary stream of the file content
+    :param chunk_size: Number of rows per batch
+    :return: Iterator over dataframes with at most chunk_size rows
+    """
+    extension = columnar.file_extension(file.file_name)
+    if extension in COLUMNAR_EXTENSIONS:
+        yield from columnar.iter_columnar_chunks(file, stream, chunk_size)
+    elif extension == "csv":
+        with pd.read_csv(stream, chunksize=chunk_size) as reader:
+            yield from reader
+    elif extension in {"jsonl", "ndjson"}:
+        with pd.read_json(stream, lines=True, chunksize=chunk_size) as reader:
+            yield from reader
+    elif extension in {"xlsx", "json"}:
+        dataframe = load_tabular(file, stream.read())
+        for start in range(0, max(len(dataframe), 1), chunk_size):
+            yield dataframe.iloc[start : start + chunk_size]
+    else:
+        raise TypeError
+
+
+def get_streaming_statistics(
+    chunks: Iterable[pd.DataFrame],
+) -> Optional[DataSetStatistics]:
+    """
+    Computes statistical information of a dataset in a single pass over batches of rows. Only mergeable aggregates
+    of the columns are kept in memory, so memory usage does not grow with the number of rows
+    :param chunks: Dataset as iterable of dataframes
+    :return: Dataset statistics
+    """
+    return get_aggregate_statistics(get_table_aggregate(chunks))
+
+
+def get_table_aggregate(chunks: Iterable[pd.DataFrame]) -> TableAggregate:
+    """
+    Compute the mergeable aggregates of all columns of a dataset in a single pass over batches of rows
+    :param chunks: Dataset as iterable of dataframes
+    :return: Aggregates of the dataset, which can be persisted and merged with the aggregates of other files
+    """
+    aggregate = TableAggregate()
+    for chunk in chunks:
+        if not (isinstance(chunk, pd.DataFrame)):
+            raise TypeError
+        aggregate.update(chunk)
+    return aggregate
+
+
+def is_tabular(file: MinioFile) -> bool:
+    """
+    Check if statistics can be computed for a file based on its extension
+    :param file: File to check
+    :return: True if the file is in a supported tabular format
+    """
+    return columnar.file_extension(file.file_name) in TABULAR_EXTENSIONS
+
+
+def get_aggregate_statistics(aggregate: TableAggregate) -> DataSetStatistics:
+    """
+    Create the dataset statistics from the aggregates of its columns
+    :param aggregate: Aggregates of all columns of the dataset
+    :return: Dataset statistics
+    """
+    columns_inf = [
+        get_aggregate_column_information(column)
+        for column in aggregate.columns.values()
+    ]
+    schema_data = {
+        "n_items": aggregate.n_items,
+        "n_features": len(aggregate.columns),
+        "column_information": columns_inf,
+    }
+    return DataSetStatistics(**schema_data)
+
+
+def get_aggregate_column_information(column: ColumnAggregate) -> dict:
+    """
+    Summarize the aggregates of a column in the same way as get_column_information summarizes a dataframe column
+    :param column: Aggregates of the column
+    :return: Dictionary with column information
+    """
+    column_inf = {"title": column.title}
+    chart_json = None
+    if column.is_numeric:
+        column_inf["not_na_elements"] = column.count - (column.nulls + column.zeros)
+        column_inf["type"] = "numeric"
+        if column.count > 0:
+            column_inf["mean"] = column.moments.mean
+            column_inf["std"] = column.moments.std
+            column_inf["min"] = column.moments.min
+            column_inf["max"] = column.moments.max
+            # create boxplot from the approximate quantiles
+            edges, counts = column.histogram.edges_and_counts()
+            chart_json = figures.numerical_figure(
+                column.title,
+                column.moments.min,
+                column.quantiles.quantile(0.25),
+                column.quantiles.quantile(0.5),
+                column.quantiles.quantile(0.75),
+                column.moments.max,
+                column.moments.mean,
+                edges,
+                counts,
+            )
+    else:
+        count = column.count - column.nulls
+        column_inf["not_na_elements"] = count
+        unique = column.distinct.estimate()
+        if column.distinct.all_distinct:
+            unique = count
+        elif column.distinct.all_distinct is False:
+            unique = min(unique, count - 1)
+        elif not column.distinct.is_exact:
+            # treat the column as unique if the estimate is within the error of the sketch, only if it is not
+            # known whether the merged files share values
+            error = 3 * column.distinct.hll.relative_error * count
+            unique = count if unique >= count - error else min(unique, count)
+        most_common = column.top.most_common()
+        top, freq = most_common[0] if most_common else (None, 0)
+
+        # if every entry has an unique value (or at most 50 values are given multiple times)
+        if count - 50 < unique <= count:
+            column_inf["type"] = "unique"
+            if unique != count:
+                column_inf["number_of_duplicates"] = count - unique
+        # all elements of column have the same value
+        elif unique == 1:
+            column_inf["type"] = "equal"
+            column_inf["value"] = top
+        else:
+            column_inf["type"] = "categorical"
+            column_inf["number_categories"] = unique
+            column_inf["most_frequent_element"] = top
+            column_inf["frequency"] = freq
+            labels = [value for value, _ in most_common]
+            counts = [value_count for _, value_count in most_common]
+            # pie chart and value counts if number of classes is below 6
+            if unique < 6:
+                column_inf["value_counts"] = dict(most_common)
+            # bar chart of the most frequent classes otherwise
+            chart_json = figures.categorical_figure(
+                column.title, labels, counts, pie=unique < 6
+            )
+
+    if chart_json is not None:
+        column_inf["figure"] = chart_json
+    return column_inf
+
+
 def load_stats(
     stats_json: Union[str, dict] = None, file_name: str = None
 ) -> DataSetStatistics:
@@ -210,14 +552,11 @@ def load_stats(
         stats_json = json.loads(stats_json)
         return DataSetStatistics(**stats_json)
     else:
-        if file_name:
-            file_stats = stats_json.get(file_name)
-            if file_stats is None:
-                logger.warning(f"Statistics for file {file_name} not found")
-                raise ValueError("No statistics available")
-            else:
-                stats = DataSetStatistics(**file_stats)
-                return stats
+        key = file_name if file_name else DATASET_SUMMARY_KEY
+        file_stats = stats_json.get(key)
+        if file_stats is None:
+            logger.warning(f"Statistics for {file_name or 'dataset'} not found")
+            raise ValueError("No statistics available")
         else:
-            stats = DataSetStatistics(**stats_json)
+            stats = DataSetStatistics(**file_stats)
             return stats
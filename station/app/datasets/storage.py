@@ -0,0 +1,118 @@
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional
+
+import pandas as pd
+from loguru import logger
+
+from station.app.config import clients
+from station.app.datasets import statistics
+from station.app.datasets.columnar import (
+    PARQUET_CONTENT_TYPE,
+    columnar_path,
+    is_columnar,
+    read_columnar,
+    write_parquet,
+)
+from station.app.schemas.datasets import MinioFile
+from station.common.constants import DataDirectories
+
+# size of a columnar copy that is kept in memory before it is spooled to disk
+SPOOL_SIZE = 64 * 1024 * 1024
+# user metadata key storing the etag of the file a columnar copy was created from
+SOURCE_ETAG_KEY = "source-etag"
+
+
+def dataset_file_path(item: MinioFile) -> str:
+    """
+    Path of a file relative to the directory of its dataset, files in different folders can share the same name
+    """
+    if not item.full_path:
+        return item.file_name
+    return item.full_path.split("/", 1)[1]
+
+
+@contextmanager
+def open_dataset_file(item: MinioFile) -> Iterator[BinaryIO]:
+    """
+    Open a file of a dataset for reading. Columnar files are opened for random access, so only the needed
+    parts are downloaded, all other files are streamed.
+    """
+    if is_columnar(item):
+        with clients.minio.open_random_access(
+            DataDirectories.DATASETS.value, item.full_path
+        ) as source:
+            yield source
+    else:
+        with clients.minio.open_file(
+            DataDirectories.DATASETS.value, item.full_path
+        ) as stream:
+            yield stream
+
+
+def create_columnar_copy(data_set_id: str, item: MinioFile) -> Optional[MinioFile]:
+    """
+    Store a parquet copy of a csv or xlsx file of a dataset in the columnar directory of the dataset, unless an up
+    to date copy exists. The copy is stored under the path of the file in the dataset.
+    :param data_set_id: id of the dataset
+    :param item: file to convert
+    :return: the stored copy or None if the existing copy is up to date
+    """
+    name = columnar_path(data_set_id, dataset_file_path(item))
+    metadata = clients.minio.get_user_metadata(DataDirectories.DATASETS.value, name)
+    if metadata and item.etag and metadata.get(SOURCE_ETAG_KEY) == item.etag:
+        return None
+
+    logger.info(f"Creating columnar copy of {item.full_path}")
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as sink:
+        with clients.minio.open_file(
+            DataDirectories.DATASETS.value, item.full_path
+        ) as stream:
+            write_parquet(item, stream, sink)
+        sink.seek(0)
+        return clients.minio.put_file_stream(
+            DataDirectories.DATASETS.value,
+            name,
+            sink,
+            content_type=PARQUET_CONTENT_TYPE,
+            metadata={SOURCE_ETAG_KEY: item.etag or ""},
+        )
+
+
+def delete_columnar_copy(data_set_id: str, file_path: str):
+    clients.minio.delete_file(
+        DataDirectories.DATASETS.value, columnar_path(data_set_id, file_path)
+    )
+
+
+def read_dataset_file(
+    data_set_id: str, file_path: str, columns: List[str] = None
+) -> pd.DataFrame:
+    """
+    Load a tabular file of a dataset as dataframe. Columnar files and the columnar copies of csv and xlsx files
+    are read with column projection, the original file is parsed if no copy exists.
+    :param data_set_id: id of the dataset
+    :param file_path: path of the file in the dataset
+    :param columns: optional list of the columns to load
+    :return: Dataframe with the selected columns
+    """
+    file = MinioFile(
+        file_name=file_path.split("/")[-1], full_path=f"{data_set_id}/{file_path}"
+    )
+    if not is_columnar(file):
+        copy = MinioFile(
+            file_name=f"{file.file_name}.parquet",
+            full_path=columnar_path(data_set_id, file_path),
+        )
+        if clients.minio.get_user_metadata(
+            DataDirectories.DATASETS.value, copy.full_path
+        ):
+            file = copy
+
+    if is_columnar(file):
+        with open_dataset_file(file) as source:
+            return read_columnar(file, source, columns)
+
+    content = clients.minio.get_file(DataDirectories.DATASETS.value, file.full_path)
+    dataframe = statistics.load_tabular(file, content)
+    return dataframe[columns] if columns is not None else dataframe
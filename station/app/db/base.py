@@ -9,9 +9,10 @@ from station.app.models.docker_trains import (
     DockerTrainState,
     DockerTrainExecution,
 )  # noqa
-from station.app.models.datasets import DataSet  # noqa
+from station.app.models.datasets import DataSet, DataSetFileStatistics  # noqa
 from station.app.models.fhir_server import FHIRServer  # noqa
 from station.app.models.discovery import DataSetSummary  # noqa
+from station.app.models.minio_objects import MinioObject  # noqa
 from station.app.models.notification import Notification
 from station.app.models.local_trains import (
     LocalTrain,
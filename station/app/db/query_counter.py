@@ -0,0 +1,102 @@
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+# requests executing more statements are logged as warnings
+QUERY_COUNT_WARNING = int(os.getenv("QUERY_COUNT_WARNING", 50))
+
+
+class QueryCounter:
+    """
+    Number of sql statements executed in a context, counters of enclosing contexts count the statements as well
+    """
+
+    def __init__(self, record: bool = False, parent: "QueryCounter" = None):
+        self.count = 0
+        self.record = record
+        self.statements: List[str] = []
+        self.parent = parent
+
+
+_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _counter.get()
+    while counter is not None:
+        counter.count += 1
+        if counter.record:
+            counter.statements.append(statement)
+        counter = counter.parent
+
+
+@contextmanager
+def count_queries(record: bool = False) -> Iterator[QueryCounter]:
+    """
+    Count the sql statements executed in the current context. The context is copied into the threads running sync
+    endpoints, so statements of an endpoint are counted by the request it handles.
+    :param record: keep the executed statements
+    :return: counter of the statements
+    """
+    counter = QueryCounter(record=record, parent=_counter.get())
+    token = _counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _counter.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryCounter]:
+    """
+    Fail if more than the given number of sql statements are executed in the context
+    :param max_queries: maximum number of statements
+    :return: counter of the statements
+    """
+    with count_queries(record=True) as counter:
+        yield counter
+    if counter.count > max_queries:
+        statements = "\n".join(counter.statements)
+        raise AssertionError(
+            f"{counter.count} queries executed, expected at most {max_queries}:\n{statements}"
+        )
+
+
+class QueryCountMiddleware:
+    """
+    Count the sql statements executed per request. The number is returned in the X-Query-Count header and requests
+    exceeding the warning threshold are logged.
+    """
+
+    def __init__(self, app: ASGIApp, warning_threshold: int = QUERY_COUNT_WARNING):
+        self.app = app
+        self.warning_threshold = warning_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as counter:
+
+            async def send_with_count(message: Message):
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers.append(QUERY_COUNT_HEADER, str(counter.count))
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
+
+        if counter.count > self.warning_threshold:
+            logger.warning(
+                f"{scope['method']} {scope['path']} executed {counter.count} sql statements"
+            )
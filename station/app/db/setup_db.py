@@ -12,10 +12,18 @@ def setup_db(dev=False, reset=False):
         reset_db(dev=False)
     else:
         Base.metadata.create_all(bind=engine)
+        create_indexes()
     if dev:
         seed_db_for_testing()
 
 
+def create_indexes():
+    # create_all skips existing tables, so indexes added to their models are created separately
+    for table in Base.metadata.tables.values():
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
 def reset_db(dev=False):
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
@@ -4,7 +4,15 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from station.app.api.api_v1.api import api_router
 from station.app.auth import authorized_user
+from station.app.cache import connect_redis
+from station.app.config import settings
+from station.app.datasets.jobs import statistics_jobs
+from station.app.db.query_counter import QUERY_COUNT_HEADER, QueryCountMiddleware
 from station.app.logger import init_logging
+from station.app.object_index import object_index
+from station.app.token_cache import user_tokens
+from station.common.clients.http import close_http_clients
+from station.common.clients.tokens import stop_token_managers
 
 load_dotenv(find_dotenv())
 
@@ -35,10 +43,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Continuation-Token", QUERY_COUNT_HEADER],
 )
+# report the number of sql statements of every request
+app.add_middleware(QueryCountMiddleware)
 
 app.include_router(
     api_router,
     prefix="/api",
     dependencies=[Depends(authorized_user)],
 )
+
+
+@app.on_event("startup")
+def start_object_index():
+    object_index.start()
+
+
+@app.on_event("startup")
+def connect_token_cache():
+    # validated tokens are shared between the api processes through redis, if it is configured
+    if settings.is_initialized:
+        redis = settings.config.redis
+        user_tokens.redis = connect_redis(
+            redis.host, redis.port, redis.password, redis.db
+        )
+
+
+@app.on_event("shutdown")
+def stop_statistics_jobs():
+    statistics_jobs.shutdown()
+
+
+@app.on_event("shutdown")
+def stop_object_index():
+    object_index.stop()
+
+
+@app.on_event("shutdown")
+async def close_outbound_clients():
+    stop_token_managers()
+    await close_http_clients()
@@ -1,14 +1,25 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import JSON, Column, DateTime, ForeignKey, String
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
 
 from station.app.db.base_class import Base
 
 
 class DataSet(Base):
     __tablename__ = "datasets"
+    __table_args__ = (Index("ix_datasets_created_at_id", "created_at", "id"),)
     id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
     created_at = Column(DateTime, default=datetime.now())
     updated_at = Column(DateTime, nullable=True)
@@ -19,3 +30,27 @@ class DataSet(Base):
     access_path = Column(String, nullable=True)
     fhir_server = Column(UUID, ForeignKey("fhir_servers.id"), nullable=True)
     summary = Column(JSON, nullable=True)
+    file_statistics = relationship(
+        "DataSetFileStatistics", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+
+class DataSetFileStatistics(Base):
+    """
+    Mergeable statistics sketches of a single file of a dataset, the file is identified by its path in the dataset.
+    The etag of the object the sketches were computed from is stored to detect changed files, so only new or changed
+    files need to be processed again.
+    """
+
+    __tablename__ = "dataset_file_statistics"
+    __table_args__ = (UniqueConstraint("dataset_id", "file_name"),)
+    id = Column(Integer, primary_key=True, index=True)
+    dataset_id = Column(
+        UUID(as_uuid=True), ForeignKey("datasets.id", ondelete="CASCADE"), index=True
+    )
+    file_name = Column(String)
+    etag = Column(String, nullable=True)
+    n_items = Column(Integer, default=0)
+    sketches = Column(JSON)
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, nullable=True)
@@ -1,6 +1,15 @@
 from datetime import datetime
 
-from sqlalchemy import JSON, Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -20,6 +29,13 @@ class DockerTrainState(Base):
 
 class DockerTrainExecution(Base):
     __tablename__ = "docker_train_executions"
+    # keyset pagination of all executions and of the executions of a train
+    __table_args__ = (
+        Index("ix_docker_train_executions_start_id", "start", "id"),
+        Index(
+            "ix_docker_train_executions_train_id_start_id", "train_id", "start", "id"
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
     train_id = Column(Integer, ForeignKey("docker_trains.id"))
     # train_state_id = Column(Integer, ForeignKey('docker_train_states.id'), nullable=True)
@@ -46,6 +62,7 @@ class DockerTrainConfig(Base):
 
 class DockerTrain(Base):
     __tablename__ = "docker_trains"
+    __table_args__ = (Index("ix_docker_trains_created_at_id", "created_at", "id"),)
     id = Column(Integer, primary_key=True, index=True)
     train_id = Column(String, unique=True, index=True)
     name = Column(String, nullable=True)
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+
+from station.app.db.base_class import Base
+
+
+class MinioObject(Base):
+    """
+    Index entry of an object stored in minio. The index is updated when files are uploaded or deleted through the
+    station and reconciled with the buckets periodically, so listings and sizes can be queried without listing
+    the buckets.
+    """
+
+    __tablename__ = "minio_objects"
+    __table_args__ = (
+        UniqueConstraint("bucket", "name"),
+        Index("ix_minio_objects_bucket_prefix", "bucket", "prefix"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    bucket = Column(String, nullable=False)
+    # object name and the directory of the object without trailing slash
+    name = Column(String, nullable=False)
+    prefix = Column(String, nullable=False, default="")
+    size = Column(BigInteger, default=0)
+    etag = Column(String, nullable=True)
+    content_type = Column(String, nullable=True)
+    last_modified = Column(DateTime, nullable=True)
+    indexed_at = Column(DateTime, default=datetime.now)
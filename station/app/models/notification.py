@@ -1,12 +1,13 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String
 
 from station.app.db.base_class import Base
 
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (Index("ix_notifications_created_at_id", "created_at", "id"),)
     id = Column(Integer, primary_key=True, index=True)
     target_user = Column(String, default="all")
     topic = Column(String, default="trains")
@@ -0,0 +1,121 @@
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from station.app.config import clients
+from station.app.crud.crud_minio_objects import minio_objects
+from station.app.db.session import SessionLocal
+from station.app.schemas.datasets import MinioFile
+from station.common.constants import DATASET_DERIVED_DIRECTORIES, DataDirectories
+
+# buckets whose objects are indexed in the database
+INDEXED_BUCKETS = (DataDirectories.DATASETS.value, DataDirectories.LOCAL_TRAINS.value)
+# seconds between two reconciliations of the index with the buckets
+RECONCILE_INTERVAL = 15 * 60
+
+
+def reconcile_bucket(
+    db: Session, bucket: str, directory: str = None
+) -> Tuple[int, int, int]:
+    """
+    List a bucket or a directory in it and synchronize the object index with the listing
+    :param db: database session
+    :param bucket: bucket to reconcile
+    :param directory: optional directory to reconcile instead of the whole bucket
+    :return: number of added, updated and removed index entries
+    """
+    objects = clients.minio.iter_dir_items(
+        bucket, directory or "", include_metadata=True
+    )
+    return minio_objects.reconcile(db, bucket, objects, directory=directory)
+
+
+class ObjectIndexReconciler:
+    """
+    Background thread reconciling the object index with the minio buckets in a fixed interval. Uploads and
+    deletions through the station update the index directly, the reconciliation picks up changes made to the
+    buckets by other services. Listings only use the index of a bucket once it was reconciled after the start.
+    """
+
+    def __init__(
+        self,
+        reconcile: Callable[[Session, str], Tuple[int, int, int]] = reconcile_bucket,
+        session_factory: Callable[[], Session] = SessionLocal,
+        buckets: Iterable[str] = INDEXED_BUCKETS,
+        interval: float = RECONCILE_INTERVAL,
+    ):
+        self._reconcile = reconcile
+        self._session_factory = session_factory
+        self._buckets = [
+            bucket.value if isinstance(bucket, DataDirectories) else bucket
+            for bucket in buckets
+        ]
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_reconciled: Dict[str, datetime] = {}
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="object-index", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def is_ready(self, bucket: Union[str, DataDirectories]) -> bool:
+        if isinstance(bucket, DataDirectories):
+            bucket = bucket.value
+        return bucket in self.last_reconciled
+
+    def reconcile_all(self):
+        """
+        Reconcile the index of all buckets, failures are logged and do not affect the other buckets
+        """
+        for bucket in self._buckets:
+            db = self._session_factory()
+            try:
+                added, updated, removed = self._reconcile(db, bucket)
+                self.last_reconciled[bucket] = datetime.now()
+                logger.info(
+                    f"Reconciled object index of {bucket}: {added} added, {updated} updated, {removed} removed"
+                )
+            except Exception as e:
+                logger.error(f"Could not reconcile object index of {bucket}: {e}")
+            finally:
+                db.close()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.reconcile_all()
+            self._stopped.wait(self._interval)
+
+
+object_index = ObjectIndexReconciler()
+
+
+def list_dataset_files(db: Session, data_set_id: str) -> List[MinioFile]:
+    """
+    Get the files uploaded to a dataset, without the columnar copies and shards created from them. The files are
+    listed from the object index once it is reconciled, otherwise from minio.
+    :param db: database session
+    :param data_set_id: id of the dataset
+    :return: List of the files of the dataset ordered by their names
+    """
+    bucket = DataDirectories.DATASETS.value
+    if not object_index.is_ready(bucket):
+        return clients.minio.get_dataset_files(data_set_id)
+    derived = [
+        f"{data_set_id}/{directory}/" for directory in DATASET_DERIVED_DIRECTORIES
+    ]
+    return list(minio_objects.iter_files(db, bucket, data_set_id, exclude=derived))
@@ -0,0 +1,288 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.dependencies.utils import get_typed_signature
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+# responses are served from the cache for at most this many seconds
+RESPONSE_CACHE_TTL = 5
+# maximum number of responses kept in process memory
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_ATTRIBUTE = "__response_cache__"
+ENDPOINT_ATTRIBUTE = "__response_cache_endpoint__"
+REQUEST_PARAMETER = "_response_cache_request"
+
+
+class CachePolicy(NamedTuple):
+    ttl: float
+    # tables the response is read from, writes to these tables remove the response from the cache
+    tags: Tuple[str, ...]
+    # query parameters that cause side effects, requests containing them are never served from the cache
+    bypass: Tuple[str, ...]
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    body: bytes
+    expires_at: float
+    # headers set by the endpoint, e.g. continuation tokens of paginated listings
+    headers: Dict[str, str] = {}
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check the If-None-Match header of a request against the etag of the current response
+    Args:
+        if_none_match: value of the header, a list of etags or *
+        etag: etag of the current response
+
+    Returns:
+        True if the client already has the current response
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison, the representation does not change between encodings
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+class ResponseCache:
+    """
+    Serialized responses of read endpoints keyed by path and query. Every entry is tagged with the tables its
+    response is read from. Invalidating a tag removes all responses read from the table and increments its version,
+    responses computed while the table changed are not stored.
+    """
+
+    def __init__(self, max_size: int = RESPONSE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._tag_keys: Dict[str, Set[str]] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def versions(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    def set(
+        self,
+        key: str,
+        entry: CachedResponse,
+        tags: Tuple[str, ...],
+        versions: Tuple[int, ...],
+    ) -> bool:
+        """
+        Store a response unless one of its tags was invalidated since the response was computed
+        Args:
+            key: path and query of the request
+            entry: the serialized response
+            tags: tables the response is read from
+            versions: versions of the tags before the response was computed
+
+        Returns:
+            True if the response was stored
+        """
+        with self._lock:
+            if tuple(self._versions.get(tag, 0) for tag in tags) != versions:
+                return False
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            for tag in tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, *tags: str):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+                for key in self._tag_keys.pop(tag, ()):
+                    self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tag_keys.clear()
+
+
+response_cache = ResponseCache()
+
+
+def cache_response(
+    ttl: float = RESPONSE_CACHE_TTL,
+    tags: Iterable[str] = (),
+    bypass: Iterable[str] = (),
+) -> Callable:
+    """
+    Mark an endpoint of a router using CachedRoute as cacheable. Has to be applied below the route decorator.
+    Args:
+        ttl: seconds a response is served from the cache
+        tags: tables the response is read from
+        bypass: query parameters with side effects, requests containing them skip the cache
+
+    Returns:
+        Decorator registering the cache policy of the endpoint
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        setattr(
+            endpoint,
+            RESPONSE_CACHE_ATTRIBUTE,
+            CachePolicy(ttl, tuple(tags), tuple(bypass)),
+        )
+        return endpoint
+
+    return decorator
+
+
+def request_key(request: Request) -> str:
+    query = sorted(request.query_params.multi_items())
+    return f"{request.url.path}?{'&'.join(f'{k}={v}' for k, v in query)}"
+
+
+class CachedRoute(APIRoute):
+    """
+    Route serving the responses of endpoints marked with cache_response from the response cache. The endpoint is
+    wrapped, so the dependencies of the route, including authentication, run before a cached response is returned.
+    All responses of cached endpoints carry an etag, requests with a matching If-None-Match header get an empty
+    304 response.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        # routes copied by include_router receive the already wrapped endpoint
+        endpoint = getattr(endpoint, ENDPOINT_ATTRIBUTE, endpoint)
+        policy: Optional[CachePolicy] = getattr(
+            endpoint, RESPONSE_CACHE_ATTRIBUTE, None
+        )
+        if policy is not None:
+            endpoint = self._wrap_endpoint(endpoint, policy)
+        super().__init__(path, endpoint, **kwargs)
+
+    def _wrap_endpoint(self, endpoint: Callable, policy: CachePolicy) -> Callable:
+        is_coroutine = asyncio.iscoroutinefunction(endpoint)
+        signature = get_typed_signature(endpoint)
+        # fastapi ignores headers set on the response parameter if the endpoint returns a response itself
+        response_parameters = [
+            name
+            for name, parameter in signature.parameters.items()
+            if inspect.isclass(parameter.annotation)
+            and issubclass(parameter.annotation, Response)
+        ]
+
+        @functools.wraps(endpoint)
+        async def cached_endpoint(**kwargs) -> Response:
+            request: Request = kwargs.pop(REQUEST_PARAMETER)
+            if any(name in request.query_params for name in policy.bypass):
+                return await self._call_endpoint(
+                    endpoint, is_coroutine, kwargs, response_parameters
+                )
+
+            key = request_key(request)
+            entry = None
+            if "no-cache" not in request.headers.get("cache-control", ""):
+                entry = response_cache.get(key)
+            if entry is None:
+                versions = response_cache.versions(policy.tags)
+                response = await self._call_endpoint(
+                    endpoint, is_coroutine, kwargs, response_parameters
+                )
+                if response.status_code != 200:
+                    return response
+                entry = CachedResponse(
+                    etag=make_etag(response.body),
+                    body=response.body,
+                    expires_at=time.monotonic() + policy.ttl,
+                    headers={
+                        name: value
+                        for name, value in response.headers.items()
+                        if name not in ("content-length", "content-type")
+                    },
+                )
+                response_cache.set(key, entry, policy.tags, versions)
+
+            headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache"}
+            if etag_matches(request.headers.get("if-none-match"), entry.etag):
+                return Response(status_code=304, headers=headers)
+            return Response(
+                content=entry.body, media_type="application/json", headers=headers
+            )
+
+        # the request is passed to the wrapper as an additional keyword only parameter
+        request_parameter = inspect.Parameter(
+            REQUEST_PARAMETER, inspect.Parameter.KEYWORD_ONLY, annotation=Request
+        )
+        cached_endpoint.__signature__ = signature.replace(
+            parameters=[*signature.parameters.values(), request_parameter],
+            return_annotation=inspect.signature(endpoint).return_annotation,
+        )
+        setattr(cached_endpoint, ENDPOINT_ATTRIBUTE, endpoint)
+        return cached_endpoint
+
+    async def _call_endpoint(
+        self,
+        endpoint: Callable,
+        is_coroutine: bool,
+        kwargs: Dict[str, Any],
+        response_parameters: List[str],
+    ) -> Response:
+        if is_coroutine:
+            content = await endpoint(**kwargs)
+        else:
+            content = await run_in_threadpool(endpoint, **kwargs)
+        if isinstance(content, Response):
+            return content
+        content = await serialize_response(
+            field=self.response_field,
+            response_content=content,
+            include=self.response_model_include,
+            exclude=self.response_model_exclude,
+            by_alias=self.response_model_by_alias,
+            exclude_unset=self.response_model_exclude_unset,
+            exclude_defaults=self.response_model_exclude_defaults,
+            exclude_none=self.response_model_exclude_none,
+        )
+        response = JSONResponse(content, status_code=self.status_code or 200)
+        for name in response_parameters:
+            response.raw_headers.extend(
+                header
+                for header in kwargs[name].raw_headers
+                if header[0] != b"content-length"
+            )
+        return response
@@ -30,6 +30,11 @@ class DataType(Enum):
     HYBRID = "hybrid"
 
 
+class DataSetSort(str, Enum):
+    created_at = "created_at"
+    name = "name"
+
+
 class DataSetBase(BaseModel):
     name: str
     data_type: Optional[DataType] = None
@@ -54,6 +59,21 @@ class MinioFile(BaseModel):
     full_path: Optional[str] = None
     size: Optional[int] = None
     updated_at: Optional[datetime] = None
+    etag: Optional[str] = None
+    checksum: Optional[str] = None
+    content_type: Optional[str] = None
+
+
+class ClassDistribution(BaseModel):
+    class_name: str
+    n_items: int = 0
+    size: int = 0
+
+
+class DataSetFilesSummary(BaseModel):
+    n_items: int = 0
+    size: int = 0
+    classes: List[ClassDistribution] = []
 
 
 class FigureData(BaseModel):
@@ -119,6 +139,32 @@ class DataSetStatistics(BaseModel):
         orm_mode = True
 
 
+class StatisticsJobStatus(str, Enum):
+    """
+    Enum for the states of background statistics jobs
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class StatisticsJob(BaseModel):
+    id: str
+    dataset_id: str
+    file_name: Optional[str] = None
+    status: StatisticsJobStatus = StatisticsJobStatus.PENDING
+    files_total: int = 0
+    files_done: int = 0
+    # digest of the paths and etags of the files the job processed
+    files_hash: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
 class DataSet(DataSetBase):
     id: Any
     created_at: datetime
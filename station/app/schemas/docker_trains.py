@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 from typing import Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel, validator
@@ -9,6 +10,20 @@ class DBSchema(BaseModel):
         orm_mode = True
 
 
+class DockerTrainSort(str, Enum):
+    created_at = "created_at"
+    train_id = "train_id"
+
+
+class DockerTrainConfigSort(str, Enum):
+    created_at = "created_at"
+    name = "name"
+
+
+class DockerTrainExecutionSort(str, Enum):
+    start = "start"
+
+
 class DockerTrainState(DBSchema):
     num_executions: Optional[int] = 0
     status: Optional[str] = "inactive"
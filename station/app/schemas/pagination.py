@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class SortOrder(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+class CreatedSort(str, Enum):
+    created_at = "created_at"
@@ -82,6 +82,9 @@ class MinioSettings(BaseModel):
     port: Optional[int] = None
     access_key: str
     secret_key: Union[SecretStr, str]
+    # number of parallel object requests and objects fetched ahead when building archives
+    fetch_concurrency: Optional[int] = None
+    fetch_read_ahead: Optional[int] = None
 
     @property
     def server_url(self) -> str:
@@ -254,6 +257,8 @@ class StationConfig(BaseModel):
             port=config_dict.get("minio").get("port", 9000),
             access_key=config_dict.get("minio").get("admin_user", "minio_admin"),
             secret_key=config_dict.get("minio").get("admin_password"),
+            fetch_concurrency=config_dict.get("minio").get("fetch_concurrency"),
+            fetch_read_ahead=config_dict.get("minio").get("fetch_read_ahead"),
         )
 
         central_settings = CentralUISettings(
@@ -0,0 +1,137 @@
+import json
+
+import pytest
+
+from station.app.cache import INVALIDATION_CHANNEL, Cache
+
+
+class FakePubSub:
+    def __init__(self, server):
+        self.server = server
+
+    def subscribe(self, **handlers):
+        self.server.handlers.append(handlers[INVALIDATION_CHANNEL])
+        return self
+
+    def run_in_thread(self, **kwargs):
+        return self
+
+    def stop(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        self.client.server.round_trips += 1
+        return [
+            getattr(self.client, name)(*args, count=False, **kwargs)
+            for name, args, kwargs in self.commands
+        ]
+
+
+class FakeServer:
+    def __init__(self):
+        self.values = {}
+        self.handlers = []
+        self.round_trips = 0
+
+
+class FakeRedis:
+    """
+    Redis client on a shared in memory server, counting the round trips
+    """
+
+    def __init__(self, server: FakeServer):
+        self.server = server
+
+    def _count(self, count: bool):
+        if count:
+            self.server.round_trips += 1
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def pubsub(self, **kwargs):
+        return FakePubSub(self.server)
+
+    def set(self, key, value, ex=None, count=True):
+        self._count(count)
+        self.server.values[key] = value
+
+    def get(self, key, count=True):
+        self._count(count)
+        return self.server.values.get(key)
+
+    def mget(self, keys, count=True):
+        self._count(count)
+        return [self.server.values.get(key) for key in keys]
+
+    def delete(self, *keys, count=True):
+        self._count(count)
+        for key in keys:
+            self.server.values.pop(key, None)
+
+    def expire(self, key, ttl, count=True):
+        self._count(count)
+
+    def publish(self, channel, message, count=True):
+        self._count(count)
+        for handler in self.server.handlers:
+            handler({"data": message})
+
+    def execute_command(self, command, *args, count=True):
+        self._count(count)
+        if command == "JSON.SET":
+            self.server.values[args[0]] = args[2]
+        elif command == "JSON.MGET":
+            return [self.server.values.get(key) for key in args[:-1]]
+
+
+@pytest.fixture
+def server():
+    return FakeServer()
+
+
+def make_cache(server, near_cache=False) -> Cache:
+    cache = Cache(near_cache=near_cache)
+    cache.redis = FakeRedis(server)
+    return cache
+
+
+def test_batched_operations(server):
+    cache = make_cache(server)
+    cache.mset({"a": "1", "b": "2", "c": "3"}, ttl=60)
+    assert server.round_trips == 1
+    assert cache.mget(["a", "missing", "c"]) == ["1", None, "3"]
+    assert server.round_trips == 2
+
+    # the json value and its expiration are set in one transaction
+    cache.json_set("stats", json.dumps({"n": 1}), ttl=60)
+    assert server.round_trips == 3
+    assert json.loads(cache.json_get("stats")) == {"n": 1}
+
+
+def test_near_cache_invalidation(server):
+    first = make_cache(server, near_cache=True)
+    second = make_cache(server, near_cache=True)
+
+    first.set("key", "value")
+    assert second.get("key") == "value"
+    round_trips = server.round_trips
+    # hot keys are served from process memory
+    assert first.get("key") == "value"
+    assert second.mget(["key"]) == ["value"]
+    assert server.round_trips == round_trips
+
+    # a change in one process drops the key from the near cache of the others
+    first.set("key", "changed")
+    assert second.get("key") == "changed"
+    first.delete("key")
+    assert second.get("key") is None
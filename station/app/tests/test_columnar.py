@@ -0,0 +1,126 @@
+import io
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+import pytest
+
+from station.app.datasets import columnar, statistics, storage
+from station.app.schemas.datasets import MinioFile
+
+
+class FakeMinio:
+    def __init__(self, objects):
+        self.objects = dict(objects)
+        self.metadata = {}
+
+    @contextmanager
+    def open_file(self, bucket, name):
+        yield io.BytesIO(self.objects[name])
+
+    def open_random_access(self, bucket, name):
+        return io.BytesIO(self.objects[name])
+
+    def get_file(self, bucket, name):
+        return self.objects[name]
+
+    def get_user_metadata(self, bucket, name):
+        return self.metadata.get(name) if name in self.objects else None
+
+    def put_file_stream(self, bucket, name, data, content_type=None, metadata=None):
+        self.objects[name] = data.read()
+        self.metadata[name] = metadata
+        return MinioFile(file_name=name.split("/")[-1], full_path=name)
+
+    def delete_file(self, bucket, name):
+        del self.objects[name]
+
+
+@pytest.fixture
+def tabular_data() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n = 5000
+    return pd.DataFrame(
+        {
+            "age": rng.integers(0, 90, n),
+            "bmi": rng.normal(25, 4, n),
+            "sex": rng.choice(["m", "f"], n),
+        }
+    )
+
+
+def test_csv_to_parquet(tabular_data):
+    csv = io.BytesIO(tabular_data.to_csv(index=False).encode())
+    sink = io.BytesIO()
+    columnar.write_parquet(MinioFile(file_name="data.csv"), csv, sink)
+
+    sink.seek(0)
+    copy = MinioFile(file_name="data.csv.parquet")
+    dataframe = columnar.read_columnar(copy, sink, columns=["bmi", "sex"])
+    assert list(dataframe.columns) == ["bmi", "sex"]
+    pd.testing.assert_series_equal(dataframe["bmi"], tabular_data["bmi"])
+
+    with pytest.raises(TypeError):
+        columnar.write_parquet(MinioFile(file_name="data.json"), csv, sink)
+
+
+def test_columnar_statistics(tabular_data):
+    csv_file = MinioFile(file_name="data.csv")
+    csv = io.BytesIO(tabular_data.to_csv(index=False).encode())
+    parquet = io.BytesIO()
+    columnar.write_parquet(csv_file, csv, parquet)
+    arrow = io.BytesIO()
+    feather.write_feather(tabular_data, arrow, chunksize=1200)
+
+    csv.seek(0)
+    expected = statistics.get_streaming_statistics(
+        statistics.iter_tabular_chunks(csv_file, csv, chunk_size=1000)
+    )
+    for name, source in (("data.parquet", parquet), ("data.arrow", arrow)):
+        source.seek(0)
+        chunks = list(
+            statistics.iter_tabular_chunks(
+                MinioFile(file_name=name), source, chunk_size=1000
+            )
+        )
+        assert max(len(chunk) for chunk in chunks) <= 1000
+        stats = statistics.get_streaming_statistics(chunks)
+        assert stats.n_items == expected.n_items
+        for column, expected_column in zip(
+            stats.column_information, expected.column_information
+        ):
+            column = column.dict(exclude={"figure"})
+            for key, value in expected_column.dict(exclude={"figure"}).items():
+                if isinstance(value, float):
+                    assert column[key] == pytest.approx(value)
+                else:
+                    assert column[key] == value
+
+
+def test_columnar_copies_of_files_in_folders(monkeypatch, tabular_data):
+    parts = {"a": tabular_data.head(10), "b": tabular_data.tail(5)}
+    minio = FakeMinio(
+        {
+            f"dataset/{folder}/data.csv": part.to_csv(index=False).encode()
+            for folder, part in parts.items()
+        }
+    )
+    monkeypatch.setattr(storage, "clients", SimpleNamespace(minio=minio))
+
+    for folder in parts:
+        item = MinioFile(
+            file_name="data.csv", full_path=f"dataset/{folder}/data.csv", etag=folder
+        )
+        assert storage.create_columnar_copy("dataset", item)
+        assert storage.create_columnar_copy("dataset", item) is None
+
+    # the copies are read instead of the original files
+    for folder, part in parts.items():
+        del minio.objects[f"dataset/{folder}/data.csv"]
+        dataframe = storage.read_dataset_file("dataset", f"{folder}/data.csv", ["age"])
+        assert dataframe["age"].tolist() == part["age"].tolist()
+
+    storage.delete_columnar_copy("dataset", "a/data.csv")
+    assert list(minio.objects) == ["dataset/_columnar/b/data.csv.parquet"]
@@ -0,0 +1,275 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from station.app.datasets import statistics
+from station.app.datasets.aggregates import TableAggregate
+from station.app.datasets.sketches import (
+    DistinctCounter,
+    Histogram,
+    HyperLogLog,
+    Moments,
+    TDigest,
+    TopK,
+)
+from station.app.schemas.datasets import MinioFile
+
+
+@pytest.fixture
+def tabular_data() -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    n = 20000
+    df = pd.DataFrame(
+        {
+            "age": rng.integers(0, 90, n).astype(float),
+            "bmi": rng.normal(25, 4, n),
+            "sex": rng.choice(["m", "f"], n),
+            "id": [f"patient-{i}" for i in range(n)],
+            "site": rng.choice([f"site-{i}" for i in range(12)], n),
+            "constant": ["x"] * n,
+        }
+    )
+    df.loc[rng.choice(n, 500), "bmi"] = np.nan
+    df.loc[rng.choice(n, 300), "sex"] = np.nan
+    return df
+
+
+def test_moments_merge():
+    rng = np.random.default_rng(0)
+    values = rng.normal(10, 3, 10000)
+
+    moments = Moments()
+    for batch in np.array_split(values, 7):
+        moments.update(batch)
+
+    assert moments.count == len(values)
+    assert moments.mean == pytest.approx(values.mean())
+    assert moments.std == pytest.approx(values.std(ddof=1))
+    assert moments.min == values.min()
+    assert moments.max == values.max()
+
+
+def test_tdigest_quantiles():
+    rng = np.random.default_rng(0)
+    values = rng.exponential(2, 100000)
+
+    digest = TDigest()
+    other = TDigest()
+    for i, batch in enumerate(np.array_split(values, 10)):
+        (digest if i % 2 else other).update(batch)
+    digest.merge(other)
+
+    assert len(digest.means) <= digest.compression
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        assert digest.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.02)
+
+
+def test_distinct_counts():
+    rng = np.random.default_rng(0)
+
+    values = pd.Series(rng.integers(0, 100, 5000)).astype(str)
+    counter = DistinctCounter()
+    counter.update(values)
+    assert counter.is_exact
+    assert counter.estimate() == values.nunique()
+
+    values = pd.Series(np.arange(200000)).astype(str)
+    counter = DistinctCounter(exact_limit=1000)
+    for batch in np.array_split(values, 4):
+        counter.update(batch)
+    assert not counter.is_exact
+    assert counter.estimate() == pytest.approx(200000, rel=0.05)
+
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
+
+
+def test_all_distinct_flag():
+    def persisted(values, **kwargs):
+        counter = DistinctCounter(**kwargs)
+        counter.update(pd.Series(values).astype(str))
+        return DistinctCounter.from_dict(counter.to_dict())
+
+    # the exact set is not persisted, the flag is
+    first = persisted(np.arange(5000))
+    assert not first.is_exact and first.all_distinct
+    merged = DistinctCounter()
+    merged.merge(first)
+    assert merged.all_distinct
+
+    # the overlap of two files without exact sets is unknown
+    merged.merge(persisted(np.arange(5000, 10000)))
+    assert merged.all_distinct is None
+    merged.merge(persisted([1, 1]))
+    assert merged.all_distinct is False
+
+    # duplicates are detected while the exact sets are kept
+    merged = DistinctCounter()
+    merged.merge(persisted(np.arange(100)))
+    merged.merge(persisted(np.arange(99, 200)))
+    assert merged.is_exact and merged.all_distinct is False
+
+    counter = DistinctCounter(exact_limit=1000)
+    for batch in np.array_split(np.arange(3000), 3):
+        counter.update(pd.Series(batch).astype(str))
+    assert not counter.is_exact and counter.all_distinct is None
+    # sketches persisted without the flag
+    data = first.to_dict()
+    del data["all_distinct"]
+    assert DistinctCounter.from_dict(data).all_distinct is None
+
+
+def test_merged_unique_columns():
+    ids = [str(i) for i in range(3000)]
+    data = pd.DataFrame({"id": ids, "duplicate": ids[:-1] + ["0"]})
+    aggregate = TableAggregate.from_dict(
+        json.loads(json.dumps(statistics.get_table_aggregate([data]).to_dict()))
+    )
+    merged = statistics.get_aggregate_statistics(TableAggregate.merge_all([aggregate]))
+    columns = {column.title: column for column in merged.column_information}
+
+    assert columns["id"].type == "unique"
+    assert columns["id"].number_of_duplicates is None
+    # the duplicate is known, even though the estimate is within the error of the sketch
+    assert columns["duplicate"].number_of_duplicates >= 1
+
+
+def test_top_k():
+    top = TopK(capacity=5)
+    top.update(pd.Series(["a", "b", "a", "c"]))
+    top.update(pd.Series(["a", "c"]))
+    assert top.is_exact
+    assert top.most_common(2) == [("a", 3), ("c", 2)]
+
+    top.update(pd.Series([str(i) for i in range(100)] + ["a"] * 50))
+    assert not top.is_exact
+    assert top.most_common(1)[0][0] == "a"
+
+
+def test_streaming_statistics(tabular_data):
+    stream = io.BytesIO(tabular_data.to_csv(index=False).encode())
+    file = MinioFile(file_name="data.csv")
+
+    chunks = statistics.iter_tabular_chunks(file, stream, chunk_size=3000)
+    streamed = statistics.get_streaming_statistics(chunks)
+    expected = statistics.get_dataset_statistics(tabular_data)
+
+    assert streamed.n_items == expected.n_items
+    assert streamed.n_features == expected.n_features
+    for column, expected_column in zip(
+        streamed.column_information, expected.column_information
+    ):
+        column = column.dict(exclude={"figure"})
+        expected_column = expected_column.dict(exclude={"figure"})
+        assert column.keys() == expected_column.keys()
+        for key, value in column.items():
+            if isinstance(value, float):
+                assert value == pytest.approx(expected_column[key])
+            else:
+                assert value == expected_column[key]
+
+
+def test_iter_tabular_chunks_unsupported():
+    with pytest.raises(TypeError):
+        list(
+            statistics.iter_tabular_chunks(
+                MinioFile(file_name="data.bin"), io.BytesIO(b"")
+            )
+        )
+
+
+def test_histogram_merge():
+    rng = np.random.default_rng(0)
+    values = rng.normal(0, 100, 10000)
+
+    histogram = Histogram()
+    other = Histogram()
+    histogram.update(values[:5000])
+    other.update(values[5000:] * 10)
+    histogram.merge(other)
+
+    edges, counts = histogram.edges_and_counts()
+    assert len(counts) <= histogram.max_bins
+    assert sum(counts) == len(values)
+    assert edges[0] <= min(values.min(), (values[5000:] * 10).min())
+
+
+def test_aggregate_serialization(tabular_data):
+    chunks = [
+        tabular_data.iloc[i : i + 7000] for i in range(0, len(tabular_data), 7000)
+    ]
+    aggregate = statistics.get_table_aggregate(chunks)
+    data = json.loads(json.dumps(aggregate.to_dict(), allow_nan=False))
+    restored = TableAggregate.from_dict(data)
+
+    assert restored.to_dict() == aggregate.to_dict()
+    assert statistics.get_aggregate_statistics(
+        restored
+    ) == statistics.get_aggregate_statistics(aggregate)
+
+
+def test_merged_file_statistics(tabular_data):
+    files = [tabular_data.iloc[i : i + 5000] for i in range(0, len(tabular_data), 5000)]
+    # the last file is missing a column, its values count as missing in the merged statistics
+    files[-1] = files[-1].drop(columns=["bmi"])
+    aggregates = [
+        TableAggregate.from_dict(
+            json.loads(json.dumps(statistics.get_table_aggregate([f]).to_dict()))
+        )
+        for f in files
+    ]
+
+    merged = statistics.get_aggregate_statistics(TableAggregate.merge_all(aggregates))
+    expected = statistics.get_dataset_statistics(pd.concat(files))
+
+    assert merged.n_items == expected.n_items
+    for column, expected_column in zip(
+        merged.column_information, expected.column_information
+    ):
+        assert column.title == expected_column.title
+        assert column.type == expected_column.type
+        assert column.not_na_elements == expected_column.not_na_elements
+        if column.type == "numeric":
+            assert column.mean == pytest.approx(expected_column.mean)
+            assert column.std == pytest.approx(expected_column.std)
+
+
+def test_profile_columns(tabular_data):
+    tabular_data["flag"] = tabular_data["age"] > 45
+    profile = statistics.profile_columns(tabular_data)
+    description = tabular_data.describe(include="all")
+
+    assert list(profile) == list(tabular_data.columns)
+    for title, column in profile.items():
+        assert column["count"] == description[title]["count"]
+        assert column["nulls"] == tabular_data[title].isna().sum()
+        if column["numeric"]:
+            assert column["zeros"] == (tabular_data[title] == 0).sum()
+            for key in ("mean", "std", "min", "max"):
+                assert column[key] == pytest.approx(description[title][key])
+        else:
+            assert column["unique"] == description[title]["unique"]
+            assert column["top"] == description[title]["top"]
+            assert column["freq"] == description[title]["freq"]
+    assert profile["sex"]["value_counts"] == dict(tabular_data["sex"].value_counts())
+    assert "value_counts" not in profile["site"]
+
+
+def test_compact_figures(tabular_data):
+    small = statistics.get_dataset_statistics(tabular_data.iloc[:2000])
+    large = statistics.get_dataset_statistics(tabular_data)
+
+    for small_column, column in zip(small.column_information, large.column_information):
+        if column.figure is None:
+            continue
+        # the figures only contain summaries, their size does not grow with the data
+        assert len(column.figure.json()) < 2 * len(small_column.figure.json())
+        for trace in column.figure.fig_data.data:
+            assert trace["type"] in {"box", "bar", "pie"}
+
+    box, histogram = large.column_information[1].figure.fig_data.data
+    assert box["median"][0] == pytest.approx(tabular_data["bmi"].median())
+    assert sum(histogram["y"]) == tabular_data["bmi"].count()
@@ -0,0 +1,159 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from station.app import object_index
+from station.app.crud.crud_minio_objects import minio_objects
+from station.app.models.minio_objects import MinioObject
+from station.app.object_index import ObjectIndexReconciler, list_dataset_files
+from station.app.schemas.datasets import MinioFile
+
+BUCKET = "datasets"
+
+
+def make_file(name: str, size: int = 10, etag: str = "etag") -> MinioFile:
+    return MinioFile(
+        file_name=name.split("/")[-1], full_path=name, size=size, etag=etag
+    )
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    MinioObject.__table__.create(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_reconcile(db):
+    files = [make_file(f"dataset/{cls}/{i}.png") for cls in "ab" for i in range(3)]
+    assert minio_objects.reconcile(db, BUCKET, files) == (6, 0, 0)
+
+    # one file changed, one removed and one added
+    files[0] = make_file(files[0].full_path, size=20, etag="changed")
+    files = files[:-1] + [make_file("dataset/c/0.png")]
+    assert minio_objects.reconcile(db, BUCKET, files) == (1, 1, 1)
+    assert minio_objects.reconcile(db, BUCKET, files) == (0, 0, 0)
+
+    # reconciling a directory does not remove the entries of other directories
+    minio_objects.add_files(db, BUCKET, [make_file("other/data.csv")])
+    assert minio_objects.reconcile(db, BUCKET, files, directory="dataset") == (0, 0, 0)
+    assert [f.full_path for f in minio_objects.iter_files(db, BUCKET, "other")] == [
+        "other/data.csv"
+    ]
+
+
+def test_concurrent_inserts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'index.db'}")
+    MinioObject.__table__.create(bind=engine)
+    factory = sessionmaker(bind=engine)
+    db, upload_db = factory(), factory()
+
+    def listing():
+        # an upload indexes a listed object after the reconciliation read the index
+        minio_objects.add_files(upload_db, BUCKET, [make_file("dataset/a.png")])
+        yield make_file("dataset/a.png", etag="listed")
+        yield make_file("dataset/b.png")
+
+    assert minio_objects.reconcile(db, BUCKET, listing()) == (2, 0, 0)
+    files = list(minio_objects.iter_files(db, BUCKET, "dataset"))
+    assert [(f.full_path, f.etag) for f in files] == [
+        ("dataset/a.png", "listed"),
+        ("dataset/b.png", "etag"),
+    ]
+    db.close()
+    upload_db.close()
+
+
+def test_listing_and_summary(db):
+    files = [make_file(f"dataset/images/{i:02d}.png") for i in range(15)]
+    files += [
+        make_file("dataset/labels.csv", size=5),
+        make_file("dataset/_columnar/labels.csv.parquet", size=3),
+        make_file("dataset_2/data.csv"),
+    ]
+    minio_objects.add_files(db, BUCKET, files)
+
+    names, token = [], None
+    while True:
+        page, token = minio_objects.list_page(
+            db,
+            BUCKET,
+            "dataset",
+            limit=4,
+            continuation_token=token,
+            exclude="dataset/_columnar/",
+        )
+        names.extend(f.full_path for f in page)
+        if not token:
+            break
+    assert names == sorted(f.full_path for f in files[:16])
+
+    summary = minio_objects.get_summary(
+        db, BUCKET, "dataset", exclude="dataset/_columnar/"
+    )
+    assert summary.n_items == 16
+    assert summary.size == 155
+    assert [(c.class_name, c.n_items, c.size) for c in summary.classes] == [
+        ("images", 15, 150)
+    ]
+
+    minio_objects.remove_objects(db, BUCKET, ["dataset/labels.csv"])
+    minio_objects.remove_directory(db, BUCKET, "dataset/images")
+    assert [f.full_path for f in minio_objects.iter_files(db, BUCKET, "dataset")] == [
+        "dataset/_columnar/labels.csv.parquet"
+    ]
+
+
+def test_reconciler_readiness():
+    reconciled = []
+
+    def reconcile(db, bucket):
+        if bucket == "broken":
+            raise ConnectionError("minio not reachable")
+        reconciled.append(bucket)
+        return 0, 0, 0
+
+    class FakeSession:
+        def close(self):
+            pass
+
+    reconciler = ObjectIndexReconciler(
+        reconcile=reconcile,
+        session_factory=FakeSession,
+        buckets=["datasets", "broken"],
+    )
+    assert not reconciler.is_ready("datasets")
+    reconciler.reconcile_all()
+    assert reconciled == ["datasets"]
+    assert reconciler.is_ready("datasets")
+    assert not reconciler.is_ready("broken")
+
+
+def test_list_dataset_files(db, monkeypatch):
+    listed = [make_file("dataset/minio.csv")]
+    minio = SimpleNamespace(get_dataset_files=lambda data_set_id: listed)
+    monkeypatch.setattr(object_index, "clients", SimpleNamespace(minio=minio))
+    monkeypatch.setattr(object_index.object_index, "last_reconciled", {})
+    minio_objects.add_files(
+        db,
+        BUCKET,
+        [
+            make_file("dataset/b/data.csv"),
+            make_file("dataset/a.csv"),
+            make_file("dataset/_shards/shard-000000.tar"),
+            make_file("dataset/_columnar/a.csv.parquet"),
+        ],
+    )
+
+    # minio is listed until the index is reconciled
+    assert list_dataset_files(db, "dataset") == listed
+    object_index.object_index.last_reconciled[BUCKET] = datetime.now()
+    assert [f.full_path for f in list_dataset_files(db, "dataset")] == [
+        "dataset/a.csv",
+        "dataset/b/data.csv",
+    ]
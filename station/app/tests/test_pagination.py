@@ -0,0 +1,97 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from station.app.crud.crud_notifications import notifications
+from station.app.models.notification import Notification
+from station.app.schemas.pagination import SortOrder
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Notification.__table__.create(bind=engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2023, 1, 1)
+    for i in range(25):
+        # rows share creation times, the primary key orders them
+        session.add(
+            Notification(
+                message=f"message {i}",
+                topic="trains" if i % 2 else "datasets",
+                created_at=start + timedelta(minutes=i // 3),
+            )
+        )
+    session.commit()
+    yield session
+    session.close()
+
+
+def read_all(db, **kwargs):
+    items, token, pages = [], None, 0
+    while True:
+        page, token = notifications.get_page(
+            db, limit=4, continuation_token=token, **kwargs
+        )
+        items.extend(page)
+        pages += 1
+        if token is None:
+            return items, pages
+
+
+def test_keyset_pages(db):
+    items, pages = read_all(db)
+    assert pages == 7
+    assert [item.id for item in items] == [
+        item.id for item in notifications.get_multi(db, limit=None)
+    ]
+    assert len({item.id for item in items}) == 25
+
+    items, _ = read_all(db, order=SortOrder.asc, filters={"topic": "trains"})
+    assert [item.id for item in items] == list(range(2, 26, 2))
+
+    items, _ = read_all(db, sort="id", order=SortOrder.asc, skip=1)
+    # every page skips the row after the continuation token
+    assert [item.id for item in items] == [i for i in range(1, 26) if i % 5 != 1]
+
+
+def test_invalid_pages(db):
+    _, token = notifications.get_page(db, limit=4)
+    with pytest.raises(ValueError):
+        notifications.get_page(db, continuation_token=token, order=SortOrder.asc)
+    with pytest.raises(ValueError):
+        notifications.get_page(db, continuation_token="not-a-token")
+    # well formed tokens with sort keys of the wrong shape or type
+    for values in (5, [1], ["2023-01-01", 1, 2], [1, 1]):
+        token = base64.urlsafe_b64encode(
+            json.dumps(["created_at", "desc", values]).encode()
+        ).decode()
+        with pytest.raises(ValueError):
+            notifications.get_page(db, continuation_token=token)
+    with pytest.raises(ValueError):
+        notifications.get_page(db, filters={"unknown": 1})
+    with pytest.raises(ValueError):
+        notifications.get_page(db, sort="unknown")
+
+
+def test_keyset_pages_with_null_sort_values(db):
+    for notification in db.query(Notification).all():
+        notification.title = None if notification.id % 3 else f"t{notification.id % 4}"
+    db.commit()
+
+    for order in SortOrder:
+        items, _ = read_all(db, sort="title", order=order)
+        assert len({item.id for item in items}) == 25
+        assert [item.id for item in items] == [
+            item.id
+            for item in notifications.get_multi(
+                db, limit=None, sort="title", order=order
+            )
+        ]
+        # rows without a title are listed last in both directions
+        assert all(item.title is None for item in items[8:])
+        assert all(item.title is not None for item in items[:8])
@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from station.app.crud.crud_docker_trains import TRAIN_RELATIONSHIPS, docker_trains
+from station.app.db.base_class import Base
+from station.app.db.query_counter import (
+    QUERY_COUNT_HEADER,
+    QueryCountMiddleware,
+    assert_max_queries,
+    count_queries,
+)
+from station.app.models import datasets  # noqa: F401
+from station.app.models.docker_trains import (
+    DockerTrain,
+    DockerTrainConfig,
+    DockerTrainExecution,
+    DockerTrainState,
+)
+from station.app.schemas.docker_trains import DockerTrain as DockerTrainSchema
+
+
+@compiles(UUID, "sqlite")
+def compile_uuid(element, compiler, **kwargs):
+    return "CHAR(36)"
+
+
+@pytest.fixture
+def session_factory():
+    # the connection is shared with the threads running sync endpoints
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [DockerTrainConfig, DockerTrain, DockerTrainState, DockerTrainExecution]
+    Base.metadata.create_all(engine, tables=[model.__table__ for model in tables])
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    for i in range(50):
+        train = DockerTrain(train_id=f"train-{i}", created_at=datetime.now())
+        train.state = DockerTrainState(status="active")
+        train.executions = [DockerTrainExecution(start=datetime.now()) for _ in "ab"]
+        db.add(train)
+    db.commit()
+    db.close()
+    return factory
+
+
+def test_train_relationships_are_eager_loaded(session_factory):
+    db = session_factory()
+    with assert_max_queries(2):
+        page, _ = docker_trains.get_page(db, limit=100, options=TRAIN_RELATIONSHIPS)
+        trains = [DockerTrainSchema.from_orm(train) for train in page]
+    assert len(trains) == 50
+    assert all(len(train.executions) == 2 and train.state for train in trains)
+    db.close()
+
+    db = session_factory()
+    with count_queries() as counter:
+        page, _ = docker_trains.get_page(db, limit=100)
+        [DockerTrainSchema.from_orm(train) for train in page]
+    # one query per train and relationship without loader options
+    assert counter.count == 101
+    db.close()
+
+    with pytest.raises(AssertionError):
+        with assert_max_queries(0):
+            session_factory().query(DockerTrain).first()
+
+
+def test_query_count_middleware(session_factory):
+    app = FastAPI()
+    app.add_middleware(QueryCountMiddleware)
+
+    @app.get("/trains")
+    def list_trains():
+        db = session_factory()
+        try:
+            return [train.train_id for train in docker_trains.get_multi(db, limit=3)]
+        finally:
+            db.close()
+
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            return await c.get("/trains")
+
+    with count_queries() as counter:
+        response = asyncio.run(request())
+    assert response.json() == ["train-49", "train-48", "train-47"]
+    # statements of sync endpoints running in the threadpool are counted
+    assert response.headers[QUERY_COUNT_HEADER] == "1"
+    assert counter.count == 1
@@ -0,0 +1,103 @@
+import asyncio
+from typing import List
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Response
+from pydantic import BaseModel
+
+from station.app.response_cache import (
+    CachedResponse,
+    CachedRoute,
+    ResponseCache,
+    cache_response,
+    response_cache,
+)
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+def make_app(calls: dict) -> FastAPI:
+    def authorized():
+        calls["auth"] += 1
+
+    router = APIRouter(route_class=CachedRoute)
+
+    @router.get("", response_model=List[Item])
+    @cache_response(tags=("items",), bypass=("sync",))
+    def list_items(response: Response, limit: int = 10, sync: bool = False):
+        calls["list"] += 1
+        response.headers["X-Continuation-Token"] = str(limit)
+        return [
+            {"id": i, "name": f"item-{i}", "secret": "hidden"} for i in range(limit)
+        ]
+
+    @router.get("/{item_id}", response_model=Item)
+    @cache_response(tags=("items",))
+    def get_item(item_id: int):
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    app = FastAPI()
+    app.include_router(router, prefix="/items", dependencies=[Depends(authorized)])
+    return app
+
+
+def request(app: FastAPI, *requests) -> List[httpx.Response]:
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            return [await c.get(url, headers=headers) for url, headers in requests]
+
+    return asyncio.run(send())
+
+
+def test_cached_route():
+    response_cache.clear()
+    calls = {"auth": 0, "list": 0}
+    app = make_app(calls)
+
+    first, second, other_query = request(
+        app, ("/items", {}), ("/items", {}), ("/items?limit=2", {})
+    )
+    assert first.status_code == 200
+    assert first.json()[0] == {"id": 0, "name": "item-0"}
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.headers["x-continuation-token"] == "10"
+    assert len(other_query.json()) == 2
+    # dependencies run for every request, the endpoint only once per query
+    assert calls == {"auth": 3, "list": 2}
+
+    (not_modified,) = request(
+        app, ("/items", {"If-None-Match": f'W/{first.headers["etag"]}'})
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert calls["list"] == 2
+
+    response_cache.invalidate("items")
+    _, synced, missing = request(
+        app, ("/items", {}), ("/items?sync=true", {}), ("/items/1", {})
+    )
+    assert synced.status_code == 200
+    assert missing.status_code == 404
+    assert calls["list"] == 4
+
+
+def test_invalidated_responses_are_not_stored():
+    cache = ResponseCache(max_size=2)
+    entry = CachedResponse(etag='"a"', body=b"[]", expires_at=float("inf"))
+
+    versions = cache.versions(("items",))
+    cache.invalidate("items")
+    assert not cache.set("/items?", entry, ("items",), versions)
+    assert cache.get("/items?") is None
+
+    for key in ("/a?", "/b?", "/c?"):
+        assert cache.set(key, entry, ("items",), cache.versions(("items",)))
+    assert cache.get("/a?") is None
+    assert cache.get("/c?") == entry
+    cache.invalidate("items")
+    assert cache.get("/c?") is None
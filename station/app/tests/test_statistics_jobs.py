@@ -0,0 +1,143 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from station.app.datasets import jobs
+from station.app.datasets.jobs import StatisticsJobQueue
+from station.app.schemas.datasets import MinioFile, StatisticsJobStatus
+
+
+class FakeSession:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def sessions():
+    return []
+
+
+def make_queue(run, sessions) -> StatisticsJobQueue:
+    def session_factory():
+        session = FakeSession()
+        sessions.append(session)
+        return session
+
+    return StatisticsJobQueue(run=run, session_factory=session_factory, max_workers=1)
+
+
+def test_job_progress(sessions):
+    def run(db, job):
+        job.files_total = 3
+        for _ in range(3):
+            job.files_done += 1
+
+    queue = make_queue(run, sessions)
+    job = queue.submit("dataset", "data.csv")
+    job = queue.wait(job.id, timeout=5)
+    queue.shutdown(wait=True)
+
+    assert job.status == StatisticsJobStatus.COMPLETED
+    assert job.files_done == job.files_total == 3
+    assert job.started_at <= job.finished_at
+    assert queue.find_active("dataset", "data.csv") is None
+    assert all(session.closed for session in sessions)
+
+
+def test_failed_job(sessions):
+    def run(db, job):
+        raise TypeError("Unsupported file")
+
+    queue = make_queue(run, sessions)
+    job = queue.wait(queue.submit("dataset").id, timeout=5)
+    queue.shutdown(wait=True)
+
+    assert job.status == StatisticsJobStatus.FAILED
+    assert job.error == "Unsupported file"
+
+
+def test_failed_job_is_reported_until_files_change(sessions):
+    items = [MinioFile(file_name="data.csv", full_path="dataset/data.csv", etag="a")]
+    files_hash = jobs.get_files_hash(items)
+
+    def run(db, job):
+        job.files_hash = files_hash
+        raise TypeError("Unsupported file")
+
+    queue = make_queue(run, sessions)
+    job = queue.wait(queue.submit("dataset", "data.csv").id, timeout=5)
+
+    assert queue.find_failed("dataset", "data.csv", files_hash).id == job.id
+    assert queue.find_failed("dataset", None, files_hash) is None
+    changed = [items[0].copy(update={"etag": "b"})]
+    assert (
+        queue.find_failed("dataset", "data.csv", jobs.get_files_hash(changed)) is None
+    )
+
+    # a newer job replaces the failed one
+    queue._run = lambda db, job: None
+    queue.wait(queue.submit("dataset", "data.csv").id, timeout=5)
+    queue.shutdown(wait=True)
+    assert queue.find_failed("dataset", "data.csv", files_hash) is None
+
+
+def test_files_hash():
+    items = [
+        MinioFile(file_name="a.csv", full_path="dataset/a.csv", etag="1"),
+        MinioFile(file_name="a.csv", full_path="dataset/sub/a.csv", etag="2"),
+    ]
+    assert jobs.get_files_hash(items) == jobs.get_files_hash(items[::-1])
+    assert jobs.get_files_hash(items) != jobs.get_files_hash(items[:1])
+
+
+def test_pending_jobs_are_reused(sessions):
+    started = threading.Event()
+    release = threading.Event()
+
+    def run(db, job):
+        started.set()
+        release.wait(5)
+
+    queue = make_queue(run, sessions)
+    running = queue.submit("dataset")
+    started.wait(5)
+    # the running job might miss new files, so another job is queued
+    pending = queue.submit("dataset")
+    assert pending.id != running.id
+    assert queue.submit("dataset").id == pending.id
+    assert queue.find_active("dataset").id == pending.id
+
+    release.set()
+    queue.wait(pending.id, timeout=5)
+    queue.shutdown(wait=True)
+    assert queue.get(running.id).status == StatisticsJobStatus.COMPLETED
+    assert queue.get(pending.id).status == StatisticsJobStatus.COMPLETED
+
+
+def test_sketches_are_identified_by_path(monkeypatch):
+    stored = [
+        SimpleNamespace(file_name="a/data.csv", etag="1"),
+        SimpleNamespace(file_name="removed.csv", etag="1"),
+    ]
+    removed = []
+    monkeypatch.setattr(jobs.datasets, "get_file_statistics", lambda db, _: stored)
+    monkeypatch.setattr(
+        jobs.datasets,
+        "remove_file_statistics",
+        lambda db, _, file_names: removed.extend(file_names),
+    )
+    items = [
+        MinioFile(
+            file_name="data.csv", full_path=f"dataset/{folder}/data.csv", etag="1"
+        )
+        for folder in "ab"
+    ]
+
+    tabular, outdated = jobs.split_outdated_files(None, "dataset", items)
+    assert tabular == items
+    # the file of the same name in another folder has no sketches yet
+    assert outdated == items[1:]
+    assert removed == ["removed.csv"]
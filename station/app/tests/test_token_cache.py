@@ -0,0 +1,82 @@
+import base64
+import json
+import time
+
+from station.app.schemas.users import User
+from station.app.token_cache import INVALID_TOKEN, UserTokenCache, token_expiration
+
+
+class FakeCache:
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, ttl=3600):
+        self.values[key] = value
+
+    def get(self, key):
+        return self.values.get(key)
+
+
+def make_user(name: str = "admin") -> User:
+    return User(
+        id="user-id",
+        name=name,
+        active=True,
+        created_at="2023-01-01T00:00:00",
+        realm_id="master",
+        display_name=name,
+        name_locked=False,
+    )
+
+
+def make_jwt(exp: float) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode())
+    return f"header.{payload.decode().rstrip('=')}.signature"
+
+
+def test_cached_user_and_expiry():
+    cache = UserTokenCache(ttl=300)
+    assert cache.get("token") is None
+
+    cache.set_user("token", make_user())
+    cached = cache.get("token")
+    assert cached == make_user()
+    # callers get a copy of the cached user
+    cached.name = "changed"
+    assert cache.get("token").name == "admin"
+
+    # the entry does not outlive the expiration of the token
+    expiring = make_jwt(time.time() + 2)
+    assert token_expiration(expiring) is not None
+    cache.set_user(expiring, make_user())
+    entry = cache._get_local(next(reversed(cache._entries)))
+    assert entry[0] <= time.time() + 2
+
+    expired = make_jwt(time.time() - 1)
+    cache.set_user(expired, make_user())
+    assert cache.get(expired) is None
+
+
+def test_invalid_tokens_and_size():
+    cache = UserTokenCache(invalid_ttl=30, max_size=2)
+    cache.set_invalid("bad")
+    assert cache.get("bad") is INVALID_TOKEN
+
+    cache.set_user("first", make_user("first"))
+    cache.set_user("second", make_user("second"))
+    assert cache.get("bad") is None
+    assert cache.get("first").name == "first"
+
+
+def test_shared_through_redis():
+    redis = FakeCache()
+    first = UserTokenCache(redis=redis)
+    second = UserTokenCache(redis=redis)
+
+    first.set_user("token", make_user())
+    first.set_invalid("bad")
+    # tokens are stored by their hash only
+    assert "user-token-token" not in redis.values
+
+    assert second.get("token") == make_user()
+    assert second.get("bad") is INVALID_TOKEN
@@ -0,0 +1,174 @@
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+
+from loguru import logger
+
+from station.app.cache import Cache
+from station.app.schemas.users import User
+
+# maximum time a validated token is trusted without asking the auth server again
+TOKEN_CACHE_TTL = 300
+# time invalid tokens are rejected without asking the auth server again
+INVALID_TOKEN_TTL = 30
+# maximum number of tokens kept in process memory
+TOKEN_CACHE_SIZE = 10_000
+TOKEN_CACHE_PREFIX = "user-token-"
+
+
+class InvalidToken:
+    """
+    Marker of a cached invalid token
+    """
+
+
+INVALID_TOKEN = InvalidToken()
+
+
+def token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def token_expiration(token: str) -> Optional[float]:
+    """
+    Read the expiration time of a jwt from its payload. The signature is not checked, the token is validated by the
+    auth server before its user is cached.
+    Args:
+        token: the bearer token
+
+    Returns:
+        Unix timestamp of the expiration or None if the token is not a jwt with an exp claim
+    """
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4))
+        exp = json.loads(payload).get("exp")
+    except (ValueError, AttributeError):
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+class UserTokenCache:
+    """
+    Cache of validated user tokens. Entries are keyed by the hash of the token, so tokens are never stored. The user
+    of a valid token is cached until the token expires, at most for the ttl. Invalid tokens are cached for a shorter
+    time to reject repeated requests with the same token without asking the auth server. Entries are kept in process
+    memory and, if a redis cache is given, shared with other processes through redis.
+    """
+
+    def __init__(
+        self,
+        ttl: int = TOKEN_CACHE_TTL,
+        invalid_ttl: int = INVALID_TOKEN_TTL,
+        max_size: int = TOKEN_CACHE_SIZE,
+        redis: Cache = None,
+    ):
+        self.ttl = ttl
+        self.invalid_ttl = invalid_ttl
+        self.max_size = max_size
+        self.redis = redis
+        self._entries: "OrderedDict[str, Tuple[float, Optional[User]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Union[User, InvalidToken, None]:
+        """
+        Get the cached validation result of a token
+        Args:
+            token: the bearer token
+
+        Returns:
+            A copy of the user of a valid token, INVALID_TOKEN for an invalid token or None if the token is not cached
+        """
+        key = token_hash(token)
+        entry = self._get_local(key)
+        if entry is None:
+            entry = self._get_redis(key)
+            if entry is None:
+                return None
+            self._set_local(key, entry)
+        user = entry[1]
+        return user.copy() if user else INVALID_TOKEN
+
+    def set_user(self, token: str, user: User):
+        expires_at = time.time() + self.ttl
+        token_expires_at = token_expiration(token)
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        self._set(token_hash(token), (expires_at, user))
+
+    def set_invalid(self, token: str):
+        self._set(token_hash(token), (time.time() + self.invalid_ttl, None))
+
+    def invalidate(self, token: str):
+        key = token_hash(token)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.redis:
+            try:
+                self.redis.redis.delete(TOKEN_CACHE_PREFIX + key)
+            except Exception as e:
+                logger.warning(f"Could not remove token from redis: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _set(self, key: str, entry: Tuple[float, Optional[User]]):
+        ttl = int(entry[0] - time.time())
+        if ttl <= 0:
+            return
+        self._set_local(key, entry)
+        if self.redis:
+            value = json.dumps(
+                {
+                    "expires_at": entry[0],
+                    "user": json.loads(entry[1].json()) if entry[1] else None,
+                }
+            )
+            try:
+                self.redis.set(TOKEN_CACHE_PREFIX + key, value, ttl)
+            except Exception as e:
+                logger.warning(f"Could not cache token in redis: {e}")
+
+    def _get_local(self, key: str) -> Optional[Tuple[float, Optional[User]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _set_local(self, key: str, entry: Tuple[float, Optional[User]]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _get_redis(self, key: str) -> Optional[Tuple[float, Optional[User]]]:
+        if not self.redis:
+            return None
+        try:
+            value = self.redis.get(TOKEN_CACHE_PREFIX + key)
+        except Exception as e:
+            logger.warning(f"Could not read token from redis: {e}")
+            return None
+        if not value:
+            return None
+        value = json.loads(value)
+        if value["expires_at"] <= time.time():
+            return None
+        user = User(**value["user"]) if value["user"] else None
+        return value["expires_at"], user
+
+
+user_tokens = UserTokenCache()
@@ -169,6 +169,9 @@ def update_train_after_run(
     db.refresh(execution)
 
     db.commit()
+    docker_trains.invalidate_cache(
+        dtm.DockerTrainState.__tablename__, dtm.DockerTrainExecution.__tablename__
+    )
 
     return db_train
 
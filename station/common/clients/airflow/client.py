@@ -1,10 +1,10 @@
 import os
 
-import requests
 from loguru import logger
 from requests.auth import HTTPBasicAuth
 
 from station.app.schemas.station_status import HealthStatus
+from station.common.clients.http import get_async_client, get_session
 
 
 class AirflowClient:
@@ -26,6 +26,7 @@ class AirflowClient:
             airflow_password if airflow_password else os.getenv("AIRFLOW_PW", "admin")
         )
         self.auth = HTTPBasicAuth(self.airflow_user, self.airflow_pw)
+        self.session = get_session("airflow")
 
     def trigger_dag(self, dag_id: str, config: dict = None) -> str:
         """
@@ -44,7 +45,7 @@ class AirflowClient:
             config_msg["conf"] = config
 
         url = self.airflow_url + f"dags/{dag_id}/dagRuns"
-        r = requests.post(url=url, auth=self.auth, json=config_msg)
+        r = self.session.post(url=url, auth=self.auth, json=config_msg)
         try:
             r.raise_for_status()
 
@@ -59,13 +60,13 @@ class AirflowClient:
 
     def get_all_dag_runs(self, dag_id: str):
         url = self.airflow_url + f"dags/{dag_id}/dagRuns"
-        r = requests.get(url=url, auth=self.auth)
+        r = self.session.get(url=url, auth=self.auth)
         r.raise_for_status()
         return r.json()
 
     def get_dags(self):
         url = self.airflow_url + "dags"
-        r = requests.get(url=url, auth=self.auth)
+        r = self.session.get(url=url, auth=self.auth)
         r.raise_for_status()
 
         return r.json()
@@ -73,7 +74,7 @@ class AirflowClient:
     # TODO create arguments for individual connection options
     def create_connection(self, connection_dict: dict):
         url = self.airflow_url + "connections"
-        r = requests.post(url=url, json=connection_dict)
+        r = self.session.post(url=url, json=connection_dict)
         r.raise_for_status()
 
     def health_check(self) -> HealthStatus:
@@ -82,7 +83,7 @@ class AirflowClient:
         @return: dict: Airflow Status
         """
         url = self.airflow_url + "/health"
-        r = requests.get(url=url)
+        r = self.session.get(url=url)
         try:
             r.raise_for_status()
             return HealthStatus.healthy
@@ -90,6 +91,19 @@ class AirflowClient:
             logger.error(f"Error checking airflow health: \n{e}")
             return HealthStatus.error
 
+    async def health_check_async(self) -> HealthStatus:
+        """
+        Async variant of health_check for async endpoints, the event loop is not blocked while waiting for airflow
+        """
+        url = self.airflow_url + "/health"
+        try:
+            r = await get_async_client("airflow").get(url)
+            r.raise_for_status()
+            return HealthStatus.healthy
+        except Exception as e:
+            logger.error(f"Error checking airflow health: \n{e}")
+            return HealthStatus.error
+
     def get_run_information(self, dag_id: str, run_id: str) -> dict:
         """
         requests the information about a dag run state from airflow.
@@ -98,11 +112,11 @@ class AirflowClient:
         @return: dict: information about the run
         """
         url = self.airflow_url + f"dags/{dag_id}/dagRuns/{run_id}/taskInstances"
-        task_list = requests.get(url=url, auth=self.auth)
+        task_list = self.session.get(url=url, auth=self.auth)
         task_list.raise_for_status()
         task_list = task_list.json()
         url = self.airflow_url + f"dags/{dag_id}/dagRuns/{run_id}"
-        information = requests.get(url=url, auth=self.auth)
+        information = self.session.get(url=url, auth=self.auth)
         information.raise_for_status()
         information = information.json()
         information["tasklist"] = task_list
@@ -138,7 +152,7 @@ class AirflowClient:
                 self.airflow_url
                 + f"dags/{dag_id}/dagRuns/{run_id}/taskInstances/{task_id}/logs/{try_number}"
             )
-            log = requests.get(url=url, auth=self.auth)
+            log = self.session.get(url=url, auth=self.auth)
             log.raise_for_status()
             return log.content.decode("utf-8")
         else:
@@ -13,6 +13,7 @@ class CentralApiClient(BaseClient):
             robot_id=robot_id,
             robot_secret=robot_secret,
             auth_url=f"{base_url}/auth",
+            service="central",
         )
         self.base_url = base_url
 
@@ -23,7 +24,7 @@ class CentralApiClient(BaseClient):
         filters = f"filter[station_id]={station_id}&include=train"
         safe_filters = self._make_url_safe(filters)
         url = url + safe_filters
-        response = requests.get(url, headers=self.headers)
+        response = self.session.get(url, headers=self.headers)
         response.raise_for_status()
         return response.json()
 
@@ -37,7 +38,7 @@ class CentralApiClient(BaseClient):
         )
         safe_filters = self._make_url_safe(filters)
         url = url + safe_filters
-        r = requests.get(url, headers=self.headers)
+        r = self.session.get(url, headers=self.headers)
         try:
             r.raise_for_status()
         except requests.exceptions.HTTPError as e:
@@ -63,7 +64,7 @@ class CentralApiClient(BaseClient):
 
     def _get_registry_url(self, registry_id: Any) -> str:
         url = self.api_url + f"/registries/{registry_id}"
-        r = requests.get(url, headers=self.headers)
+        r = self.session.get(url, headers=self.headers)
         r.raise_for_status()
         return r.json()["host"]
 
@@ -72,7 +73,7 @@ class CentralApiClient(BaseClient):
         filters = "fields=+account_id,+account_name,+account_secret"
         safe_filters = self._make_url_safe(filters)
         url = url + safe_filters
-        r = requests.get(url, headers=self.headers)
+        r = self.session.get(url, headers=self.headers)
         try:
             r.raise_for_status()
         except Exception as e:
@@ -83,6 +84,6 @@ class CentralApiClient(BaseClient):
     def update_public_key(self, station_id: Any, public_key: str) -> dict:
         url = self.api_url + f"/stations/{station_id}"
         payload = {"public_key": public_key}
-        r = requests.post(url, headers=self.headers, json=payload)
+        r = self.session.post(url, headers=self.headers, json=payload)
         r.raise_for_status()
         return r.json()
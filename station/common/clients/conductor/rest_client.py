@@ -1,9 +1,10 @@
 import os
 from typing import Any, Dict
 
-import requests
 from sqlalchemy.orm import Session
 
+from station.common.clients.http import get_session
+
 
 class ConductorRESTClient:
     def __init__(self, conductor_url: str = None, station_id: int = None):
@@ -14,6 +15,7 @@ class ConductorRESTClient:
 
         assert self.conductor_url
         assert self.station_id
+        self.session = get_session("conductor")
 
     def get_model_for_train(self, train_id: Any, db: Session):
         """
@@ -25,7 +27,7 @@ class ConductorRESTClient:
         """
 
         url = self.conductor_url + f"/api/trains/{train_id}/model"
-        r = requests.get(url=url)
+        r = self.session.get(url=url)
         return r.json()
 
     def upload_model_parameters(self, train_id: Any):
@@ -36,13 +38,13 @@ class ConductorRESTClient:
 
     def get_available_trains(self):
         url = self.conductor_url + f"/api/stations/{self.station_id}/trains"
-        r = requests.get(url)
+        r = self.session.get(url)
         r.raise_for_status()
         return r.json()
 
     def post_discovery_results(self, train_id: Any, discovery_results: Dict):
         url = self.conductor_url + f"/api/trains/{train_id}/discovery"
-        r = requests.post(url, json=discovery_results)
+        r = self.session.post(url, json=discovery_results)
         print(r.request.body)
         r.raise_for_status()
         return r.json()
@@ -5,6 +5,8 @@ from requests.auth import HTTPBasicAuth
 from train_lib.clients.fhir import build_query_string
 from train_lib.clients.fhir.fhir_client import BearerAuth
 
+from station.common.clients.http import get_session
+
 
 class FhirClient:
     def __init__(
@@ -32,6 +34,7 @@ class FhirClient:
         self.token = token if token else os.getenv("FHIR_TOKEN")
         self.server_type = server_type if server_type else os.getenv("FHIR_SERVER_TYPE")
         self.output_format = None
+        self.session = get_session("fhir")
         # Check for correct initialization based on env vars or constructor parameters
         if not (self.username and self.password) and self.token:
             raise ValueError("Only one of username:pw or token auth can be selected")
@@ -49,7 +52,7 @@ class FhirClient:
         response = {"status": None, "date": None, "name": None}
         try:
             # TODO remove verify false only for thesting becouse of verificaion problems with the ibm fhir server
-            r = requests.get(api_url, auth=auth, verify=False)
+            r = self.session.get(api_url, auth=auth, verify=False)
             r.raise_for_status()
             r_json = r.json()
 
@@ -68,7 +71,7 @@ class FhirClient:
     def get_number_of_resource(self):
         api_url = self._generate_api_url() + "/Resource?_count=0"
         auth = self._generate_auth()
-        r = requests.get(api_url, auth=auth, verify=False).json()
+        r = self.session.get(api_url, auth=auth, verify=False).json()
         return r["total"]
 
     def _generate_url(
@@ -1,10 +1,13 @@
 import os
 from typing import List, Union
 
+import httpx
 import requests
+from loguru import logger
 
 from station.app.schemas.local_trains import LocalTrainMasterImageBase
 from station.app.schemas.station_status import HealthStatus
+from station.common.clients.http import get_async_client, get_session
 
 
 class HarborClient:
@@ -25,6 +28,7 @@ class HarborClient:
 
         self.password = password if password else os.getenv("HARBOR_PW")
         assert self.password
+        self.session = get_session("harbor")
 
     def get_artifacts_for_station(
         self, station_id: Union[str, int] = None
@@ -35,7 +39,9 @@ class HarborClient:
         assert station_id
 
         endpoint = f"/projects/station_{station_id}/repositories/"
-        r = requests.get(self.api_url + endpoint, auth=(self.username, self.password))
+        r = self.session.get(
+            self.api_url + endpoint, auth=(self.username, self.password)
+        )
         results = r.json()
         print(results)
 
@@ -46,7 +52,7 @@ class HarborClient:
                     print("Getting repositories on next page.")
                     url = r.links["next"]["url"]
                     new_endpoint = url[9:]
-                    r = requests.get(
+                    r = self.session.get(
                         self.api_url + new_endpoint, auth=(self.username, self.password)
                     )
                     new_results = r.json()
@@ -65,7 +71,9 @@ class HarborClient:
         returns names of master images form harbor
         """
         endpoint = "/projects/master/repositories"
-        r = requests.get(self.api_url + endpoint, auth=(self.username, self.password))
+        r = self.session.get(
+            self.api_url + endpoint, auth=(self.username, self.password)
+        )
         master_images = []
         for repo in r.json():
             project, group, artifact = repo["name"].split("/")
@@ -88,7 +96,7 @@ class HarborClient:
         """
         url = self.api_url + "/health"
         try:
-            r = requests.get(url=url, auth=(self.username, self.password))
+            r = self.session.get(url=url, auth=(self.username, self.password))
             if r and r.status_code == 200:
                 return HealthStatus.healthy
             else:
@@ -97,5 +105,20 @@ class HarborClient:
             print(e)
         return HealthStatus.error
 
+    async def health_check_async(self) -> HealthStatus:
+        """
+        Async variant of health_check for async endpoints
+        """
+        url = self.api_url + "/health"
+        try:
+            r = await get_async_client("harbor").get(
+                url, auth=(self.username, self.password)
+            )
+            if r.status_code == 200:
+                return HealthStatus.healthy
+        except httpx.TransportError as e:
+            logger.error(f"Error checking harbor health: {e}")
+        return HealthStatus.error
+
 
 harbor_client = None
@@ -0,0 +1,181 @@
+import asyncio
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# connect and read timeouts of outbound requests in seconds
+DEFAULT_TIMEOUT = (5.0, 30.0)
+SERVICE_TIMEOUTS: Dict[str, Tuple[float, float]] = {
+    "auth": (5.0, 10.0),
+    "airflow": (5.0, 30.0),
+    "harbor": (5.0, 30.0),
+    "central": (5.0, 60.0),
+    "station": (5.0, 60.0),
+    "fhir": (5.0, 120.0),
+}
+# maximum number of keep alive connections per host
+POOL_SIZE = 20
+RETRY_TOTAL = 3
+# delay before the n-th retry is backoff * 2 ** (n - 1) seconds
+RETRY_BACKOFF = 0.5
+RETRY_STATUS = frozenset({429, 502, 503, 504})
+# only requests without side effects are retried after the server received them
+RETRY_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class ServiceSession(requests.Session):
+    """
+    Requests session of a service with a default timeout for every request
+    """
+
+    def __init__(self, timeout: Tuple[float, float] = DEFAULT_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def make_session(
+    timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+    retries: int = RETRY_TOTAL,
+    backoff: float = RETRY_BACKOFF,
+    pool_size: int = POOL_SIZE,
+) -> ServiceSession:
+    """
+    Create a session keeping connections alive in a pool, failed idempotent requests are retried with exponential
+    backoff.
+    Args:
+        timeout: connect and read timeout of the requests
+        retries: maximum number of retries of a request
+        backoff: backoff factor of the delay between retries
+        pool_size: maximum number of connections kept alive per host
+
+    Returns:
+        The configured session
+    """
+    session = ServiceSession(timeout)
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=RETRY_METHODS,
+        # the response of the last attempt is returned and checked by the caller
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class AsyncServiceClient:
+    """
+    Async http client of a service for use in async endpoints. Connections are pooled, connection errors are retried
+    by the transport and idempotent requests are retried on the retry status codes with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        retries: int = RETRY_TOTAL,
+        backoff: float = RETRY_BACKOFF,
+        pool_size: int = POOL_SIZE,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        connect, read = timeout
+        limits = httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        )
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read, connect=connect),
+            transport=httpx.AsyncHTTPTransport(retries=retries, limits=limits),
+        )
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        attempt = 0
+        while True:
+            response = await self.client.request(method, url, **kwargs)
+            if (
+                response.status_code not in RETRY_STATUS
+                or method.upper() not in RETRY_METHODS
+                or attempt >= self.retries
+            ):
+                return response
+            await response.aclose()
+            await asyncio.sleep(self.backoff * 2**attempt)
+            attempt += 1
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_sessions: Dict[str, ServiceSession] = {}
+# async clients are bound to the event loop they were created in
+_async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def get_session(service: str) -> ServiceSession:
+    """
+    Get the session shared by all clients of a service in this process
+    Args:
+        service: name of the service, selects the timeouts of the session
+
+    Returns:
+        Pooled session of the service
+    """
+    with _lock:
+        session = _sessions.get(service)
+        if session is None:
+            session = make_session(SERVICE_TIMEOUTS.get(service, DEFAULT_TIMEOUT))
+            _sessions[service] = session
+        return session
+
+
+def get_async_client(service: str) -> AsyncServiceClient:
+    """
+    Get the async client of a service shared in the running event loop
+    Args:
+        service: name of the service, selects the timeouts of the client
+
+    Returns:
+        Pooled async client of the service
+    """
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(service)
+    if client is None:
+        client = AsyncServiceClient(SERVICE_TIMEOUTS.get(service, DEFAULT_TIMEOUT))
+        clients[service] = client
+    return client
+
+
+async def close_http_clients():
+    """
+    Close the shared sessions and the async clients of the running event loop
+    """
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+    clients: Optional[Dict[str, AsyncServiceClient]] = _async_clients.pop(
+        asyncio.get_running_loop(), None
+    )
+    for client in (clients or {}).values():
+        await client.aclose()
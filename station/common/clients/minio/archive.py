@@ -0,0 +1,128 @@
+import tarfile
+import time
+import zipfile
+from typing import Iterable, Iterator, NamedTuple
+
+# size of the chunks read from minio and emitted by the archive writers
+ARCHIVE_CHUNK_SIZE = 1024 * 1024
+
+ARCHIVE_MEDIA_TYPES = {
+    "tar": "application/x-tar",
+    "zip": "application/zip",
+}
+
+
+class ArchiveEntry(NamedTuple):
+    """
+    A single member of a streamed archive. The chunks are consumed lazily, so the underlying object is only opened
+    once the writer reaches this entry.
+    """
+
+    name: str
+    size: int
+    chunks: Iterable[bytes]
+
+
+class _ArchiveSink:
+    """
+    Write only file object that collects the bytes produced by an archive writer until they are drained.
+    It does not support seeking, which forces zipfile to write data descriptors instead of rewriting headers.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def iter_archive(
+    entries: Iterable[ArchiveEntry], archive_type: str = "tar"
+) -> Iterator[bytes]:
+    """
+    Stream an archive of the given entries block by block. Memory usage is bounded by the chunk size of the entries,
+    independent of the number or size of the archived files.
+    Args:
+        entries: iterable of archive entries, consumed lazily in order
+        archive_type: tar or zip
+
+    Returns:
+        Iterator over the bytes of the archive
+    """
+    if archive_type == "tar":
+        return _iter_tar(entries)
+    elif archive_type == "zip":
+        return _iter_zip(entries)
+
+    raise ValueError(f"Unknown archive type {archive_type}")
+
+
+def _iter_tar(entries: Iterable[ArchiveEntry]) -> Iterator[bytes]:
+    written = 0
+    for entry in entries:
+        info = tarfile.TarInfo(name=entry.name)
+        info.size = entry.size
+        info.mtime = time.time()
+        header = info.tobuf(tarfile.DEFAULT_FORMAT, tarfile.ENCODING, "surrogateescape")
+        written += len(header)
+        yield header
+
+        size = 0
+        for chunk in entry.chunks:
+            size += len(chunk)
+            yield chunk
+        if size != entry.size:
+            raise ValueError(
+                f"Size of {entry.name} changed while archiving: expected {entry.size}, read {size}"
+            )
+
+        written += size
+        remainder = size % tarfile.BLOCKSIZE
+        if remainder:
+            padding = tarfile.BLOCKSIZE - remainder
+            written += padding
+            yield tarfile.NUL * padding
+
+    # end of archive marker and padding to a full record, same as tarfile.TarFile.close()
+    end = tarfile.NUL * (tarfile.BLOCKSIZE * 2)
+    written += len(end)
+    remainder = written % tarfile.RECORDSIZE
+    if remainder:
+        end += tarfile.NUL * (tarfile.RECORDSIZE - remainder)
+    yield end
+
+
+def _iter_zip(entries: Iterable[ArchiveEntry]) -> Iterator[bytes]:
+    sink = _ArchiveSink()
+    with zipfile.ZipFile(sink, "w") as archive:
+        for entry in entries:
+            info = zipfile.ZipInfo(
+                entry.name, date_time=time.localtime(time.time())[:6]
+            )
+            info.file_size = entry.size
+            with archive.open(info, "w") as member:
+                for chunk in entry.chunks:
+                    member.write(chunk)
+                    yield from _drain(sink)
+            yield from _drain(sink)
+    yield from _drain(sink)
+
+
+def _drain(sink: _ArchiveSink) -> Iterator[bytes]:
+    data = sink.drain()
+    if data:
+        yield data
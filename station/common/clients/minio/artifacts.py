@@ -0,0 +1,296 @@
+import hashlib
+import io
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+from pydantic import BaseModel
+
+from station.common.clients.minio.client import MinioClient
+from station.common.constants import DataDirectories
+
+CHECKPOINT_DIRECTORY = "checkpoints"
+CHECKPOINT_INDEX_NAME = "index.json"
+CHECKPOINT_DATA_NAME = "tensors.bin"
+# size of the chunks tensors are compressed and uploaded in
+CHECKPOINT_CHUNK_SIZE = 4 * 1024 * 1024
+CHECKPOINT_COMPRESSION = "zlib"
+
+
+class CheckpointTensor(BaseModel):
+    name: str
+    dtype: str
+    shape: List[int]
+    sha256: str
+    # data object containing the tensor, tensors unchanged since the base checkpoint reference its data object
+    object_name: str
+    offset: int
+    size: int
+    compression: Optional[str] = None
+
+
+class Checkpoint(BaseModel):
+    train_id: str
+    round: int
+    created_at: datetime
+    base_round: Optional[int] = None
+    # bytes stored for this checkpoint, without the tensors referenced from the base checkpoint
+    stored_size: int = 0
+    tensors: List[CheckpointTensor] = []
+
+
+def checkpoint_directory(train_id: str, round: int) -> str:
+    return f"{train_id}/{CHECKPOINT_DIRECTORY}/{round:06d}"
+
+
+class TensorStreamReader(io.RawIOBase):
+    """
+    Read only stream over the encoded tensors of a checkpoint. Tensors are encoded one at a time while the stream
+    is read, so uploading a checkpoint holds at most one compressed chunk in memory besides the tensors themselves.
+    Tensors whose content matches a tensor of the base checkpoint are not written again, their entry references the
+    data of the base checkpoint.
+    """
+
+    def __init__(
+        self,
+        tensors: Iterable[Tuple[str, np.ndarray]],
+        object_name: str,
+        base: Dict[str, CheckpointTensor] = None,
+        compression: Optional[str] = None,
+        level: int = 1,
+        chunk_size: int = CHECKPOINT_CHUNK_SIZE,
+    ):
+        self.object_name = object_name
+        self.entries: List[CheckpointTensor] = []
+        self.size = 0
+        self._base = base or {}
+        self._compression = compression
+        self._level = level
+        self._chunk_size = chunk_size
+        self._chunks = self._iter_chunks(iter(tensors))
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = memoryview(chunk)
+        length = min(len(buffer), len(self._pending))
+        buffer[:length] = self._pending[:length]
+        self._pending = self._pending[length:]
+        return length
+
+    def _iter_chunks(
+        self, tensors: Iterator[Tuple[str, np.ndarray]]
+    ) -> Iterator[bytes]:
+        for name, tensor in tensors:
+            # a flat byte view, memoryviews of arrays without elements can not be cast
+            data = memoryview(np.ascontiguousarray(tensor).reshape(-1).view(np.uint8))
+            sha256 = hashlib.sha256(data).hexdigest()
+            entry = CheckpointTensor(
+                name=name,
+                dtype=tensor.dtype.str,
+                shape=list(tensor.shape),
+                sha256=sha256,
+                object_name=self.object_name,
+                offset=self.size,
+                size=0,
+                compression=self._compression,
+            )
+            base = self._base.get(name)
+            if base and (base.sha256, base.dtype, base.shape) == (
+                entry.sha256,
+                entry.dtype,
+                entry.shape,
+            ):
+                self.entries.append(base.copy(update={"name": name}))
+                continue
+
+            compressor = (
+                zlib.compressobj(self._level) if self._compression == "zlib" else None
+            )
+            for start in range(0, len(data), self._chunk_size):
+                chunk = data[start : start + self._chunk_size]
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                entry.size += len(chunk)
+                yield chunk
+            if compressor:
+                chunk = compressor.flush()
+                entry.size += len(chunk)
+                yield chunk
+            self.size += entry.size
+            self.entries.append(entry)
+
+
+class ModelArtifactStore:
+    """
+    Versioned checkpoints of trains in the models bucket. Every checkpoint of a train and round consists of a data
+    object with the concatenated, optionally compressed tensors and an index with the location of every tensor.
+    Checkpoints are stored as deltas of the previous round, unchanged tensors are only stored once. Tensors are read
+    with range requests, so workers can load a subset of the tensors of a checkpoint.
+    """
+
+    def __init__(
+        self,
+        client: MinioClient,
+        compression: Optional[str] = CHECKPOINT_COMPRESSION,
+        level: int = 1,
+    ):
+        self.client = client
+        self.bucket = DataDirectories.MODELS.value
+        self.compression = compression
+        self.level = level
+
+    def save_checkpoint(
+        self,
+        train_id: str,
+        round: int,
+        tensors: Iterable[Tuple[str, np.ndarray]],
+        base_round: Optional[int] = -1,
+    ) -> Checkpoint:
+        """
+        Stream the tensors of a checkpoint into minio, the index is stored after the data so readers only find
+        complete checkpoints.
+        Args:
+            train_id: id of the train
+            round: round of the checkpoint
+            tensors: names and arrays of the tensors in the order they are stored
+            base_round: round the checkpoint is stored as a delta of, the latest previous round by default and None
+                to store all tensors
+
+        Returns:
+            Index of the stored checkpoint
+        """
+        if base_round == -1:
+            previous = [r for r in self.list_rounds(train_id) if r < round]
+            base_round = previous[-1] if previous else None
+        base = self.load_index(train_id, base_round) if base_round is not None else None
+
+        directory = checkpoint_directory(train_id, round)
+        reader = TensorStreamReader(
+            tensors,
+            object_name=f"{directory}/{CHECKPOINT_DATA_NAME}",
+            base={tensor.name: tensor for tensor in base.tensors} if base else None,
+            compression=self.compression,
+            level=self.level,
+        )
+        self.client.put_file_stream(
+            self.bucket, reader.object_name, io.BufferedReader(reader)
+        )
+
+        checkpoint = Checkpoint(
+            train_id=train_id,
+            round=round,
+            created_at=datetime.now(),
+            base_round=base.round if base else None,
+            stored_size=reader.size,
+            tensors=reader.entries,
+        )
+        self.client.put_file_stream(
+            self.bucket,
+            f"{directory}/{CHECKPOINT_INDEX_NAME}",
+            io.BytesIO(checkpoint.json().encode()),
+            content_type="application/json",
+        )
+        logger.info(
+            f"Stored checkpoint of train {train_id} round {round} with {len(checkpoint.tensors)} tensors, "
+            f"{reader.size} bytes"
+        )
+        return checkpoint
+
+    def list_rounds(self, train_id: str) -> List[int]:
+        """
+        Rounds of a train with a complete checkpoint in ascending order
+        """
+        prefix = f"{train_id}/{CHECKPOINT_DIRECTORY}/"
+        rounds = []
+        for obj in self.client.client.list_objects(
+            self.bucket, prefix=prefix, recursive=True
+        ):
+            directory, _, name = obj.object_name[len(prefix) :].partition("/")
+            if name == CHECKPOINT_INDEX_NAME and directory.isdigit():
+                rounds.append(int(directory))
+        return sorted(rounds)
+
+    def load_index(self, train_id: str, round: int = None) -> Optional[Checkpoint]:
+        """
+        Load the index of a checkpoint
+        Args:
+            train_id: id of the train
+            round: round of the checkpoint, the latest round if None
+
+        Returns:
+            The index of the checkpoint or None if there is no checkpoint
+        """
+        if round is None:
+            rounds = self.list_rounds(train_id)
+            if not rounds:
+                return None
+            round = rounds[-1]
+        path = f"{checkpoint_directory(train_id, round)}/{CHECKPOINT_INDEX_NAME}"
+        if self.client.get_user_metadata(self.bucket, path) is None:
+            return None
+        return Checkpoint.parse_raw(self.client.get_file(self.bucket, path))
+
+    def iter_tensors(
+        self, checkpoint: Checkpoint, names: Iterable[str] = None
+    ) -> Iterator[Tuple[str, np.ndarray]]:
+        """
+        Read tensors of a checkpoint one at a time, every tensor is requested with a range read of its data
+        Args:
+            checkpoint: index of the checkpoint
+            names: names of the tensors to read, all tensors if None
+
+        Returns:
+            Iterator over the names and writable arrays of the tensors
+        """
+        selected = set(names) if names is not None else None
+        for tensor in checkpoint.tensors:
+            if selected is None or tensor.name in selected:
+                yield tensor.name, self._read_tensor(tensor)
+
+    def load_tensors(
+        self, train_id: str, round: int = None, names: Iterable[str] = None
+    ) -> Dict[str, np.ndarray]:
+        checkpoint = self.load_index(train_id, round)
+        if checkpoint is None:
+            raise ValueError(f"No checkpoint of train {train_id} for round {round}")
+        return dict(self.iter_tensors(checkpoint, names))
+
+    def _read_tensor(self, tensor: CheckpointTensor) -> np.ndarray:
+        dtype = np.dtype(tensor.dtype)
+        if tensor.size == 0:
+            # a zero length range would request the rest of the object
+            return np.empty(tensor.shape, dtype=dtype)
+        data = bytearray(int(np.prod(tensor.shape, dtype=np.int64)) * dtype.itemsize)
+        decompressor = zlib.decompressobj() if tensor.compression == "zlib" else None
+        position = 0
+        response = self.client.client.get_object(
+            bucket_name=self.bucket,
+            object_name=tensor.object_name,
+            offset=tensor.offset,
+            length=tensor.size,
+        )
+        try:
+            for chunk in response.stream(CHECKPOINT_CHUNK_SIZE):
+                if decompressor:
+                    chunk = decompressor.decompress(chunk)
+                data[position : position + len(chunk)] = chunk
+                position += len(chunk)
+            if decompressor:
+                chunk = decompressor.flush()
+                data[position : position + len(chunk)] = chunk
+                position += len(chunk)
+        finally:
+            response.close()
+            response.release_conn()
+        if position != len(data) or hashlib.sha256(data).hexdigest() != tensor.sha256:
+            raise ValueError(f"Corrupted data of tensor {tensor.name}")
+        return np.frombuffer(data, dtype=dtype).reshape(tensor.shape)
@@ -0,0 +1,217 @@
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from station.app.schemas.datasets import MinioFile
+from station.common.clients.minio.client import MinioClient
+from station.common.clients.minio.prefetch import FETCH_CONCURRENCY
+
+# default maximum size of the files in a cache directory
+CACHE_SIZE = 10 * 1024 * 1024 * 1024
+# size of the chunks written to the cache files while downloading
+CACHE_CHUNK_SIZE = 1024 * 1024
+
+
+class ChecksumError(Exception):
+    pass
+
+
+class ObjectCache:
+    """
+    Local directory caching minio objects as individual files. Cached files are named after the bucket, object
+    name and etag of the object, so changed objects are never read from the cache. Downloads of objects with single
+    part etags are validated against the md5 checksum in the etag. When the size of the cached files exceeds the
+    maximum size, the least recently used files are evicted. Files are used through their modification time, so
+    several processes can share a cache directory.
+    """
+
+    def __init__(
+        self,
+        client: MinioClient,
+        directory: str,
+        max_size: int = CACHE_SIZE,
+        chunk_size: int = CACHE_CHUNK_SIZE,
+    ):
+        self.client = client
+        self.directory = directory
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._list_files())
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get_path(self, bucket: str, item: MinioFile) -> str:
+        """
+        Get the path of the cached file of an object, the object is downloaded if it is not cached
+        Args:
+            bucket: bucket containing the object
+            item: object to get, its etag is requested from minio if the item has none
+
+        Returns:
+            Path of the local file with the content of the object
+        """
+        path = self._path(bucket, item)
+        try:
+            # mark the file as recently used
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass
+        return self._download(bucket, item, path)
+
+    def open(self, bucket: str, item: MinioFile) -> BinaryIO:
+        return open(self.get_path(bucket, item), "rb")
+
+    def read(self, bucket: str, item: MinioFile) -> bytes:
+        with self.open(bucket, item) as f:
+            return f.read()
+
+    def contains(self, bucket: str, item: MinioFile) -> bool:
+        return os.path.exists(self._path(bucket, item))
+
+    def prefetch(
+        self,
+        bucket: str,
+        items: Iterable[MinioFile],
+        concurrency: int = FETCH_CONCURRENCY,
+    ) -> int:
+        """
+        Download objects into the cache in parallel to warm it up before they are read. Objects that no longer fit
+        into the cache are skipped instead of evicting the objects fetched before them.
+        Args:
+            bucket: bucket containing the objects
+            items: objects to cache
+            concurrency: maximum number of parallel downloads
+
+        Returns:
+            Number of objects that are cached
+        """
+        selected, planned = [], self._size
+        for item in items:
+            if self.contains(bucket, item):
+                selected.append(item)
+                continue
+            if item.size is not None and planned + item.size > self.max_size:
+                logger.warning(
+                    f"Cache {self.directory} is full, skipping prefetch of the remaining objects"
+                )
+                break
+            planned += item.size or 0
+            selected.append(item)
+
+        with ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="minio-cache"
+        ) as executor:
+            paths = list(executor.map(lambda i: self.get_path(bucket, i), selected))
+        return len(paths)
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in self._list_files():
+                self._remove(path)
+            self._size = 0
+
+    def _download(self, bucket: str, item: MinioFile, path: str) -> str:
+        md5 = hashlib.md5()
+        size = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first, readers never see partially written files
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in self.client.iter_file(
+                    bucket, item.full_path, self.chunk_size
+                ):
+                    md5.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+            etag = self._etag(bucket, item)
+            # etags of multipart uploads are not the checksum of the content
+            if etag and "-" not in etag and md5.hexdigest() != etag:
+                raise ChecksumError(
+                    f"Checksum of {bucket}/{item.full_path} does not match etag {etag}"
+                )
+            self._reserve(size, path)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return path
+
+    def _reserve(self, size: int, path: str):
+        with self._lock:
+            # files of previous versions of the object are outdated
+            directory, name = os.path.split(path)
+            key = name.split(".", 1)[0]
+            for stale in os.listdir(directory):
+                if (
+                    stale.startswith(f"{key}.")
+                    and stale != name
+                    and not stale.endswith(".part")
+                ):
+                    stale_path = os.path.join(directory, stale)
+                    try:
+                        stale_size = os.path.getsize(stale_path)
+                        os.remove(stale_path)
+                    except FileNotFoundError:
+                        continue
+                    self._size -= stale_size
+            if self._size + size > self.max_size:
+                self._evict(self.max_size - size)
+            self._size += size
+
+    def _evict(self, target: int):
+        """
+        Remove the least recently used files until the cached files take at most target bytes
+        """
+        files = sorted(self._list_files(), key=lambda f: f[2])
+        # the sizes are recounted since other processes may share the directory
+        self._size = sum(size for _, size, _ in files)
+        for path, size, _ in files:
+            if self._size <= target:
+                break
+            if self._remove(path):
+                self._size -= size
+
+    def _list_files(self) -> List[Tuple[str, int, float]]:
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".part"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _etag(self, bucket: str, item: MinioFile) -> Optional[str]:
+        if item.etag is None:
+            item.etag = self.client.client.stat_object(bucket, item.full_path).etag
+        return item.etag
+
+    def _path(self, bucket: str, item: MinioFile) -> str:
+        key = hashlib.sha256(f"{bucket}/{item.full_path}".encode()).hexdigest()
+        return os.path.join(
+            self.directory, key[:2], f"{key}.{self._etag(bucket, item)}"
+        )
@@ -1,8 +1,17 @@
-import tarfile
-import time
+import asyncio
+from contextlib import contextmanager
 from io import BufferedReader, BytesIO, TextIOWrapper
-from typing import Dict, List, Union
-from zipfile import ZipFile
+from typing import (
+    AsyncIterator,
+    BinaryIO,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import pendulum
 import starlette
@@ -11,15 +20,48 @@ from loguru import logger
 from minio import Minio
 from minio.error import S3Error
 from pydantic import SecretStr
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 
 from station.app.schemas.datasets import MinioFile
 from station.app.schemas.station_status import HealthStatus
-from station.common.constants import DataDirectories
+from station.common.clients.minio.archive import (
+    ARCHIVE_CHUNK_SIZE,
+    ArchiveEntry,
+    iter_archive,
+)
+from station.common.clients.minio.discovery import (
+    ClassDistribution,
+    class_distributions,
+)
+from station.common.clients.minio.pagination import (
+    LIST_PAGE_SIZE,
+    decode_continuation_token,
+    next_continuation_token,
+    take_page,
+)
+from station.common.clients.minio.prefetch import (
+    FETCH_CONCURRENCY,
+    FETCH_READ_AHEAD,
+    iter_prefetched,
+)
+from station.common.clients.minio.ranges import RANGE_BUFFER_SIZE, RangeReader
+from station.common.clients.minio.upload import (
+    UPLOAD_CONCURRENCY,
+    UPLOAD_PART_SIZE,
+    HashingReader,
+    remaining_length,
+)
+from station.common.constants import DATASET_DERIVED_DIRECTORIES, DataDirectories
 
 
 class MinioClient:
     def __init__(
-        self, minio_server: str = None, access_key: str = None, secret_key: str = None
+        self,
+        minio_server: str = None,
+        access_key: str = None,
+        secret_key: str = None,
+        fetch_concurrency: int = FETCH_CONCURRENCY,
+        fetch_read_ahead: int = FETCH_READ_AHEAD,
     ):
         """
         Initialize a minio client either with the values passed to the constructor or based on environment variables
@@ -27,6 +69,8 @@ class MinioClient:
         :param minio_server: endpoint of the minio server
         :param access_key: minio access key or username
         :param secret_key: minio password
+        :param fetch_concurrency: number of objects fetched in parallel when building archives
+        :param fetch_read_ahead: number of objects fetched ahead of the archive writer
         """
         # Initialize class fields based on constructor values or environment variables
 
@@ -40,6 +84,8 @@ class MinioClient:
         self.minio_server = minio_server
         self.access_key = access_key
         self.secret_key = secret_key
+        self.fetch_concurrency = fetch_concurrency
+        self.fetch_read_ahead = fetch_read_ahead
 
         if isinstance(self.secret_key, SecretStr):
             self.secret_key = self.secret_key.get_secret_value()
@@ -56,80 +102,50 @@ class MinioClient:
             secure=False,
         )
 
-    async def store_model_file(self, id: str, model_file: Union[File, UploadFile]):
-        model_data = await model_file.read()
-        file = BytesIO(model_data)
-        res = self.client.put_object(
-            DataDirectories.MODELS.value,
-            object_name=id,
-            data=file,
-            length=len(file.getbuffer()),
-        )
-        return res
+    async def store_model_file(
+        self, id: str, model_file: Union[File, UploadFile]
+    ) -> MinioFile:
+        """
+        Stream a model file into the models bucket as a multipart upload
+        """
+        return await self.store_files(DataDirectories.MODELS.value, id, model_file)
 
     def get_model_file(self, model_id: str) -> bytes:
-        try:
-            response = self.client.get_object(
-                bucket_name=DataDirectories.MODELS.value, object_name=model_id
-            )
-            data = response.read()
-        finally:
-            response.close()
-            response.release_conn()
+        return self.get_file(DataDirectories.MODELS.value, model_id)
 
-        return data
+    def open_model_file(self, model_id: str) -> ContextManager[BinaryIO]:
+        """
+        Open a model file as a stream instead of reading it into memory
+        """
+        return self.open_file(DataDirectories.MODELS.value, model_id)
 
-    async def store_files(self, bucket: str, name: str, file: Union[File, UploadFile]):
+    async def store_files(
+        self, bucket: str, name: str, file: Union[File, UploadFile]
+    ) -> MinioFile:
         """
         store files into minio
         """
-        print(name)
-        print(type(file))
-        if isinstance(file, BufferedReader):
-            model_data = file.read()
-        elif isinstance(file, str):
-            model_data = file.encode("utf-8")
+        if isinstance(file, str):
+            file = BytesIO(file.encode("utf-8"))
         elif isinstance(file, TextIOWrapper):
-            model_data = file.read().encode("utf-8")
-        elif isinstance(file, BytesIO):
-            res = self.client.put_object(
-                bucket, object_name=name, data=file, length=len(file.getbuffer())
-            )
-            return res
+            file = file.buffer
         elif isinstance(file, starlette.datastructures.UploadFile):
-            model_data = await file.read()
-        else:
+            file = file.file
+        elif not isinstance(file, (BufferedReader, BytesIO)):
             raise TypeError(f"files with type {type(file)} are not supported")
 
-        file = BytesIO(model_data)
-        res = self.client.put_object(
-            bucket, object_name=name, data=file, length=len(file.getbuffer())
-        )
-        return res
+        return await run_in_threadpool(self.put_file_stream, bucket, name, file)
 
     async def save_dataset_files(
         self, dataset_id: str, files: List[Union[File, UploadFile]]
-    ):
+    ) -> List[MinioFile]:
         """
         store files into minio
         """
-        resp = []
-
-        for file in files:
-            data = await file.read()
-
-            data_file = BytesIO(data)
-            res = self.client.put_object(
-                bucket_name=DataDirectories.DATASETS.value,
-                object_name=f"{dataset_id}/{file.filename}",
-                data=data_file,
-                length=len(data),
-                content_type="text/plain",
-            )
-            resp.append(res)
-            data_file.seek(0)
-
-        return resp
+        return await self.upload_files(
+            DataDirectories.DATASETS.value,
+            [(f"{dataset_id}/{file.filename}", file) for file in files],
+        )
 
     async def save_local_train_files(
         self, train_id: str, files: List[Union[File, UploadFile]]
@@ -137,40 +153,111 @@ class MinioClient:
         """
         store files of local train in minio
         """
-        resp = []
-
-        for file in files:
-            data = await file.read()
-            data_file = BytesIO(data)
-            res = self.client.put_object(
-                bucket_name=DataDirectories.LOCAL_TRAINS.value,
-                object_name=f"{train_id}/{file.filename}",
-                data=data_file,
-                length=len(data),
+        uploaded_files = await self.upload_files(
+            DataDirectories.LOCAL_TRAINS.value,
+            [(f"{train_id}/{file.filename}", file) for file in files],
+        )
+        for uploaded_file in uploaded_files:
+            uploaded_file.full_path = (
+                f"{DataDirectories.LOCAL_TRAINS.value}/{uploaded_file.full_path}"
             )
+        return uploaded_files
+
+    async def upload_files(
+        self,
+        bucket: str,
+        files: List[Tuple[str, UploadFile]],
+        concurrency: int = UPLOAD_CONCURRENCY,
+    ) -> List[MinioFile]:
+        """
+        Upload files to minio directly from their spooled upload files. The files are uploaded in parallel in the
+        threadpool, each of them as a multipart upload holding at most one part in memory.
+        Args:
+            bucket: bucket to store the files in
+            files: list of object names and the files to upload under these names
+            concurrency: maximum number of files uploaded at the same time
 
-            resp.append(
-                MinioFile(
-                    file_name=file.filename,
-                    file_size=len(data),
-                    full_path=f"{res.bucket_name}/{res.object_name}",
-                    updated_at=pendulum.now(),
+        Returns:
+            List of the uploaded files with size, etag and sha256 checksum in the order of the given files
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def upload(name: str, file: UploadFile) -> MinioFile:
+            async with semaphore:
+                await file.seek(0)
+                return await run_in_threadpool(
+                    self.put_file_stream,
+                    bucket,
+                    name,
+                    file.file,
+                    file.content_type or "application/octet-stream",
                 )
-            )
-        return resp
 
-    def get_local_train_archive(self, train_id: str):
-        print(DataDirectories.LOCAL_TRAINS.value)
+        return list(await asyncio.gather(*(upload(name, file) for name, file in files)))
+
+    def put_file_stream(
+        self,
+        bucket: str,
+        name: str,
+        data: BinaryIO,
+        content_type: str = "application/octet-stream",
+        part_size: int = UPLOAD_PART_SIZE,
+        metadata: Dict[str, str] = None,
+    ) -> MinioFile:
+        """
+        Stream a file object into minio. Files larger than the part size are stored as a multipart upload, the data
+        is read part by part and the sha256 checksum is computed while streaming.
+        Args:
+            bucket: bucket to store the file in
+            name: object name of the file
+            data: file object to read the data from
+            content_type: content type of the stored object
+            part_size: size of the parts of the multipart upload
+            metadata: user metadata stored with the object
+
+        Returns:
+            MinioFile with size, etag and sha256 checksum of the uploaded data
+        """
+        length = remaining_length(data)
+        reader = HashingReader(data)
+        result = self.client.put_object(
+            bucket_name=bucket,
+            object_name=name,
+            data=reader,
+            length=length if length is not None else -1,
+            content_type=content_type,
+            part_size=part_size,
+            num_parallel_uploads=1,
+            metadata=metadata,
+        )
+
+        return MinioFile(
+            file_name=name.split("/")[-1],
+            full_path=result.object_name,
+            size=reader.size,
+            updated_at=pendulum.now(),
+            etag=result.etag,
+            checksum=reader.checksum,
+            content_type=content_type,
+        )
+
+    def get_local_train_archive(self, train_id: str) -> AsyncIterator[bytes]:
+        """
+        Stream a tar archive of all files uploaded for a local train
+        Args:
+            train_id: id of the local train
+
+        Returns:
+            Async iterator over the bytes of the archive
+        """
         items = self.get_minio_dir_items(
             bucket=DataDirectories.LOCAL_TRAINS.value, directory=train_id
         )
 
-        archive = self.make_download_archive(
+        return self.stream_download_archive(
             DataDirectories.LOCAL_TRAINS.value, items=items
         )
 
-        return archive
-
     def get_file(self, bucket: str, name: str) -> bytes:
         response = self.client.get_object(bucket_name=bucket, object_name=name)
         data = response.read()
@@ -179,6 +266,99 @@ class MinioClient:
 
         return data
 
+    @contextmanager
+    def open_file(self, bucket: str, name: str) -> Iterator[BinaryIO]:
+        """
+        Open an object as a readable binary stream, the connection is released when the context is left
+        Args:
+            bucket: bucket containing the object
+            name: name of the object
+
+        Returns:
+            Context manager yielding the response stream of the object
+        """
+        response = self.client.get_object(bucket_name=bucket, object_name=name)
+        try:
+            yield response
+        finally:
+            response.close()
+            response.release_conn()
+
+    def open_random_access(
+        self, bucket: str, name: str, buffer_size: int = RANGE_BUFFER_SIZE
+    ) -> BufferedReader:
+        """
+        Open an object as a seekable binary file, reads only request the byte ranges that are needed. Used by
+        readers of columnar formats that only read the metadata and the selected columns of a file.
+        Args:
+            bucket: bucket containing the object
+            name: name of the object
+            buffer_size: minimum size of the requested ranges
+
+        Returns:
+            Buffered seekable file object of the object
+        """
+        size = self.client.stat_object(bucket, name).size
+        return BufferedReader(
+            RangeReader(self.client, bucket, name, size), buffer_size=buffer_size
+        )
+
+    def get_user_metadata(self, bucket: str, name: str) -> Optional[Dict[str, str]]:
+        """
+        Get the user metadata stored with an object
+        Args:
+            bucket: bucket containing the object
+            name: name of the object
+
+        Returns:
+            Dictionary of the lower case metadata keys without the amz prefix and their values, None if the object
+            does not exist
+        """
+        try:
+            stat = self.client.stat_object(bucket, name)
+        except S3Error as e:
+            if e.code in {"NoSuchKey", "NoSuchObject"}:
+                return None
+            raise e
+        prefix = "x-amz-meta-"
+        return {
+            key.lower()[len(prefix) :]: value
+            for key, value in (stat.metadata or {}).items()
+            if key.lower().startswith(prefix)
+        }
+
+    def iter_file(
+        self, bucket: str, name: str, chunk_size: int = ARCHIVE_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        Read an object from minio in chunks. The object is only requested once the iterator is consumed and the
+        connection is released when the iterator is exhausted or closed.
+        Args:
+            bucket: bucket containing the object
+            name: name of the object
+            chunk_size: maximum size of the returned chunks
+
+        Returns:
+            Iterator over the content of the object
+        """
+        response = self.client.get_object(bucket_name=bucket, object_name=name)
+        try:
+            yield from response.stream(chunk_size)
+        finally:
+            response.close()
+            response.release_conn()
+
+    async def stream_file(
+        self, bucket: str, name: str, chunk_size: int = ARCHIVE_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Async variant of iter_file, the blocking reads are executed in the threadpool.
+        """
+        async for chunk in iterate_in_threadpool(
+            self.iter_file(bucket, name, chunk_size)
+        ):
+            yield chunk
+
     def delete_file(self, bucket: str, name: str):
         self.client.remove_object(bucket_name=bucket, object_name=name)
 
@@ -218,34 +398,126 @@ class MinioClient:
         self, bucket: Union[str, DataDirectories], directory: str
     ) -> List[MinioFile]:
         """
-        Get all objects in the data set specified by data_set_id and return them as a generator
+        Get all objects in the data set specified by data_set_id and return them as a list
         Args:
-            bucket:
-            directory:
+            bucket: bucket to list
+            directory: directory in the bucket to list recursively
 
         Returns:
+            List of the objects below the directory
+        """
+        try:
+            return list(self.iter_dir_items(bucket, directory))
+        except Exception as e:
+            logger.error(f"Could not list {directory} in {bucket}: {e}")
+            return []
 
+    def iter_dir_items(
+        self,
+        bucket: Union[str, DataDirectories],
+        directory: str,
+        prefix: str = None,
+        start_after: str = None,
+        include_metadata: bool = False,
+    ) -> Iterator[MinioFile]:
+        """
+        Lazily list the objects below a directory in the order of their names. The objects are requested page by
+        page from minio while the iterator is consumed.
+        Args:
+            bucket: bucket to list
+            directory: directory in the bucket to list recursively
+            prefix: only list objects whose path relative to the directory starts with this prefix
+            start_after: only list objects with names after this object name
+            include_metadata: list the metadata of the objects to get their content types
+
+        Returns:
+            Iterator over the objects
         """
         if isinstance(bucket, DataDirectories):
             bucket = bucket.value
-        items = self.client.list_objects(bucket, prefix=directory, recursive=True)
+        list_prefix = f"{directory}/{prefix}" if prefix else directory
+        objects = self.client.list_objects(
+            bucket,
+            prefix=list_prefix,
+            recursive=True,
+            start_after=start_after,
+            include_user_meta=include_metadata,
+        )
+        for item in objects:
+            metadata = {k.lower(): v for k, v in (item.metadata or {}).items()}
+            yield MinioFile(
+                file_name=item.object_name.split("/")[-1],
+                full_path=item.object_name,
+                size=item.size,
+                updated_at=item.last_modified,
+                etag=item.etag,
+                content_type=item.content_type or metadata.get("content-type"),
+            )
+
+    def get_dataset_files(self, data_set_id: str) -> List[MinioFile]:
+        """
+        Get the files uploaded to a dataset, without the columnar copies and shards created from them
+        Args:
+            data_set_id: id of the dataset
+
+        Returns:
+            List of the files of the dataset
+        """
         try:
-            dir_files = []
-            for item in items:
-                print(item)
-                dir_files.append(
-                    MinioFile(
-                        file_name=item.object_name.split("/")[-1],
-                        full_path=item.object_name,
-                        size=item.size,
-                        updated_at=item.last_modified,
-                    )
-                )
-            return dir_files
+            return list(self.iter_dataset_files(data_set_id))
         except Exception as e:
-            print(e)
+            logger.error(f"Could not list the files of dataset {data_set_id}: {e}")
             return []
 
+    def iter_dataset_files(
+        self, data_set_id: str, prefix: str = None, start_after: str = None
+    ) -> Iterator[MinioFile]:
+        """
+        Lazily list the files uploaded to a dataset, without the columnar copies and shards created from them
+        Args:
+            data_set_id: id of the dataset
+            prefix: only list files whose path in the dataset starts with this prefix
+            start_after: only list files with object names after this name
+
+        Returns:
+            Iterator over the files of the dataset in the order of their names
+        """
+        derived = tuple(
+            f"{data_set_id}/{directory}/" for directory in DATASET_DERIVED_DIRECTORIES
+        )
+        for item in self.iter_dir_items(
+            DataDirectories.DATASETS, data_set_id, prefix, start_after
+        ):
+            if not item.full_path.startswith(derived):
+                yield item
+
+    def list_dataset_files_page(
+        self,
+        data_set_id: str,
+        limit: int = LIST_PAGE_SIZE,
+        continuation_token: str = None,
+        prefix: str = None,
+    ) -> Tuple[List[MinioFile], Optional[str]]:
+        """
+        List a page of the files of a dataset
+        Args:
+            data_set_id: id of the dataset
+            limit: maximum number of files in the page
+            continuation_token: token returned with the previous page
+            prefix: only list files whose path in the dataset starts with this prefix
+
+        Returns:
+            Tuple of the files of the page and the token of the next page, None if this is the last page
+        """
+        start_after = None
+        if continuation_token:
+            start_after = decode_continuation_token(
+                continuation_token, prefix=f"{data_set_id}/"
+            )
+        items = self.iter_dataset_files(data_set_id, prefix, start_after)
+        page, has_more = take_page(items, limit)
+        return page, next_continuation_token(page, has_more)
+
     def make_dataset_archive(
         self, data_set_id: str, items: List[MinioFile] = None, archive_type: str = "tar"
     ) -> BytesIO:
@@ -260,7 +532,7 @@ class MinioClient:
 
         """
         if items is None:
-            items = self.get_minio_dir_items("datasets", data_set_id)
+            items = self.get_dataset_files(data_set_id)
 
         archive = self.make_download_archive(
             "datasets", items, archive_type=archive_type
@@ -268,61 +540,137 @@ class MinioClient:
 
         return archive
 
+    def stream_dataset_archive(
+        self, data_set_id: str, items: List[MinioFile] = None, archive_type: str = "tar"
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream an archive of the data set specified by data_set_id without loading it into memory
+        Args:
+            data_set_id: id of the dataset
+            items: list of items to include in the archive
+            archive_type: tar or zip
+
+        Returns:
+            Async iterator over the bytes of the archive
+        """
+        if items is None:
+            items = self.get_dataset_files(data_set_id)
+
+        return self.stream_download_archive(
+            "datasets", items, archive_type=archive_type
+        )
+
     def make_download_archive(
         self, bucket: str, items: List[MinioFile], archive_type: str = "tar"
     ) -> BytesIO:
         archive = BytesIO()
+        for block in self.iter_download_archive(bucket, items, archive_type):
+            archive.write(block)
+        archive.seek(0)
+        return archive
 
-        if archive_type == "tar":
-            with tarfile.TarFile(fileobj=archive, mode="w") as tar:
-                for file in items:
-                    data = self.get_file(bucket, file.full_path)
-                    info = tarfile.TarInfo(name=file.full_path)
-                    info.size = len(data)
-                    info.mtime = time.time()
-                    tar.addfile(info, BytesIO(data))
-
-            archive.seek(0)
-            return archive
-        elif archive_type == "zip":
-            with ZipFile(archive, "w") as zip:
-                for item in items:
-                    data = self.get_file(bucket, item.full_path)
-                    zip.writestr(item.full_path, data)
-            archive.seek(0)
-            return archive
-
-        raise ValueError(f"Unknown archive type {archive_type}")
+    def iter_download_archive(
+        self,
+        bucket: str,
+        items: List[MinioFile],
+        archive_type: str = "tar",
+        chunk_size: int = ARCHIVE_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """
+        Build a tar or zip archive of the given objects block by block. Objects are fetched by a bounded thread pool
+        ahead of the archive writer, so the minio round trips overlap with the encoding of the archive, while the
+        order of the archive members matches the order of the items.
+        Objects larger than the chunk size are not prefetched but streamed in chunks, memory usage is bounded by
+        the read ahead window times the chunk size.
+        Args:
+            bucket: bucket containing the objects
+            items: objects to add to the archive
+            archive_type: tar or zip
+            chunk_size: size of the chunks read from minio
+
+        Returns:
+            Iterator over the bytes of the archive
+        """
+
+        def fetch(item: MinioFile) -> ArchiveEntry:
+            return self._fetch_archive_entry(bucket, item, chunk_size)
+
+        entries = iter_prefetched(
+            items,
+            fetch,
+            concurrency=self.fetch_concurrency,
+            read_ahead=self.fetch_read_ahead,
+        )
+        return iter_archive(entries, archive_type=archive_type)
+
+    async def stream_download_archive(
+        self,
+        bucket: str,
+        items: List[MinioFile],
+        archive_type: str = "tar",
+        chunk_size: int = ARCHIVE_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        """
+        Async variant of iter_download_archive, the blocking minio reads are executed in the threadpool so the
+        first bytes of the archive are sent as soon as the first object is requested.
+        """
+        async for block in iterate_in_threadpool(
+            self.iter_download_archive(bucket, items, archive_type, chunk_size)
+        ):
+            yield block
+
+    def _fetch_archive_entry(
+        self, bucket: str, item: MinioFile, chunk_size: int
+    ) -> ArchiveEntry:
+        size = self._get_object_size(bucket, item)
+        if size <= chunk_size:
+            chunks = [self.get_file(bucket, item.full_path)]
+        else:
+            chunks = self.iter_file(bucket, item.full_path, chunk_size)
+        return ArchiveEntry(name=item.full_path, size=size, chunks=chunks)
+
+    def _get_object_size(self, bucket: str, item: MinioFile) -> int:
+        if item.size is not None:
+            return item.size
+        return self.client.stat_object(bucket, item.full_path).size
 
     def get_classes_by_folders(self, data_set_id: str) -> List[str]:
         """
         Gets the subdirectories of a dataset directory in minio. The folder names correspond the classes defined for
-        the dataset
+        the dataset, the directories of the shards and columnar copies created by the station are skipped
 
         :param data_set_id: identifier of the data set in the datasets bucket
         :return: List of directory (class) names found in the specified directory
         """
 
         folders = self.client.list_objects(
-            "datasets", prefix=data_set_id, recursive=False
+            "datasets", prefix=f"{data_set_id.strip('/')}/", recursive=False
         )
-        classes = []
-        for folder in folders:
-            classes.append(folder.object_name.split("/")[-2])
-        return classes
+        names = (
+            folder.object_name.rstrip("/").split("/")[-1]
+            for folder in folders
+            if folder.is_dir
+        )
+        return [name for name in names if name not in DATASET_DERIVED_DIRECTORIES]
 
     def get_class_distributions(
-        self, data_set_id: str, classes: List[str]
-    ) -> List[Dict[str, Union[int, str]]]:
-        class_distribution = []
-
-        for cls in classes:
-            prefix = data_set_id + cls + "/"
-            class_items = len(list(self.client.list_objects("datasets", prefix=prefix)))
-            class_object = {"class_name": cls, "n_items": class_items}
-            class_distribution.append(class_object)
+        self,
+        data_set_id: str,
+        classes: List[str] = None,
+        include_details: bool = False,
+    ) -> List[ClassDistribution]:
+        """
+        Count the items of each class of a folder dataset with a single recursive listing of the dataset
 
-        return class_distribution
+        :param data_set_id: identifier of the data set in the datasets bucket
+        :param classes: optional list of the classes to count, all class folders are counted if not given
+        :param include_details: also report the total size in bytes and the file type histogram of each class
+        :return: List of dictionaries with class_name and n_items of each class
+        """
+        items = self.iter_dataset_files(data_set_id.strip("/"))
+        return class_distributions(
+            data_set_id, items, classes=classes, include_details=include_details
+        )
 
     def health_check(self) -> HealthStatus:
         """
@@ -0,0 +1,57 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Union
+
+from station.app.schemas.datasets import MinioFile
+
+ClassDistribution = Dict[str, Union[int, str, Dict[str, int]]]
+
+
+def file_type(file_name: str) -> str:
+    """
+    Lower case extension of a file name, empty if the file has no extension
+    """
+    return file_name.rsplit(".", 1)[-1].lower() if "." in file_name else ""
+
+
+def class_distributions(
+    directory: str,
+    items: Iterable[MinioFile],
+    classes: List[str] = None,
+    include_details: bool = False,
+) -> List[ClassDistribution]:
+    """
+    Count the objects of a folder dataset per class in a single pass over a recursive listing. The class of an
+    object is the first folder below the dataset directory, objects directly in the directory have no class.
+    Args:
+        directory: directory of the dataset
+        items: recursive listing of the directory
+        classes: only count these classes, classes without objects are reported with zero items. All classes
+            found in the listing are counted if not given.
+        include_details: additionally report the total size and a histogram of the file types of each class
+
+    Returns:
+        List of dictionaries with the class name and the number of items of each class, ordered like the given
+        classes or by class name
+    """
+    prefix = f"{directory.strip('/')}/"
+    counts = Counter()
+    sizes = Counter()
+    file_types: Dict[str, Counter] = {}
+    for item in items:
+        relative = item.full_path[len(prefix) :]
+        if not item.full_path.startswith(prefix) or "/" not in relative:
+            continue
+        class_name = relative.split("/", 1)[0]
+        counts[class_name] += 1
+        if include_details:
+            sizes[class_name] += item.size or 0
+            file_types.setdefault(class_name, Counter())[file_type(item.file_name)] += 1
+
+    distributions = []
+    for class_name in classes if classes is not None else sorted(counts):
+        distribution = {"class_name": class_name, "n_items": counts[class_name]}
+        if include_details:
+            distribution["size"] = sizes[class_name]
+            distribution["file_types"] = dict(file_types.get(class_name, {}))
+        distributions.append(distribution)
+    return distributions
@@ -0,0 +1,56 @@
+import base64
+import binascii
+from itertools import islice
+from typing import Iterable, List, Optional, Tuple, TypeVar
+
+ItemType = TypeVar("ItemType")
+
+# default and maximum number of objects returned per page of a listing
+LIST_PAGE_SIZE = 1000
+MAX_LIST_PAGE_SIZE = 10000
+
+
+def encode_continuation_token(object_name: str) -> str:
+    """
+    Encode the name of the last object of a page as opaque token to continue the listing after it
+    """
+    return base64.urlsafe_b64encode(object_name.encode()).decode()
+
+
+def decode_continuation_token(token: str, prefix: str = None) -> str:
+    """
+    Decode a continuation token into the name of the object the listing continues after
+    Args:
+        token: token returned with the previous page
+        prefix: prefix the object name has to start with, to reject tokens of other listings
+
+    Returns:
+        Object name to start the listing after
+    """
+    try:
+        object_name = base64.urlsafe_b64decode(token.encode()).decode()
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid continuation token {token}")
+    if prefix and not object_name.startswith(prefix):
+        raise ValueError(f"Invalid continuation token {token}")
+    return object_name
+
+
+def take_page(items: Iterable[ItemType], limit: int) -> Tuple[List[ItemType], bool]:
+    """
+    Consume at most limit items of a lazy listing and check if there are more without consuming the rest
+    Args:
+        items: lazily listed items
+        limit: page size
+
+    Returns:
+        Tuple of the items of the page and whether more items follow
+    """
+    page = list(islice(items, limit + 1))
+    return page[:limit], len(page) > limit
+
+
+def next_continuation_token(page: List, has_more: bool) -> Optional[str]:
+    if not has_more or not page:
+        return None
+    return encode_continuation_token(page[-1].full_path)
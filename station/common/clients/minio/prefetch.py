@@ -0,0 +1,58 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Iterable, Iterator, TypeVar
+
+ItemType = TypeVar("ItemType")
+ResultType = TypeVar("ResultType")
+
+# default number of parallel minio requests, stays below the 10 connections pooled by the minio http client
+FETCH_CONCURRENCY = 8
+# default number of objects fetched ahead of the consumer
+FETCH_READ_AHEAD = 16
+
+
+def iter_prefetched(
+    items: Iterable[ItemType],
+    fetch: Callable[[ItemType], ResultType],
+    concurrency: int = FETCH_CONCURRENCY,
+    read_ahead: int = FETCH_READ_AHEAD,
+) -> Iterator[ResultType]:
+    """
+    Apply fetch to the given items in a bounded thread pool and yield the results in the order of the items.
+    At most read_ahead results are requested before they are consumed, so the fetches overlap with the processing
+    of the results without holding more than read_ahead results in memory.
+    Args:
+        items: items to fetch, consumed lazily
+        fetch: blocking function fetching a single item
+        concurrency: maximum number of fetches running in parallel
+        read_ahead: maximum number of fetches submitted ahead of the consumer
+
+    Returns:
+        Iterator over the fetched results in the order of the items
+    """
+    if concurrency < 1:
+        raise ValueError(f"Concurrency must be at least 1, got {concurrency}")
+    read_ahead = max(read_ahead, concurrency)
+
+    items = iter(items)
+    executor = ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="minio-fetch"
+    )
+    pending: Deque[Future] = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(fetch, item))
+            if len(pending) >= read_ahead:
+                break
+
+        while pending:
+            result = pending.popleft().result()
+            for item in items:
+                pending.append(executor.submit(fetch, item))
+                break
+            yield result
+    finally:
+        # stop outstanding fetches if the consumer is closed early or a fetch failed
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
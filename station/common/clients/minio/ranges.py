@@ -0,0 +1,82 @@
+import io
+from typing import Optional
+
+from minio import Minio
+
+# size of the buffer of random access readers, reads of columnar formats are mostly larger than this
+RANGE_BUFFER_SIZE = 1024 * 1024
+
+
+class RangeReader(io.RawIOBase):
+    """
+    Seekable read only file object of a minio object. Every read requests only the needed byte range of the object,
+    so readers of columnar formats like parquet can fetch the footer and selected column chunks without downloading
+    the whole object.
+    """
+
+    def __init__(self, client: Minio, bucket: str, name: str, size: int):
+        self._client = client
+        self._bucket = bucket
+        self._name = name
+        self._size = size
+        self._position = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        length = min(len(buffer), self._size - self._position)
+        if length <= 0:
+            return 0
+        data = self._read_range(self._position, length)
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def readall(self) -> bytes:
+        data = self._read_range(self._position, self._size - self._position)
+        self._position += len(data)
+        return data
+
+    def _read_range(self, offset: int, length: Optional[int]) -> bytes:
+        if length is not None and length <= 0:
+            return b""
+        response = self._client.get_object(
+            bucket_name=self._bucket,
+            object_name=self._name,
+            offset=offset,
+            length=length,
+        )
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
@@ -0,0 +1,248 @@
+import io
+import mmap
+import tarfile
+import tempfile
+from datetime import datetime
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+from loguru import logger
+from pydantic import BaseModel
+
+from station.app.schemas.datasets import MinioFile
+from station.common.clients.minio.client import MinioClient
+from station.common.clients.minio.prefetch import iter_prefetched
+from station.common.constants import DATASET_SHARD_DIRECTORY, DataDirectories
+
+# size after which a shard is closed and the next shard is started
+SHARD_SIZE = 256 * 1024 * 1024
+# shards smaller than this are kept in memory while they are written
+SHARD_SPOOL_SIZE = 64 * 1024 * 1024
+SHARD_CONTENT_TYPE = "application/x-tar"
+SHARD_INDEX_NAME = "index.json"
+
+
+class ShardMember(BaseModel):
+    name: str
+    offset: int
+    size: int
+    class_name: Optional[str] = None
+
+
+class Shard(BaseModel):
+    name: str
+    size: int = 0
+    etag: Optional[str] = None
+    members: List[ShardMember] = []
+
+
+class ShardIndex(BaseModel):
+    data_set_id: str
+    created_at: datetime
+    n_items: int = 0
+    classes: List[str] = []
+    shards: List[Shard] = []
+
+
+def shard_index_path(data_set_id: str) -> str:
+    return f"{data_set_id}/{DATASET_SHARD_DIRECTORY}/{SHARD_INDEX_NAME}"
+
+
+def class_of(data_set_id: str, path: str) -> Optional[str]:
+    """
+    Class of a file of a folder dataset, the first folder below the dataset directory
+    """
+    relative = path[len(data_set_id) + 1 :]
+    return relative.split("/", 1)[0] if "/" in relative else None
+
+
+class ShardWriter:
+    """
+    Writes files into uncompressed tar shards of about the given size. The offset of the content of every member in
+    its shard is recorded, so members can be read from a memory mapped shard without parsing the tar headers.
+    """
+
+    def __init__(self, shard_size: int = SHARD_SIZE):
+        self.shard_size = shard_size
+        self.shards: List[Shard] = []
+        self._file: Optional[BinaryIO] = None
+        self._tar: Optional[tarfile.TarFile] = None
+
+    def add(
+        self, name: str, data: bytes, class_name: str = None
+    ) -> Optional[Tuple[Shard, BinaryIO]]:
+        """
+        Add a file to the current shard
+        Args:
+            name: name of the member in the shard
+            data: content of the file
+            class_name: optional class of the file
+
+        Returns:
+            The completed shard and its content if the shard reached the shard size, otherwise None
+        """
+        if self._tar is None:
+            self._file = tempfile.SpooledTemporaryFile(max_size=SHARD_SPOOL_SIZE)
+            self._tar = tarfile.open(fileobj=self._file, mode="w")
+            self.shards.append(Shard(name=f"shard-{len(self.shards):06d}.tar"))
+
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        self._tar.addfile(info, io.BytesIO(data))
+        # the content ends at the current offset, padded to the tar block size
+        padded = -(-len(data) // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+        self.shards[-1].members.append(
+            ShardMember(
+                name=name,
+                offset=self._tar.offset - padded,
+                size=len(data),
+                class_name=class_name,
+            )
+        )
+        if self._tar.offset >= self.shard_size:
+            return self.close()
+        return None
+
+    def close(self) -> Optional[Tuple[Shard, BinaryIO]]:
+        """
+        Finish the current shard
+        Returns:
+            The shard and its content rewound to the start, None if no shard is open
+        """
+        if self._tar is None:
+            return None
+        self._tar.close()
+        shard, file = self.shards[-1], self._file
+        shard.size = file.tell()
+        file.seek(0)
+        self._tar, self._file = None, None
+        return shard, file
+
+
+def pack_dataset(
+    client: MinioClient, data_set_id: str, shard_size: int = SHARD_SIZE
+) -> ShardIndex:
+    """
+    Pack the files of a dataset into tar shards stored next to the files. The objects are fetched in parallel and
+    written sequentially, the index is stored last and shards of previous packs are removed afterwards, so readers
+    always find complete shards through the index.
+    Args:
+        client: minio client
+        data_set_id: id of the dataset
+        shard_size: size after which a shard is closed
+
+    Returns:
+        Index of the created shards
+    """
+    bucket = DataDirectories.DATASETS.value
+    data_set_id = data_set_id.strip("/")
+    version = datetime.now().strftime("%Y%m%d%H%M%S%f")
+    shard_directory = f"{data_set_id}/{DATASET_SHARD_DIRECTORY}/{version}"
+    previous = load_shard_index(client, data_set_id)
+
+    items = client.get_dataset_files(data_set_id)
+
+    def fetch(item: MinioFile) -> Tuple[MinioFile, bytes]:
+        return item, client.get_file(bucket, item.full_path)
+
+    def upload(shard: Shard, file: BinaryIO):
+        shard.name = f"{shard_directory}/{shard.name}"
+        with file:
+            shard.etag = client.put_file_stream(
+                bucket, shard.name, file, content_type=SHARD_CONTENT_TYPE
+            ).etag
+
+    writer = ShardWriter(shard_size)
+    classes = set()
+    for item, data in iter_prefetched(
+        items, fetch, client.fetch_concurrency, client.fetch_read_ahead
+    ):
+        class_name = class_of(data_set_id, item.full_path)
+        if class_name:
+            classes.add(class_name)
+        completed = writer.add(item.full_path[len(data_set_id) + 1 :], data, class_name)
+        if completed:
+            upload(*completed)
+    completed = writer.close()
+    if completed:
+        upload(*completed)
+
+    index = ShardIndex(
+        data_set_id=data_set_id,
+        created_at=datetime.now(),
+        n_items=len(items),
+        classes=sorted(classes),
+        shards=writer.shards,
+    )
+    content = index.json().encode()
+    client.put_file_stream(
+        bucket,
+        shard_index_path(data_set_id),
+        io.BytesIO(content),
+        content_type="application/json",
+    )
+    logger.info(
+        f"Packed {len(items)} files of dataset {data_set_id} into {len(index.shards)} shards"
+    )
+
+    if previous:
+        for shard in previous.shards:
+            try:
+                client.delete_file(bucket, shard.name)
+            except Exception as e:
+                logger.warning(f"Could not delete previous shard {shard.name}: {e}")
+    return index
+
+
+def load_shard_index(client: MinioClient, data_set_id: str) -> Optional[ShardIndex]:
+    """
+    Load the index of the shards of a dataset, None if the dataset was not packed
+    """
+    bucket = DataDirectories.DATASETS.value
+    path = shard_index_path(data_set_id.strip("/"))
+    if client.get_user_metadata(bucket, path) is None:
+        return None
+    return ShardIndex.parse_raw(client.get_file(bucket, path))
+
+
+def iter_shard(stream: BinaryIO) -> Iterator[Tuple[str, bytes]]:
+    """
+    Read the members of a shard sequentially from a non seekable stream
+    Args:
+        stream: binary stream of the shard
+
+    Returns:
+        Iterator over the names and contents of the members
+    """
+    with tarfile.open(fileobj=stream, mode="r|") as tar:
+        for info in tar:
+            if info.isfile():
+                yield info.name, tar.extractfile(info).read()
+
+
+class MappedShard:
+    """
+    Memory mapped local shard file, members are read from the page cache without copying the shard
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, member: ShardMember) -> memoryview:
+        return memoryview(self._map)[member.offset : member.offset + member.size]
+
+    def close(self):
+        self._map.close()
+
+
+def shard_files(index: ShardIndex) -> Iterable[MinioFile]:
+    """
+    Shards of an index as minio files, e.g. to cache them locally
+    """
+    for shard in index.shards:
+        yield MinioFile(
+            file_name=shard.name.split("/")[-1],
+            full_path=shard.name,
+            size=shard.size,
+            etag=shard.etag,
+        )
@@ -0,0 +1,48 @@
+import hashlib
+import os
+from typing import BinaryIO, Optional
+
+# size of the parts of multipart uploads, minio requires at least 5 MiB
+UPLOAD_PART_SIZE = 16 * 1024 * 1024
+# default number of files uploaded in parallel
+UPLOAD_CONCURRENCY = 4
+
+
+class HashingReader:
+    """
+    Wraps a binary file object and computes the sha256 checksum and the size of the data while it is read by the
+    minio client, so uploads do not need a second pass over the data.
+    """
+
+    def __init__(self, fileobj: BinaryIO):
+        self._fileobj = fileobj
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._fileobj.read(size)
+        self._hash.update(data)
+        self.size += len(data)
+        return data
+
+    @property
+    def checksum(self) -> str:
+        return self._hash.hexdigest()
+
+
+def remaining_length(fileobj: BinaryIO) -> Optional[int]:
+    """
+    Get the number of bytes left to read in a seekable file object without reading it
+    Args:
+        fileobj: file object to check
+
+    Returns:
+        number of remaining bytes or None if the file object is not seekable
+    """
+    try:
+        position = fileobj.tell()
+        end = fileobj.seek(0, os.SEEK_END)
+        fileobj.seek(position)
+    except (AttributeError, OSError, ValueError):
+        return None
+    return end - position
@@ -1,7 +1,5 @@
 from typing import Any, Generic, List, Type, TypeVar, Union
 
-import requests
-import requests.auth
 from pydantic import BaseModel
 from requests import HTTPError
 
@@ -32,7 +30,7 @@ class ResourceClient(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def create(self, data: Union[CreateSchemaType, dict]) -> ModelType:
         if isinstance(data, dict):
             data = self.model(**data)
-        response = requests.post(
+        response = self._client.session.post(
             f"{self.base_url}/{self.resource_name}",
             json=data.dict(),
             headers=self._client.headers,
@@ -45,7 +43,7 @@ class ResourceClient(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return self.model(**response.json())
 
     def get(self, resource_id) -> ModelType:
-        response = requests.get(
+        response = self._client.session.get(
             f"{self.base_url}/{self.resource_name}/{resource_id}",
             headers=self._client.headers,
         )
@@ -53,7 +51,7 @@ class ResourceClient(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return self.model(**response.json())
 
     def get_multi(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
-        response = requests.get(
+        response = self._client.session.get(
             f"{self.base_url}/{self.resource_name}",
             params={"skip": skip, "limit": limit},
             headers=self._client.headers,
@@ -62,7 +60,7 @@ class ResourceClient(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return [self.model(**item) for item in response.json()]
 
     def update(self, resource_id: Any, data: UpdateSchemaType) -> ModelType:
-        response = requests.put(
+        response = self._client.session.put(
             f"{self.base_url}/{self.resource_name}/{resource_id}",
             json=data,
             headers=self._client.headers,
@@ -71,7 +69,7 @@ class ResourceClient(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return self.model(**response.json())
 
     def delete(self, resource_id) -> ModelType:
-        response = requests.delete(
+        response = self._client.session.delete(
             f"{self.base_url}/{self.resource_name}/{resource_id}",
             headers=self._client.headers,
         )
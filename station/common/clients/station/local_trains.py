@@ -13,7 +13,9 @@ from station.common.clients.resource_client import ResourceClient
 class LocalTrainClient(ResourceClient[LocalTrain, LocalTrainCreate, LocalTrainUpdate]):
     def download_train_archive(self, train_id: str) -> BytesIO:
         url = f"{self.base_url}/{self.resource_name}/{train_id}/archive"
-        with requests.get(url, headers=self._client.headers, stream=True) as r:
+        with self._client.session.get(
+            url, headers=self._client.headers, stream=True
+        ) as r:
             r.raise_for_status()
             file_obj = BytesIO()
             for chunk in r.iter_content():
@@ -32,13 +34,17 @@ class LocalTrainClient(ResourceClient[LocalTrain, LocalTrainCreate, LocalTrainUp
             "topic": "local-trains",
             "title": f"Local Train {train_id} failed",
         }
-        with requests.post(url, headers=self._client.headers, json=payload) as r:
+        with self._client.session.post(
+            url, headers=self._client.headers, json=payload
+        ) as r:
             r.raise_for_status()
 
     def update_train_status(self, train_id: str, status: str):
         url = f"{self.base_url}/{self.resource_name}/{train_id}"
         payload = {"status": status}
-        with requests.put(url, headers=self._client.headers, json=payload) as r:
+        with self._client.session.put(
+            url, headers=self._client.headers, json=payload
+        ) as r:
             try:
                 r.raise_for_status()
             except requests.exceptions.HTTPError as e:
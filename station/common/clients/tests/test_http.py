@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from station.common.clients.http import (
+    AsyncServiceClient,
+    get_session,
+    make_session,
+)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # number of requests answered with 503 before the stub succeeds
+    failures = 0
+    requests = 0
+    connections = set()
+
+    def do_GET(self):
+        StubHandler.requests += 1
+        StubHandler.connections.add(self.client_address)
+        status = 503 if StubHandler.requests <= StubHandler.failures else 200
+        body = b'{"status": "ok"}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    StubHandler.failures = 0
+    StubHandler.requests = 0
+    StubHandler.connections = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_reuses_connections(stub_url):
+    session = make_session()
+    for _ in range(5):
+        assert session.get(stub_url).json() == {"status": "ok"}
+    assert len(StubHandler.connections) == 1
+    assert get_session("airflow") is get_session("airflow")
+    assert get_session("airflow").timeout != get_session("fhir").timeout
+
+
+def test_session_retries_idempotent_requests(stub_url):
+    StubHandler.failures = 2
+    session = make_session(backoff=0)
+    assert session.get(stub_url).status_code == 200
+    assert StubHandler.requests == 3
+
+    # requests with side effects are not retried
+    StubHandler.requests = 0
+    assert session.post(stub_url).status_code == 503
+    assert StubHandler.requests == 1
+
+
+def test_async_client_retries(stub_url):
+    async def run():
+        client = AsyncServiceClient(backoff=0)
+        try:
+            StubHandler.failures = 1
+            first = await client.get(stub_url)
+            responses = await asyncio.gather(*(client.get(stub_url) for _ in range(5)))
+        finally:
+            await client.aclose()
+        return first, responses
+
+    first, responses = asyncio.run(run())
+    assert first.status_code == 200
+    assert all(r.json() == {"status": "ok"} for r in responses)
+    assert StubHandler.requests == 7
@@ -0,0 +1,59 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from station.common.clients.minio.archive import ArchiveEntry, iter_archive
+
+
+@pytest.fixture
+def archive_files():
+    return {
+        "dataset/a.csv": os.urandom(1000),
+        "dataset/images/b.png": os.urandom(3 * 1024 * 1024 + 7),
+        "dataset/" + "x" * 150: b"",
+    }
+
+
+def _make_entries(files: dict, chunk_size: int = 64 * 1024):
+    def chunks(data: bytes):
+        for i in range(0, len(data), chunk_size):
+            yield data[i : i + chunk_size]
+
+    return [ArchiveEntry(name, len(data), chunks(data)) for name, data in files.items()]
+
+
+def test_iter_tar_archive(archive_files):
+    blocks = list(iter_archive(_make_entries(archive_files), archive_type="tar"))
+
+    # blocks are bounded by the chunk size of the entries
+    assert max(len(block) for block in blocks) <= 64 * 1024
+    archive = b"".join(blocks)
+    assert len(archive) % tarfile.RECORDSIZE == 0
+
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        members = tar.getmembers()
+        assert [m.name for m in members] == list(archive_files.keys())
+        for member in members:
+            assert tar.extractfile(member).read() == archive_files[member.name]
+
+
+def test_iter_zip_archive(archive_files):
+    archive = b"".join(iter_archive(_make_entries(archive_files), archive_type="zip"))
+
+    with zipfile.ZipFile(io.BytesIO(archive)) as zip_file:
+        assert zip_file.testzip() is None
+        assert zip_file.namelist() == list(archive_files.keys())
+        for name in zip_file.namelist():
+            assert zip_file.read(name) == archive_files[name]
+
+
+def test_iter_archive_errors(archive_files):
+    with pytest.raises(ValueError):
+        iter_archive(_make_entries(archive_files), archive_type="rar")
+
+    entries = [ArchiveEntry("dataset/a.csv", 10, iter([b"12345"]))]
+    with pytest.raises(ValueError):
+        list(iter_archive(entries, archive_type="tar"))
@@ -0,0 +1,124 @@
+import hashlib
+import io
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from minio.datatypes import Object
+from minio.error import S3Error
+
+from station.common.clients.minio.artifacts import ModelArtifactStore
+from station.common.clients.minio.client import MinioClient
+
+
+class FakeResponse(io.BytesIO):
+    def stream(self, chunk_size):
+        while chunk := self.read(chunk_size):
+            yield chunk
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    def __init__(self):
+        self.objects = {}
+        self.requested = []
+
+    def list_objects(self, bucket, prefix=None, recursive=False, **kwargs):
+        for name in sorted(self.objects):
+            if name.startswith(prefix or ""):
+                yield Object(bucket, name, size=len(self.objects[name]))
+
+    def get_object(self, bucket_name, object_name, offset=0, length=None, **kwargs):
+        data = self.objects[object_name]
+        end = offset + length if length else len(data)
+        self.requested.append((object_name, end - offset))
+        return FakeResponse(data[offset:end])
+
+    def stat_object(self, bucket, name):
+        if name not in self.objects:
+            raise S3Error(None, "NoSuchKey", "", name, "", "")
+        return SimpleNamespace(size=len(self.objects[name]), metadata={})
+
+    def put_object(self, bucket_name, object_name, data, length, **kwargs):
+        # objects of unknown length are read in parts like a multipart upload
+        content = b""
+        while part := data.read(kwargs.get("part_size") or 1024):
+            content += part
+        self.objects[object_name] = content
+        return SimpleNamespace(
+            object_name=object_name, etag=hashlib.md5(content).hexdigest()
+        )
+
+
+@pytest.fixture
+def store() -> ModelArtifactStore:
+    client = MinioClient("localhost:9000", "access", "secret")
+    client.client = FakeMinio()
+    return ModelArtifactStore(client)
+
+
+def test_checkpoint_round_trip(store):
+    tensors = {
+        "layer.weight": np.random.rand(64, 32).astype(np.float32),
+        "layer.bias": np.zeros(32, dtype=np.float32),
+        "steps": np.array(7, dtype=np.int64),
+    }
+    checkpoint = store.save_checkpoint("train", 0, tensors.items())
+
+    assert checkpoint.base_round is None
+    assert store.list_rounds("train") == [0]
+    loaded = store.load_tensors("train")
+    assert loaded.keys() == tensors.keys()
+    for name, array in tensors.items():
+        assert loaded[name].dtype == array.dtype
+        np.testing.assert_array_equal(loaded[name], array)
+    # the loaded arrays can be modified in place
+    loaded["layer.bias"] += 1
+
+    # single tensors are read with a range request
+    store.client.client.requested.clear()
+    bias = store.load_tensors("train", 0, names=["layer.bias"])
+    assert list(bias) == ["layer.bias"]
+    data_requests = [r for r in store.client.client.requested if "tensors" in r[0]]
+    assert data_requests == [
+        (checkpoint.tensors[1].object_name, checkpoint.tensors[1].size)
+    ]
+
+
+def test_checkpoint_delta(store):
+    frozen = np.random.rand(128, 128).astype(np.float32)
+    first = store.save_checkpoint(
+        "train", 0, [("frozen", frozen), ("head", np.ones(10, dtype=np.float32))]
+    )
+    second = store.save_checkpoint(
+        "train", 1, [("frozen", frozen), ("head", np.full(10, 2, dtype=np.float32))]
+    )
+
+    assert second.base_round == 0
+    # the unchanged tensor references the data of the first round
+    assert second.tensors[0].object_name == first.tensors[0].object_name
+    assert second.stored_size == second.tensors[1].size
+    assert second.stored_size < first.stored_size
+
+    loaded = store.load_tensors("train", 1)
+    np.testing.assert_array_equal(loaded["frozen"], frozen)
+    np.testing.assert_array_equal(loaded["head"], np.full(10, 2))
+
+
+def test_empty_tensors():
+    client = MinioClient("localhost:9000", "access", "secret")
+    client.client = FakeMinio()
+    store = ModelArtifactStore(client, compression=None)
+    tensors = [
+        ("empty", np.empty((0, 16), dtype=np.float32)),
+        ("bias", np.arange(4, dtype=np.float32)),
+    ]
+    checkpoint = store.save_checkpoint("train", 0, tensors)
+    assert checkpoint.tensors[0].size == 0
+
+    loaded = store.load_tensors("train")
+    assert loaded["empty"].shape == (0, 16)
+    assert loaded["empty"].dtype == np.float32
+    np.testing.assert_array_equal(loaded["bias"], tensors[1][1])
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import time
+
+import pytest
+
+from station.app.schemas.datasets import MinioFile
+from station.common.clients.minio.cache import ChecksumError, ObjectCache
+from station.common.clients.minio.client import MinioClient
+
+
+class FakeResponse:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def stream(self, chunk_size):
+        for start in range(0, len(self.data), chunk_size):
+            yield self.data[start : start + chunk_size]
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    def __init__(self, objects):
+        self.objects = objects
+        self.requests = 0
+
+    def get_object(self, bucket_name, object_name):
+        self.requests += 1
+        return FakeResponse(self.objects[object_name])
+
+
+def make_item(name: str, data: bytes, etag: str = None) -> MinioFile:
+    return MinioFile(
+        file_name=name,
+        full_path=name,
+        size=len(data),
+        etag=etag or hashlib.md5(data).hexdigest(),
+    )
+
+
+@pytest.fixture
+def objects():
+    return {f"dataset/{i}.png": bytes([i]) * 100 for i in range(5)}
+
+
+@pytest.fixture
+def minio_client(objects) -> MinioClient:
+    client = MinioClient("localhost:9000", "access", "secret")
+    client.client = FakeMinio(objects)
+    return client
+
+
+def test_cache_hit_and_changed_object(tmp_path, minio_client, objects):
+    cache = ObjectCache(minio_client, str(tmp_path), chunk_size=32)
+    item = make_item("dataset/0.png", objects["dataset/0.png"])
+
+    assert cache.read("datasets", item) == objects["dataset/0.png"]
+    assert cache.read("datasets", item) == objects["dataset/0.png"]
+    assert minio_client.client.requests == 1
+
+    # a changed etag is a cache miss and the previous version is removed
+    objects["dataset/0.png"] = b"changed"
+    changed = make_item("dataset/0.png", objects["dataset/0.png"])
+    assert cache.read("datasets", changed) == b"changed"
+    assert minio_client.client.requests == 2
+    assert cache.size == len(b"changed")
+    assert len(os.listdir(os.path.dirname(cache.get_path("datasets", changed)))) == 1
+
+    # a new cache on the same directory finds the cached file
+    assert ObjectCache(minio_client, str(tmp_path)).contains("datasets", changed)
+
+
+def test_checksum_mismatch(tmp_path, minio_client, objects):
+    cache = ObjectCache(minio_client, str(tmp_path))
+    item = make_item("dataset/1.png", objects["dataset/1.png"], etag="0" * 32)
+
+    with pytest.raises(ChecksumError):
+        cache.get_path("datasets", item)
+    assert not cache.contains("datasets", item)
+    assert cache.size == 0
+
+    # etags of multipart uploads are not validated
+    multipart = make_item("dataset/1.png", objects["dataset/1.png"], etag="abc-2")
+    assert cache.read("datasets", multipart) == objects["dataset/1.png"]
+
+
+def test_lru_eviction(tmp_path, minio_client, objects):
+    cache = ObjectCache(minio_client, str(tmp_path), max_size=300)
+    items = [make_item(name, data) for name, data in objects.items()]
+
+    for item in items[:3]:
+        cache.get_path("datasets", item)
+        time.sleep(0.01)
+    # the first item becomes the most recently used one
+    cache.get_path("datasets", items[0])
+    time.sleep(0.01)
+    cache.get_path("datasets", items[3])
+
+    assert cache.size == 300
+    assert [cache.contains("datasets", item) for item in items[:4]] == [
+        True,
+        False,
+        True,
+        True,
+    ]
+
+
+def test_prefetch_respects_size(tmp_path, minio_client, objects):
+    cache = ObjectCache(minio_client, str(tmp_path), max_size=350)
+    items = [make_item(name, data) for name, data in objects.items()]
+
+    assert cache.prefetch("datasets", items, concurrency=2) == 3
+    assert minio_client.client.requests == 3
+    assert cache.size == 300
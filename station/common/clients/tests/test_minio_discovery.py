@@ -0,0 +1,71 @@
+import pytest
+from minio.datatypes import Object
+
+from station.common.clients.minio.client import MinioClient
+
+
+class FakeMinio:
+    def __init__(self, objects):
+        self.objects = dict(sorted(objects.items()))
+        self.list_calls = 0
+
+    def list_objects(self, bucket, prefix=None, recursive=False, **kwargs):
+        self.list_calls += 1
+        folders = set()
+        for name, size in self.objects.items():
+            if not name.startswith(prefix or ""):
+                continue
+            relative = name[len(prefix or "") :]
+            if not recursive and "/" in relative:
+                folder = prefix + relative.split("/")[0] + "/"
+                if folder not in folders:
+                    folders.add(folder)
+                    yield Object(bucket, folder)
+                continue
+            yield Object(bucket, name, size=size, etag="etag")
+
+
+@pytest.fixture
+def minio_client() -> MinioClient:
+    client = MinioClient("localhost:9000", "access", "secret")
+    objects = {
+        f"images/class_{c:03d}/{i}.{'png' if i % 2 else 'jpg'}": 10
+        for c in range(100)
+        for i in range(4)
+    }
+    objects["images/labels.csv"] = 100
+    objects["images_2/class_000/0.png"] = 10
+    client.client = FakeMinio(objects)
+    return client
+
+
+def test_class_distributions_single_listing(minio_client):
+    distributions = minio_client.get_class_distributions("images")
+
+    assert minio_client.client.list_calls == 1
+    assert len(distributions) == 100
+    assert distributions[0] == {"class_name": "class_000", "n_items": 4}
+    assert sum(d["n_items"] for d in distributions) == 400
+
+
+def test_class_distribution_details(minio_client):
+    distributions = minio_client.get_class_distributions(
+        "images/", classes=["class_001", "missing"], include_details=True
+    )
+
+    assert distributions == [
+        {
+            "class_name": "class_001",
+            "n_items": 4,
+            "size": 40,
+            "file_types": {"jpg": 2, "png": 2},
+        },
+        {"class_name": "missing", "n_items": 0, "size": 0, "file_types": {}},
+    ]
+
+
+def test_classes_by_folders(minio_client):
+    classes = minio_client.get_classes_by_folders("images")
+
+    assert minio_client.client.list_calls == 1
+    assert classes == [f"class_{c:03d}" for c in range(100)]
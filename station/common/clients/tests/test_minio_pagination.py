@@ -0,0 +1,72 @@
+import pytest
+from minio.datatypes import Object
+
+from station.common.clients.minio.client import MinioClient
+from station.common.clients.minio.pagination import (
+    decode_continuation_token,
+    encode_continuation_token,
+)
+
+
+class FakeMinio:
+    def __init__(self, names):
+        self.names = sorted(names)
+        self.listed = 0
+
+    def list_objects(
+        self, bucket, prefix=None, recursive=False, start_after=None, **kwargs
+    ):
+        for name in self.names:
+            if name.startswith(prefix or "") and (
+                not start_after or name > start_after
+            ):
+                self.listed += 1
+                yield Object(bucket, name, size=1, etag="etag")
+
+
+@pytest.fixture
+def minio_client() -> MinioClient:
+    client = MinioClient("localhost:9000", "access", "secret")
+    names = [f"dataset/file_{i:04d}.csv" for i in range(250)]
+    names += ["dataset/_columnar/file_0000.csv.parquet", "dataset/images/a.png"]
+    client.client = FakeMinio(names)
+    return client
+
+
+def test_continuation_token():
+    token = encode_continuation_token("dataset/a b/ü.csv")
+    assert decode_continuation_token(token, "dataset/") == "dataset/a b/ü.csv"
+
+    with pytest.raises(ValueError):
+        decode_continuation_token(token, "other/")
+    with pytest.raises(ValueError):
+        decode_continuation_token("not a token")
+
+
+def test_list_dataset_files_page(minio_client):
+    names = []
+    token = None
+    while True:
+        page, token = minio_client.list_dataset_files_page(
+            "dataset", limit=100, continuation_token=token
+        )
+        assert len(page) <= 100
+        names += [item.full_path for item in page]
+        if token is None:
+            break
+
+    assert len(names) == 251
+    assert names == sorted(names)
+    assert not any("_columnar" in name for name in names)
+
+
+def test_list_dataset_files_prefix(minio_client):
+    page, token = minio_client.list_dataset_files_page("dataset", prefix="images/")
+    assert [item.full_path for item in page] == ["dataset/images/a.png"]
+    assert token is None
+
+    # only the objects of the page and the first object of the next page are listed
+    minio_client.client.listed = 0
+    page, token = minio_client.list_dataset_files_page("dataset", limit=10)
+    assert token is not None
+    assert minio_client.client.listed <= 12
@@ -0,0 +1,49 @@
+import threading
+import time
+
+import pytest
+
+from station.common.clients.minio.prefetch import iter_prefetched
+
+
+def test_iter_prefetched_keeps_order():
+    def fetch(i: int) -> int:
+        # later items finish first
+        time.sleep((20 - i) * 0.001)
+        return i * 2
+
+    results = list(iter_prefetched(range(20), fetch, concurrency=4, read_ahead=8))
+    assert results == [i * 2 for i in range(20)]
+
+
+def test_iter_prefetched_bounds_read_ahead():
+    lock = threading.Lock()
+    fetched = []
+
+    def fetch(i: int) -> int:
+        with lock:
+            fetched.append(i)
+        return i
+
+    iterator = iter_prefetched(range(100), fetch, concurrency=2, read_ahead=4)
+    assert next(iterator) == 0
+    time.sleep(0.05)
+    # one consumed result plus the read ahead window
+    assert len(fetched) <= 5
+    iterator.close()
+    assert len(fetched) < 100
+
+
+def test_iter_prefetched_raises_fetch_errors():
+    def fetch(i: int) -> int:
+        if i == 3:
+            raise KeyError(i)
+        return i
+
+    iterator = iter_prefetched(range(10), fetch, concurrency=2, read_ahead=2)
+    assert [next(iterator) for _ in range(3)] == [0, 1, 2]
+    with pytest.raises(KeyError):
+        next(iterator)
+
+    with pytest.raises(ValueError):
+        list(iter_prefetched(range(10), fetch, concurrency=0))
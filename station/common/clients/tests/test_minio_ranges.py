@@ -0,0 +1,55 @@
+import io
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from station.common.clients.minio.ranges import RangeReader
+
+
+class FakeResponse(io.BytesIO):
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.requests = []
+
+    def get_object(self, bucket_name, object_name, offset=0, length=None):
+        self.requests.append((offset, length))
+        end = len(self.data) if length is None else offset + length
+        return FakeResponse(self.data[offset:end])
+
+
+def test_range_reader():
+    data = os.urandom(10_000)
+    client = FakeMinio(data)
+    reader = io.BufferedReader(
+        RangeReader(client, "bucket", "object", len(data)), buffer_size=1000
+    )
+
+    assert reader.read(10) == data[:10]
+    reader.seek(-100, io.SEEK_END)
+    assert reader.read() == data[-100:]
+    reader.seek(5000)
+    assert reader.read(2000) == data[5000:7000]
+    assert reader.read(0) == b""
+    # only the requested ranges are fetched
+    assert sum(length for _, length in client.requests) < len(data) / 2
+
+
+def test_parquet_column_projection():
+    table = pa.table({f"column_{i}": list(range(100_000)) for i in range(10)})
+    sink = io.BytesIO()
+    pq.write_table(table, sink)
+    data = sink.getvalue()
+
+    client = FakeMinio(data)
+    source = io.BufferedReader(RangeReader(client, "bucket", "data.parquet", len(data)))
+    projected = pq.read_table(source, columns=["column_3"])
+
+    assert projected.column_names == ["column_3"]
+    assert projected.num_rows == 100_000
+    assert sum(length for _, length in client.requests) < len(data) / 4
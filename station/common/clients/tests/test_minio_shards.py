@@ -0,0 +1,138 @@
+import hashlib
+import io
+import os
+from types import SimpleNamespace
+
+from minio.datatypes import Object
+from minio.error import S3Error
+
+from station.common.clients.minio.client import MinioClient
+from station.common.clients.minio.shards import (
+    MappedShard,
+    ShardWriter,
+    iter_shard,
+    load_shard_index,
+    pack_dataset,
+)
+
+
+class FakeResponse(io.BytesIO):
+    def stream(self, chunk_size):
+        while chunk := self.read(chunk_size):
+            yield chunk
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    def __init__(self, objects):
+        self.objects = dict(objects)
+        self.requests = 0
+
+    def list_objects(self, bucket, prefix=None, recursive=False, **kwargs):
+        folders = set()
+        for name in sorted(self.objects):
+            if not name.startswith(prefix or ""):
+                continue
+            relative = name[len(prefix or "") :]
+            if not recursive and "/" in relative:
+                folder = (prefix or "") + relative.split("/")[0] + "/"
+                if folder not in folders:
+                    folders.add(folder)
+                    yield Object(bucket, folder)
+                continue
+            data = self.objects[name]
+            yield Object(bucket, name, size=len(data), etag=_etag(data))
+
+    def get_object(self, bucket_name, object_name, **kwargs):
+        self.requests += 1
+        return FakeResponse(self.objects[object_name])
+
+    def stat_object(self, bucket, name):
+        if name not in self.objects:
+            raise S3Error(None, "NoSuchKey", "", name, "", "")
+        data = self.objects[name]
+        return SimpleNamespace(size=len(data), etag=_etag(data), metadata={})
+
+    def put_object(self, bucket_name, object_name, data, length, **kwargs):
+        self.objects[object_name] = data.read()
+        return SimpleNamespace(
+            object_name=object_name, etag=_etag(self.objects[object_name])
+        )
+
+    def remove_object(self, bucket_name, object_name):
+        del self.objects[object_name]
+
+
+def _etag(data: bytes) -> str:
+    return hashlib.md5(data).hexdigest()
+
+
+def test_shard_writer_offsets(tmp_path):
+    files = {f"cls_{i % 3}/{i}.png": os.urandom(100 + i * 300) for i in range(20)}
+    writer = ShardWriter(shard_size=4096)
+    shards = []
+    for name, data in files.items():
+        completed = writer.add(name, data, name.split("/")[0])
+        if completed:
+            shards.append(completed)
+    completed = writer.close()
+    if completed:
+        shards.append(completed)
+
+    assert len(shards) > 1
+    assert sum(len(shard.members) for shard, _ in shards) == len(files)
+    for i, (shard, file) in enumerate(shards):
+        content = file.read()
+        assert shard.size == len(content)
+        # the tar shards can be read sequentially
+        members = list(iter_shard(io.BytesIO(content)))
+        assert [name for name, _ in members] == [m.name for m in shard.members]
+        # and the members can be read from the memory mapped file at their offsets
+        path = tmp_path / f"{i}.tar"
+        path.write_bytes(content)
+        mapped = MappedShard(str(path))
+        for member in shard.members:
+            assert bytes(mapped.read(member)) == files[member.name]
+        mapped.close()
+
+
+def test_pack_dataset():
+    files = {f"images/cls_{i % 2}/{i}.png": os.urandom(1000) for i in range(10)}
+    client = MinioClient("localhost:9000", "access", "secret")
+    client.client = FakeMinio(files)
+
+    assert load_shard_index(client, "images") is None
+    first = pack_dataset(client, "images", shard_size=4096)
+    assert first.n_items == 10
+    assert first.classes == ["cls_0", "cls_1"]
+    assert len(first.shards) == 4
+
+    # the shards are not listed as files of the dataset
+    assert len(client.get_dataset_files("images")) == 10
+
+    second = pack_dataset(client, "images", shard_size=1024 * 1024)
+    assert load_shard_index(client, "images") == second
+    assert len(second.shards) == 1
+    # shards of the previous pack are removed
+    assert all(shard.name not in client.client.objects for shard in first.shards)
+
+    with client.open_file("datasets", second.shards[0].name) as stream:
+        members = dict(iter_shard(stream))
+    assert members == {name[len("images/") :]: data for name, data in files.items()}
+
+
+def test_packed_dataset_classes():
+    files = {f"images/cls_{i % 2}/{i}.png": os.urandom(1000) for i in range(10)}
+    client = MinioClient("localhost:9000", "access", "secret")
+    client.client = FakeMinio(files)
+    pack_dataset(client, "images", shard_size=4096)
+    client.client.objects["images/_columnar/labels.csv.parquet"] = b"parquet"
+
+    # the directories of the shards and columnar copies are not classes
+    assert client.get_classes_by_folders("images") == ["cls_0", "cls_1"]
+    assert client.get_class_distributions("images") == [
+        {"class_name": "cls_0", "n_items": 5},
+        {"class_name": "cls_1", "n_items": 5},
+    ]
@@ -0,0 +1,33 @@
+import hashlib
+import io
+import os
+
+from station.common.clients.minio.upload import HashingReader, remaining_length
+
+
+def test_hashing_reader():
+    data = os.urandom(100_000)
+    reader = HashingReader(io.BytesIO(data))
+
+    parts = []
+    while True:
+        part = reader.read(30_000)
+        if not part:
+            break
+        parts.append(part)
+
+    assert b"".join(parts) == data
+    assert reader.size == len(data)
+    assert reader.checksum == hashlib.sha256(data).hexdigest()
+
+
+def test_remaining_length():
+    file = io.BytesIO(b"0123456789")
+    assert remaining_length(file) == 10
+
+    file.read(4)
+    assert remaining_length(file) == 6
+    # the position of the file is not changed
+    assert file.read() == b"456789"
+
+    assert remaining_length(object()) is None
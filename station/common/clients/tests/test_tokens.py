@@ -0,0 +1,61 @@
+import threading
+import time
+
+from station.common.clients.tokens import TokenManager, get_token_manager
+
+
+class Fetcher:
+    def __init__(self, lifetime: float, delay: float = 0.0):
+        self.lifetime = lifetime
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"token-{self.calls}", self.lifetime
+
+
+def test_concurrent_misses_are_coalesced():
+    fetch = Fetcher(lifetime=3600, delay=0.1)
+    manager = TokenManager(fetch)
+    tokens = []
+    threads = [
+        threading.Thread(target=lambda: tokens.append(manager.get_token()))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    manager.stop()
+
+    assert fetch.calls == 1
+    assert tokens == ["token-1"] * 10
+
+
+def test_background_refresh():
+    fetch = Fetcher(lifetime=1.0)
+    manager = TokenManager(fetch, refresh_margin=0.5)
+    assert manager.get_token() == "token-1"
+    time.sleep(0.75)
+    # the token was refreshed before it expired without a caller waiting for it
+    assert fetch.calls == 2
+    start = time.perf_counter()
+    assert manager.get_token() == "token-2"
+    assert time.perf_counter() - start < 0.05
+
+    assert manager.refresh() == "token-3"
+    manager.stop()
+
+
+def test_shared_managers():
+    first = get_token_manager("http://auth/token", robot_id="robot", robot_secret="a")
+    assert (
+        get_token_manager("http://auth/token", robot_id="robot", robot_secret="a")
+        is first
+    )
+    assert (
+        get_token_manager("http://auth/token", robot_id="robot", robot_secret="b")
+        is not first
+    )
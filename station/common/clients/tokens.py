@@ -0,0 +1,204 @@
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from loguru import logger
+from pydantic import SecretStr
+
+from station.common.clients.http import get_session
+
+# tokens are refreshed this many seconds before they expire
+TOKEN_REFRESH_MARGIN = 60
+# delay before a failed background refresh is retried, doubled after every failure
+TOKEN_RETRY_DELAY = 1.0
+TOKEN_MAX_RETRY_DELAY = 60.0
+
+# fetches a new token and returns it with its lifetime in seconds
+TokenFetcher = Callable[[], Tuple[str, float]]
+
+
+class TokenManager:
+    """
+    Holds the token of a set of credentials. A background thread refreshes the token shortly before it expires, so
+    callers get a valid token without waiting for the auth server. Concurrent callers that find no valid token wait
+    for a single request instead of requesting a token each.
+    """
+
+    def __init__(
+        self,
+        fetch: TokenFetcher,
+        refresh_margin: float = TOKEN_REFRESH_MARGIN,
+        name: str = "token",
+    ):
+        self.fetch = fetch
+        self.refresh_margin = refresh_margin
+        self.name = name
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get_token(self) -> str:
+        """
+        Get a valid token, a token is only requested if there is no valid token yet
+        """
+        token = self._valid_token()
+        if token:
+            return token
+        with self._lock:
+            # another caller may have fetched the token while this one was waiting
+            token = self._valid_token()
+            if token:
+                return token
+            token = self._refresh()
+        self._start()
+        return token
+
+    def refresh(self) -> str:
+        """
+        Request a new token, e.g. after the current token was rejected
+        """
+        with self._lock:
+            token = self._refresh()
+        self._start()
+        return token
+
+    def invalidate(self):
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _valid_token(self) -> Optional[str]:
+        token, expires_at = self._token, self._expires_at
+        if token and time.time() < expires_at:
+            return token
+        return None
+
+    def _refresh(self) -> str:
+        logger.debug(f"Requesting new {self.name}")
+        token, expires_in = self.fetch()
+        self._token = token
+        self._expires_at = time.time() + expires_in
+        # reschedule the background refresh for the new expiration
+        self._wakeup.set()
+        return token
+
+    def _start(self):
+        if self._thread is None and not self._stopped.is_set():
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name=f"{self.name}-refresh", daemon=True
+                    )
+                    self._thread.start()
+
+    def _run(self):
+        retry_delay = TOKEN_RETRY_DELAY
+        while not self._stopped.is_set():
+            # refresh before the token expires, but not before half of its lifetime has passed
+            remaining = self._expires_at - time.time()
+            delay = max(remaining - self.refresh_margin, remaining / 2, 0)
+            self._wakeup.clear()
+            if self._wakeup.wait(delay):
+                continue
+            try:
+                with self._lock:
+                    self._refresh()
+                retry_delay = TOKEN_RETRY_DELAY
+            except Exception as e:
+                logger.warning(
+                    f"Could not refresh {self.name}, retrying in {retry_delay}s: {e}"
+                )
+                if self._stopped.wait(retry_delay):
+                    break
+                retry_delay = min(retry_delay * 2, TOKEN_MAX_RETRY_DELAY)
+
+
+def request_token(
+    token_url: str,
+    username: str = None,
+    password: str = None,
+    robot_id: str = None,
+    robot_secret: str = None,
+) -> Tuple[str, float]:
+    """
+    Request a token from the token endpoint of the auth server with user or robot credentials
+    Args:
+        token_url: token endpoint of the auth server
+        username: name of the user
+        password: password of the user
+        robot_id: id of the robot
+        robot_secret: secret of the robot
+
+    Returns:
+        The access token and its lifetime in seconds
+    """
+    if isinstance(password, SecretStr):
+        password = password.get_secret_value()
+    if isinstance(robot_secret, SecretStr):
+        robot_secret = robot_secret.get_secret_value()
+
+    if username and password:
+        data = {"grant_type": "password", "username": username, "password": password}
+    elif robot_id and robot_secret:
+        data = {
+            "grant_type": "robot_credentials",
+            "id": robot_id,
+            "secret": robot_secret,
+        }
+    else:
+        raise ValueError("No credentials provided")
+
+    r = get_session("auth").post(token_url, data=data)
+    r.raise_for_status()
+    response = r.json()
+    return response["access_token"], float(response["expires_in"])
+
+
+_managers: Dict[Tuple[str, str, str], TokenManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_token_manager(
+    token_url: str,
+    username: str = None,
+    password: str = None,
+    robot_id: str = None,
+    robot_secret: str = None,
+) -> TokenManager:
+    """
+    Get the token manager shared by all clients using the same credentials at the same auth server
+    """
+    if isinstance(password, SecretStr):
+        password = password.get_secret_value()
+    if isinstance(robot_secret, SecretStr):
+        robot_secret = robot_secret.get_secret_value()
+    key = (token_url, robot_id or username, robot_secret or password)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = TokenManager(
+                lambda: request_token(
+                    token_url, username, password, robot_id, robot_secret
+                ),
+                name=f"token of {key[1]}",
+            )
+            _managers[key] = manager
+        return manager
+
+
+def stop_token_managers():
+    with _managers_lock:
+        managers = list(_managers.values())
+        _managers.clear()
+    for manager in managers:
+        manager.stop()
@@ -77,3 +77,11 @@ class Icons(Enum):
     CHECKMARK = "✓"
     CROSS = "❌"
     WARNING = "⚠"
+
+
+# directory of the columnar copies of the tabular files of a dataset, next to the uploaded files
+DATASET_COLUMNAR_DIRECTORY = "_columnar"
+# directory of the packed shards of the files of a dataset
+DATASET_SHARD_DIRECTORY = "_shards"
+# directories of files created by the station from the uploaded files, they are not listed as files of the dataset
+DATASET_DERIVED_DIRECTORIES = (DATASET_COLUMNAR_DIRECTORY, DATASET_SHARD_DIRECTORY)
@@ -1,7 +1,10 @@
-from typing import Dict, List, Union
+from typing import List
+
+from loguru import logger
 
 from station.app.models.datasets import DataSet
 from station.common.clients.minio import MinioClient
+from station.common.clients.minio.discovery import ClassDistribution
 
 
 def perform_discovery(ds: DataSet):
@@ -19,13 +22,13 @@ def perform_discovery(ds: DataSet):
         raise NotImplementedError(f"Unsupported storage type: {ds.storage_type}")
 
 
-def _minio_discovery(ds: DataSet) -> List[Dict[str, Union[int, str]]]:
-    print("Performing minio discovery")
+def _minio_discovery(ds: DataSet) -> List[ClassDistribution]:
+    logger.info("Performing minio discovery")
     minio_client = MinioClient()
 
-    local_classes = minio_client.get_classes_by_folders(ds.access_path)
+    # the classes are found and counted in the same listing of the dataset
     class_distribution = minio_client.get_class_distributions(
-        ds.access_path, local_classes
+        ds.access_path, include_details=True
     )
 
     return class_distribution
@@ -7,6 +7,7 @@ from torchvision.transforms import Compose, ToTensor
 
 from station.common.clients.minio import MinioClient
 from station.worker.loader.dataset import MinioFolderDS
+from station.worker.loader.decode import BatchDecoder
 
 
 class BaseLoader:
@@ -34,9 +35,14 @@ class BaseLoader:
         if isinstance(self.data_set, str):
             # Get data from db
             self.data_set = self.get_data_set()
-        if self.config:
-            return DataLoader(self.data_set, **self.config)
-        return DataLoader(self.data_set)
+        config = dict(self.config or {})
+        if getattr(self.data_set, "raw", False) and "collate_fn" not in config:
+            # decode the encoded images of raw datasets per batch
+            config["collate_fn"] = BatchDecoder(
+                pin_memory=config.get("pin_memory", False)
+                and not config.get("num_workers")
+            )
+        return DataLoader(self.data_set, **config)
 
     def make_lightning_data_module(self) -> pl.LightningDataModule:
         pass
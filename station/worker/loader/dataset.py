@@ -1,21 +1,85 @@
 from abc import ABC
-from typing import Generator, Iterator, List
+from typing import (
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import numpy as np
 import torch
-from minio import datatypes
-from PIL import Image
 from torch.utils.data import DataLoader, Dataset, IterableDataset
 from torch.utils.data.dataset import T_co
 from torchvision.transforms import CenterCrop, Compose, ToTensor
 
+from station.app.schemas.datasets import MinioFile
 from station.common.clients.minio import MinioClient
+from station.common.clients.minio.cache import CACHE_SIZE, ObjectCache
+from station.common.clients.minio.shards import (
+    MappedShard,
+    Shard,
+    iter_shard,
+    load_shard_index,
+    shard_files,
+)
+from station.common.constants import DataDirectories
+from station.worker.loader.decode import decode_image, image_to_tensor
+
+T = TypeVar("T")
 
 
 class BaseDataSet(Dataset, ABC):
     id: str
 
 
+def get_shard(num_workers: int = 1, worker_id: int = 0) -> Tuple[int, int]:
+    """
+    Get the index of the shard the current dataloader worker iterates over and the total number of shards. Every
+    worker of every distributed rank gets its own shard.
+
+    :param num_workers: number of dataloader workers per rank
+    :param worker_id: id of the current dataloader worker
+    :return: Tuple of the shard index and the number of shards
+    """
+    rank, world_size = 0, 1
+    if torch.distributed.is_available() and torch.distributed.is_initialized():
+        rank = torch.distributed.get_rank()
+        world_size = torch.distributed.get_world_size()
+    return rank * num_workers + worker_id, world_size * num_workers
+
+
+def get_worker_shard(client: MinioClient) -> Tuple[int, int, MinioClient]:
+    """
+    Get the shard of the current dataloader worker and a minio client to use in the worker
+
+    :param client: minio client of the dataset
+    :return: Tuple of the shard index, the number of shards and the client
+    """
+    worker_info = torch.utils.data.get_worker_info()
+    if worker_info is None:
+        return (*get_shard(), client)
+    # connections of the parent process must not be shared with the worker processes
+    worker_client = MinioClient(
+        minio_server=client.minio_server,
+        access_key=client.access_key,
+        secret_key=client.secret_key,
+    )
+    return (*get_shard(worker_info.num_workers, worker_info.id), worker_client)
+
+
+def shard_items(items: Sequence[T], shard: int, num_shards: int) -> List[T]:
+    """
+    Deterministically select every num_shards-th item starting at the shard index, so the shards are disjoint,
+    cover all items and differ in size by at most one item
+    """
+    return list(items[shard::num_shards])
+
+
 class MinioFolderDataSet(IterableDataset):
     def __init__(
         self, minio_client: MinioClient, id: str = None, transform: Compose = None
@@ -24,47 +88,38 @@ class MinioFolderDataSet(IterableDataset):
         self.id = id
         self.client = minio_client
         self.transform = transform
+        self.items: Optional[List[str]] = None
 
     def __iter__(self) -> Iterator[T_co]:
-        worker_info = torch.utils.data.get_worker_info()
-
-        if worker_info is None:
-            return self._make_generator()
-
-        else:
-            print(worker_info.num_workers)
-            # TODO
-            raise NotImplementedError(
-                "Implement sliced generators for multiworker loading"
-            )
+        shard, num_shards, client = get_worker_shard(self.client)
+        items = shard_items(self._get_minio_items(), shard, num_shards)
+        return self._make_image_generator(client, items)
 
     def _make_generator(self, id: str = None):
-        if id:
+        if id and id != self.id:
             self.id = id
-        minio_items = self._get_minio_items()
-
-        tensor_generator = self._make_image_generator(minio_items)
-        return tensor_generator
-
-    def _get_minio_items(self) -> Generator[datatypes.Object, None, None]:
-        items = self.client.get_minio_dir_items(self.id)
-        return items
+            self.items = None
+        return iter(self)
+
+    def _get_minio_items(self) -> List[str]:
+        # the object names are listed once and shared with the workers, sorted to shard them deterministically
+        if self.items is None:
+            self.items = sorted(
+                item.full_path for item in self.client.iter_dataset_files(self.id)
+            )
+        return self.items
 
     def _make_image_generator(
-        self, minio_items: Generator[datatypes.Object, None, None]
+        self, client: MinioClient, items: List[str]
     ) -> Generator[torch.Tensor, None, None]:
-        for i, object in enumerate(minio_items):
-            minio_object = self.client.client.get_object(
-                "data-sets", object.object_name
-            )
-            np_img = np.array(Image.open(minio_object))
-
-            print(object.object_name)
+        for name in items:
+            with client.open_file(DataDirectories.DATASETS.value, name) as response:
+                image = decode_image(response.read())
 
             if self.transform:
-                yield self.transform(np_img)
+                yield self.transform(np.array(image))
             else:
-                yield np_img
+                yield image_to_tensor(image)
 
 
 class MinioFolderDS(Dataset):
@@ -76,14 +131,25 @@ class MinioFolderDS(Dataset):
         data_set_id: str = None,
         transform: Compose = None,
         target_classes: List[str] = None,
+        cache_dir: str = None,
+        cache_size: int = CACHE_SIZE,
+        warm_up: bool = False,
+        raw: bool = False,
     ):
         super().__init__()
         self.data_set_id = data_set_id
         self.minio_client = client
         self.transform = transform
+        # return the encoded images to decode them per batch with a BatchDecoder
+        self.raw = raw
         self.items = None
+        self.files: List[MinioFile] = []
+        # objects are read from the local cache after they were downloaded once
+        self.cache = ObjectCache(client, cache_dir, cache_size) if cache_dir else None
 
         self.get_minio_items()
+        if warm_up:
+            self.save()
 
         if target_classes:
             self.classes = np.asarray(target_classes)
@@ -91,42 +157,171 @@ class MinioFolderDS(Dataset):
             self.classes = self.get_classes_from_folders()
 
     def __getitem__(self, index) -> T_co:
-        minio_object = self.minio_client.client.get_object(
-            "datasets", self.items[index]
-        )
-        np_img = np.array(Image.open(minio_object))
-        np_img = np.transpose(np_img.astype(float), (2, 1, 0))
-        label = self.get_label(self.items[index])
-        if self.transform:
-            return self.transform(np_img), label
-        return torch.Tensor(np_img), label
+        bucket = DataDirectories.DATASETS.value
+        if self.cache:
+            data = self.cache.read(bucket, self.files[index])
+        else:
+            data = self.minio_client.get_file(bucket, self.items[index])
+        class_name = self._get_folder(self.items[index])
+        if self.raw:
+            return data, self.classes == class_name
+        return make_sample(data, self.classes, class_name, self.transform)
 
     def __len__(self):
         return len(list(self.items))
 
     def get_label(self, item_name: str):
-        folder = item_name[len(self.data_set_id) :].split("/")[0]
-        label = self.classes == folder
+        label = self.classes == self._get_folder(item_name)
         return torch.tensor(label, dtype=torch.long)
 
-    def get_minio_items(self):
-        minio_items = self.minio_client.get_minio_dir_items(self.data_set_id)
-        item_list = []
-        for item in minio_items:
-            item_list.append(item.object_name)
-
-        self.items = item_list
+    def _get_folder(self, item_name: str) -> str:
+        return item_name[len(self.data_set_id.strip("/")) + 1 :].split("/")[0]
 
-    def save(self):
-        # TODO Save the full data set to disk somewhere to enable fast loading
-        pass
+    def get_minio_items(self):
+        self.files = sorted(
+            self.minio_client.iter_dataset_files(self.data_set_id.strip("/")),
+            key=lambda item: item.full_path,
+        )
+        self.items = [item.full_path for item in self.files]
+
+    def save(self, cache_dir: str = None) -> int:
+        """
+        Download all objects of the data set into the local cache, so the first epoch already reads them from disk.
+        Objects that do not fit into the cache are read from minio.
+
+        :param cache_dir: cache directory to use instead of the one given to the constructor
+        :return: number of cached objects
+        """
+        if cache_dir:
+            max_size = self.cache.max_size if self.cache else CACHE_SIZE
+            self.cache = ObjectCache(self.minio_client, cache_dir, max_size)
+        if not self.cache:
+            raise ValueError("No cache directory configured for the data set")
+        return self.cache.prefetch(DataDirectories.DATASETS.value, self.files)
 
     def get_classes_from_folders(self):
         classes = self.minio_client.get_classes_by_folders(self.data_set_id)
-        print(classes)
         return np.asarray(classes)
 
 
+class MinioShardDataSet(IterableDataset):
+    """
+    Streams the samples of a packed dataset shard by shard. The shards are split between the dataloader workers and
+    distributed ranks and every shard is read with a single sequential request.
+    """
+
+    def __init__(
+        self,
+        minio_client: MinioClient,
+        data_set_id: str,
+        transform: Compose = None,
+        raw: bool = False,
+    ):
+        super().__init__()
+        self.data_set_id = data_set_id
+        self.client = minio_client
+        self.transform = transform
+        self.raw = raw
+        self.index = load_shard_index(minio_client, data_set_id)
+        if not self.index:
+            raise ValueError(f"Data set {data_set_id} is not packed into shards")
+        self.classes = np.asarray(self.index.classes)
+
+    def __iter__(self) -> Iterator[T_co]:
+        shard, num_shards, client = get_worker_shard(self.client)
+        shards = shard_items(self.index.shards, shard, num_shards)
+        return self._make_sample_generator(client, shards)
+
+    def _make_sample_generator(self, client: MinioClient, shards: List[Shard]):
+        for shard in shards:
+            with client.open_file(DataDirectories.DATASETS.value, shard.name) as stream:
+                for name, data in iter_shard(stream):
+                    class_name = name.split("/", 1)[0] if "/" in name else None
+                    if self.raw:
+                        yield data, self.classes == class_name
+                    else:
+                        yield make_sample(
+                            data, self.classes, class_name, self.transform
+                        )
+
+
+class MinioShardDS(Dataset):
+    """
+    Random access to the samples of a packed dataset. The shards are downloaded into a local cache once and
+    memory mapped, samples are read from the page cache at the offsets stored in the shard index.
+    """
+
+    def __init__(
+        self,
+        client: MinioClient,
+        data_set_id: str,
+        cache_dir: str,
+        transform: Compose = None,
+        cache_size: int = CACHE_SIZE,
+        raw: bool = False,
+    ):
+        super().__init__()
+        self.data_set_id = data_set_id
+        self.minio_client = client
+        self.transform = transform
+        self.raw = raw
+        self.index = load_shard_index(client, data_set_id)
+        if not self.index:
+            raise ValueError(f"Data set {data_set_id} is not packed into shards")
+        self.classes = np.asarray(self.index.classes)
+        self.cache = ObjectCache(client, cache_dir, cache_size)
+        self.shard_files = list(shard_files(self.index))
+        self.members = [
+            (i, member)
+            for i, shard in enumerate(self.index.shards)
+            for member in shard.members
+        ]
+        self._mapped: Dict[int, MappedShard] = {}
+
+    def __getitem__(self, index) -> T_co:
+        shard_index, member = self.members[index]
+        data = self._get_shard(shard_index).read(member)
+        if self.raw:
+            # the sample must not reference the memory map once it is passed on
+            return bytes(data), self.classes == member.class_name
+        return make_sample(data, self.classes, member.class_name, self.transform)
+
+    def __len__(self):
+        return len(self.members)
+
+    def save(self) -> int:
+        """
+        Download all shards into the local cache
+        """
+        return self.cache.prefetch(DataDirectories.DATASETS.value, self.shard_files)
+
+    def _get_shard(self, shard_index: int) -> MappedShard:
+        mapped = self._mapped.get(shard_index)
+        if mapped is None:
+            path = self.cache.get_path(
+                DataDirectories.DATASETS.value, self.shard_files[shard_index]
+            )
+            mapped = self._mapped[shard_index] = MappedShard(path)
+        return mapped
+
+
+def make_sample(
+    data: Union[bytes, memoryview],
+    classes: np.ndarray,
+    class_name: Optional[str],
+    transform: Compose = None,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Decode a single sample, the pixels are converted into a float32 channels first tensor with a single copy.
+    Transforms get the decoded uint8 image in height x width x channels layout.
+    """
+    image = decode_image(data)
+    label = torch.from_numpy(classes == class_name).long()
+    if transform:
+        return transform(np.array(image)), label
+    return image_to_tensor(image), label
+
+
 if __name__ == "__main__":
     minio_client = MinioClient(
         minio_server="localhost:9000",
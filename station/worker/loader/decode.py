@@ -0,0 +1,135 @@
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+from PIL import Image
+
+# default number of threads decoding the images of a batch, pillow releases the gil while decoding
+DECODE_THREADS = 4
+
+
+def decode_image(data: Union[bytes, memoryview]) -> np.ndarray:
+    """
+    Decode an encoded image into a height x width x channels uint8 array without any conversion. The array
+    references the decoded pixels of the image and is read only.
+
+    :param data: encoded image
+    :return: uint8 array of the image
+    """
+    image = np.asarray(Image.open(BytesIO(data)))
+    if image.ndim == 2:
+        image = image[:, :, None]
+    return image
+
+
+def image_to_tensor(
+    image: np.ndarray, dtype: torch.dtype = torch.float32, scale: float = None
+) -> torch.Tensor:
+    """
+    Convert a decoded image into a channels x height x width tensor with a single conversion of the pixels
+
+    :param image: uint8 image array in height x width x channels layout
+    :param dtype: dtype of the tensor
+    :param scale: optional factor the pixel values are multiplied with, e.g. 1 / 255
+    :return: tensor of the image
+    """
+    with warnings.catch_warnings():
+        # the read only pixels are not modified, the conversion copies them
+        warnings.simplefilter("ignore", UserWarning)
+        tensor = torch.from_numpy(np.ascontiguousarray(image)).permute(2, 0, 1)
+    return _convert(tensor, dtype, scale)
+
+
+class BatchDecoder:
+    """
+    Collate function decoding the encoded images of a batch straight into a preallocated uint8 buffer. The buffer
+    is reused for batches of the same shape and converted to the target dtype and layout once per batch, the result
+    can be returned in pinned memory for fast asynchronous transfers to the gpu. Datasets yield the encoded images
+    and their labels, so the decoding runs in the dataloader workers. With worker processes, memory is pinned by
+    the pin_memory option of the dataloader instead.
+    """
+
+    def __init__(
+        self,
+        dtype: torch.dtype = torch.float32,
+        scale: float = None,
+        pin_memory: bool = False,
+        num_threads: int = DECODE_THREADS,
+    ):
+        self.dtype = dtype
+        self.scale = scale
+        self.pin_memory = pin_memory
+        self.num_threads = num_threads
+        self._buffer: Optional[np.ndarray] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __call__(
+        self, samples: Sequence[Tuple[Union[bytes, memoryview], np.ndarray]]
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        images = self.decode([data for data, _ in samples])
+        labels = torch.from_numpy(np.stack([label for _, label in samples])).long()
+        if self.pin_memory and torch.cuda.is_available():
+            return images.pin_memory(), labels.pin_memory()
+        return images, labels
+
+    def decode(self, encoded: Sequence[Union[bytes, memoryview]]) -> torch.Tensor:
+        """
+        Decode a batch of images of the same size
+
+        :param encoded: encoded images
+        :return: batch x channels x height x width tensor of the target dtype
+        """
+        first = decode_image(encoded[0])
+        buffer = self._get_buffer((len(encoded), *first.shape))
+        buffer[0] = first
+
+        def decode_into(i: int):
+            image = decode_image(encoded[i])
+            if image.shape != first.shape:
+                raise ValueError(
+                    f"Images of a batch must have the same shape, got {image.shape} and {first.shape}"
+                )
+            buffer[i] = image
+
+        if self.num_threads > 1 and len(encoded) > 2:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.num_threads, thread_name_prefix="image-decode"
+                )
+            list(self._executor.map(decode_into, range(1, len(encoded))))
+        else:
+            for i in range(1, len(encoded)):
+                decode_into(i)
+
+        tensor = torch.from_numpy(buffer).permute(0, 3, 1, 2)
+        if self.dtype == torch.uint8 and self.scale is None:
+            # the buffer is reused for the next batch
+            return tensor.contiguous().clone()
+        return _convert(tensor, self.dtype, self.scale)
+
+    def _get_buffer(self, shape: Tuple[int, ...]) -> np.ndarray:
+        if self._buffer is None or self._buffer.shape != shape:
+            self._buffer = np.empty(shape, dtype=np.uint8)
+        return self._buffer
+
+    def __getstate__(self):
+        # dataloader workers create their own buffer and threads
+        state = self.__dict__.copy()
+        state["_buffer"] = None
+        state["_executor"] = None
+        return state
+
+
+def _convert(
+    tensor: torch.Tensor, dtype: torch.dtype, scale: Optional[float]
+) -> torch.Tensor:
+    # the conversion into the target dtype and a contiguous layout is the only copy of the pixels
+    converted = tensor.to(dtype=dtype, memory_format=torch.contiguous_format)
+    if converted.data_ptr() == tensor.data_ptr():
+        converted = converted.clone()
+    if scale is not None:
+        converted.mul_(scale)
+    return converted
@@ -0,0 +1,154 @@
+import hashlib
+import importlib.util
+import marshal
+import os
+import sys
+import tempfile
+import threading
+import types
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import requests
+from loguru import logger
+
+# maximum number of imported model modules kept in memory
+MODULE_CACHE_SIZE = 32
+
+
+def source_hash(src: str) -> str:
+    return hashlib.sha256(src.encode()).hexdigest()
+
+
+class ModuleCache:
+    """
+    Content addressed cache of model source modules. Modules are keyed by the hash of their source code, so the
+    same source is only compiled and executed once per process. The compiled bytecode can additionally be stored
+    in a directory shared by several processes, which skips the compilation of sources seen by other executions.
+    """
+
+    def __init__(self, cache_dir: str = None, max_size: int = MODULE_CACHE_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._modules: "OrderedDict[str, types.ModuleType]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_module(self, src: str) -> types.ModuleType:
+        """
+        Get the module created from the given source code, the module is created if it is not cached
+
+        :param src: source code of the module
+        :return: the executed module
+        """
+        key = source_hash(src)
+        with self._lock:
+            module = self._modules.get(key)
+            if module is not None:
+                self._modules.move_to_end(key)
+                return module
+
+            module = self._make_module(key, src)
+            self._modules[key] = module
+            while len(self._modules) > self.max_size:
+                evicted, _ = self._modules.popitem(last=False)
+                sys.modules.pop(self._module_name(evicted), None)
+            return module
+
+    def clear(self):
+        with self._lock:
+            for key in self._modules:
+                sys.modules.pop(self._module_name(key), None)
+            self._modules.clear()
+
+    def _make_module(self, key: str, src: str) -> types.ModuleType:
+        name = self._module_name(key)
+        module = types.ModuleType(name)
+        module.__file__ = f"<model {key}>"
+        # classes of the module have to be importable by name, e.g. to pickle checkpoints
+        sys.modules[name] = module
+        try:
+            exec(self._get_code(key, src), module.__dict__)
+        except BaseException:
+            sys.modules.pop(name, None)
+            raise
+        return module
+
+    def _get_code(self, key: str, src: str) -> types.CodeType:
+        path = self._bytecode_path(key)
+        if path and os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    code = marshal.load(f)
+                if isinstance(code, types.CodeType):
+                    return code
+                logger.warning(f"Invalid cached bytecode {path}, recompiling")
+            except (EOFError, ValueError, TypeError) as e:
+                logger.warning(f"Invalid cached bytecode {path}, recompiling: {e}")
+
+        code = compile(src, f"<model {key}>", "exec")
+        if path:
+            # write to a temporary file first, other processes never read partial bytecode
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+            with os.fdopen(fd, "wb") as f:
+                marshal.dump(code, f)
+            os.replace(temp_path, path)
+        return code
+
+    def _bytecode_path(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        # marshalled code objects are only valid for the interpreter version that created them
+        return os.path.join(
+            self.cache_dir,
+            f"{key}.{sys.implementation.cache_tag}.{importlib.util.MAGIC_NUMBER.hex()}",
+        )
+
+    @staticmethod
+    def _module_name(key: str) -> str:
+        return f"lightning_model_{key[:16]}"
+
+
+class ETagCache:
+    """
+    Cache of json responses validated with their etag. Cached responses are revalidated with a conditional request,
+    which the server answers with 304 and an empty body if the resource did not change.
+    """
+
+    def __init__(self, session: requests.Session = None):
+        self.session = session if session else requests.Session()
+        self._responses: Dict[str, Tuple[str, dict]] = {}
+        self._lock = threading.Lock()
+
+    def get_json(self, url: str, **kwargs) -> dict:
+        """
+        Get the json content of a resource, the cached content is returned if the resource did not change
+
+        :param url: url of the resource
+        :param kwargs: additional arguments of the request
+        :return: json content of the response
+        """
+        with self._lock:
+            cached = self._responses.get(url)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
+        r = self.session.get(url=url, headers=headers, **kwargs)
+        if cached and r.status_code == 304:
+            return cached[1]
+        r.raise_for_status()
+        content = r.json()
+
+        etag = r.headers.get("ETag")
+        with self._lock:
+            if etag:
+                self._responses[url] = (etag, content)
+            else:
+                self._responses.pop(url, None)
+        return content
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
@@ -1,15 +1,18 @@
-import importlib.machinery
-import importlib.util
 import os
-import tempfile
-from typing import Any
+from typing import Any, List
 
-import requests
+import torch
 from conductor_lib.src.torch import LightningTrainModel
 from sqlalchemy.orm import Session
 
 from station.app.crud import federated_trains
 from station.common.clients.minio import MinioClient
+from station.common.clients.minio.artifacts import Checkpoint, ModelArtifactStore
+from station.worker.loader.model_cache import ETagCache, ModuleCache
+
+# modules and responses are shared by all loaders of a process, so repeated train executions reuse them
+model_modules = ModuleCache(cache_dir=os.getenv("MODEL_CACHE_DIR"))
+model_responses = ETagCache()
 
 
 class ModelLoader:
@@ -32,10 +35,7 @@ class ModelLoader:
         # Get the model from the station api
         url = self.station_url + f"/api/station/models/{model_id}"
 
-        r = requests.get(url=url)
-
-        r.raise_for_status()
-        model = r.json()
+        model = model_responses.get_json(url)
         # initialize the model based on the received src code and name
         model = self._make_lightning_module(model["model_src"], model["model_name"])
         return model
@@ -51,9 +51,50 @@ class ModelLoader:
         )
         return lightning_module
 
-    def save_model_checkpoint(self):
-        # TODO
-        pass
+    def save_model_checkpoint(
+        self, model: LightningTrainModel, train_id: str, round: int
+    ) -> Checkpoint:
+        """
+        Stream the state of a model into a versioned checkpoint of the train and round. Tensors are passed to the
+        store one at a time and tensors unchanged since the previous round are not stored again.
+
+        :param model: model to store the state of
+        :param train_id: identifier of the train
+        :param round: round of the federated training
+        :return: index of the stored checkpoint
+        """
+        tensors = (
+            (name, tensor.detach().cpu().numpy())
+            for name, tensor in model.state_dict().items()
+        )
+        return ModelArtifactStore(self.minio_client).save_checkpoint(
+            train_id, round, tensors
+        )
+
+    def load_model_checkpoint(
+        self,
+        model: LightningTrainModel,
+        train_id: str,
+        round: int = None,
+        names: List[str] = None,
+    ) -> LightningTrainModel:
+        """
+        Load the state of a model from a checkpoint, only the requested tensors are downloaded
+
+        :param model: model to load the state into
+        :param train_id: identifier of the train
+        :param round: round of the checkpoint, the latest round if None
+        :param names: names of the tensors to load, all tensors if None
+        :return: the model with the loaded state
+        """
+        tensors = ModelArtifactStore(self.minio_client).load_tensors(
+            train_id, round, names
+        )
+        model.load_state_dict(
+            {name: torch.from_numpy(array) for name, array in tensors.items()},
+            strict=names is None,
+        )
+        return model
 
     def load_torch_model_from_json(
         self, model_json: dict = None
@@ -77,30 +118,17 @@ class ModelLoader:
     @staticmethod
     def _make_lightning_module(src: str, module_name: str) -> LightningTrainModel:
         """
-        Creates a temporary python file based on the src code string submitted using a client library.
-        The lightning train model specified by module_name is imported and initialized from the created module and
-        returned as an in memory object.
+        Get the module of the submitted source code from the module cache, the source is only compiled and executed
+        the first time it is loaded.
+        The lightning train model specified by module_name is initialized from the module and returned as an in
+        memory object.
 
         :param src: String containing the source definition of the model
         :param module_name: the name of the model to be imported from src
         :return: an initialized LightningTrainModel instance based on the submitted source code
         """
-
-        # intialize a tempfile with the model source code
-        tmp_mod = tempfile.NamedTemporaryFile("w+b", suffix=".py", delete=False)
-        tmp_mod.write(src.encode())
-        tmp_mod.read()
-
-        # initialize the temp file as a python module
-        spec = importlib.util.spec_from_file_location("lightning_model", tmp_mod.name)
-        foo = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(foo)
+        module = model_modules.get_module(src)
 
         # Get the model by its name and initialize it
-        model: LightningTrainModel = foo.__getattribute__(module_name)()
-
-        # cleanup
-        tmp_mod.close()
-        os.unlink(tmp_mod.name)
-
+        model: LightningTrainModel = getattr(module, module_name)()
         return model
@@ -0,0 +1,91 @@
+import io
+import pickle
+
+import numpy as np
+import pytest
+from PIL import Image
+
+torch = pytest.importorskip("torch")
+
+from station.worker.loader.dataset import make_sample  # noqa: E402
+from station.worker.loader.decode import (  # noqa: E402
+    BatchDecoder,
+    decode_image,
+    image_to_tensor,
+)
+
+
+def encode(pixels: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def random_image(height: int = 6, width: int = 4, channels: int = 3) -> np.ndarray:
+    shape = (height, width, channels) if channels > 1 else (height, width)
+    return np.random.default_rng().integers(0, 256, shape, dtype=np.uint8)
+
+
+def test_decode_image():
+    gray = random_image(channels=1)
+    image = decode_image(encode(gray))
+    assert image.shape == (6, 4, 1)
+    assert image.dtype == np.uint8
+    np.testing.assert_array_equal(image[:, :, 0], gray)
+
+    rgb = random_image()
+    image = decode_image(memoryview(encode(rgb)))
+    assert image.shape == (6, 4, 3)
+    np.testing.assert_array_equal(image, rgb)
+
+
+def test_image_to_tensor():
+    rgb = random_image()
+    tensor = image_to_tensor(decode_image(encode(rgb)))
+    assert tensor.shape == (3, 6, 4)
+    assert tensor.dtype == torch.float32
+    assert tensor.is_contiguous()
+    np.testing.assert_array_equal(tensor.numpy(), rgb.transpose(2, 0, 1))
+
+    scaled = image_to_tensor(decode_image(encode(rgb)), scale=1 / 255)
+    assert float(scaled.max()) <= 1
+
+    image, label = make_sample(encode(rgb), np.asarray(["a", "b"]), "b")
+    assert image.shape == (3, 6, 4)
+    assert image.dtype == torch.float32
+    assert label.tolist() == [0, 1]
+
+
+@pytest.mark.parametrize("dtype", [torch.float32, torch.uint8])
+@pytest.mark.parametrize("num_threads", [1, 4])
+def test_batch_decoder_reuses_buffer(dtype, num_threads):
+    decoder = BatchDecoder(dtype=dtype, num_threads=num_threads)
+    first_pixels = [random_image() for _ in range(4)]
+    second_pixels = [random_image() for _ in range(4)]
+    label = np.asarray([True, False])
+
+    first, labels = decoder([(encode(pixels), label) for pixels in first_pixels])
+    buffer = decoder._buffer
+    second, _ = decoder([(encode(pixels), label) for pixels in second_pixels])
+
+    assert decoder._buffer is buffer
+    assert first.shape == (4, 3, 6, 4)
+    assert first.dtype == dtype
+    assert labels.tolist() == [[1, 0]] * 4
+    # the first batch is not overwritten by decoding the second one into the buffer
+    expected = np.stack(first_pixels).transpose(0, 3, 1, 2)
+    np.testing.assert_array_equal(first.numpy(), expected)
+    np.testing.assert_array_equal(
+        second.numpy(), np.stack(second_pixels).transpose(0, 3, 1, 2)
+    )
+
+    # workers get a copy without buffer and threads
+    state = pickle.loads(pickle.dumps(decoder))
+    assert state._buffer is None and state._executor is None
+
+
+def test_batch_decoder_shape_mismatch():
+    decoder = BatchDecoder(num_threads=1)
+    images = [encode(random_image()), encode(random_image(height=8))]
+    with pytest.raises(ValueError):
+        decoder.decode(images)
@@ -0,0 +1,144 @@
+import importlib.util
+import marshal
+import os
+import sys
+
+import pytest
+
+# the loader package imports the training dependencies of the worker
+pytest.importorskip("torch")
+
+from station.worker.loader import model_cache  # noqa: E402
+from station.worker.loader.model_cache import (  # noqa: E402
+    ETagCache,
+    ModuleCache,
+    source_hash,
+)
+
+
+def module_source(value: int) -> str:
+    return f"class Model:\n    value = {value}\n"
+
+
+def module_name(src: str) -> str:
+    return ModuleCache._module_name(source_hash(src))
+
+
+def test_modules_are_cached_by_source():
+    cache = ModuleCache(max_size=2)
+    first = cache.get_module(module_source(1))
+
+    assert cache.get_module(module_source(1)) is first
+    assert cache.get_module(module_source(2)) is not first
+    assert first.Model.value == 1
+    # classes of the module can be imported by name
+    assert sys.modules[first.__name__] is first
+    assert first.Model.__module__ == first.__name__
+    cache.clear()
+    assert first.__name__ not in sys.modules
+
+
+def test_least_recently_used_modules_are_evicted():
+    cache = ModuleCache(max_size=2)
+    sources = [module_source(i) for i in range(3)]
+    first, second = cache.get_module(sources[0]), cache.get_module(sources[1])
+    cache.get_module(sources[0])
+    cache.get_module(sources[2])
+
+    assert module_name(sources[1]) not in sys.modules
+    assert sys.modules[module_name(sources[0])] is first
+    assert cache.get_module(sources[0]) is first
+    assert cache.get_module(sources[1]) is not second
+    cache.clear()
+
+
+def test_failing_modules_are_not_registered():
+    cache = ModuleCache()
+    src = "raise RuntimeError('invalid model')"
+    with pytest.raises(RuntimeError):
+        cache.get_module(src)
+    assert module_name(src) not in sys.modules
+
+
+def test_bytecode_cache(tmp_path, monkeypatch):
+    src = module_source(1)
+    ModuleCache(cache_dir=str(tmp_path)).get_module(src)
+
+    # the bytecode is only valid for the interpreter version that created it
+    name = (
+        f"{source_hash(src)}.{sys.implementation.cache_tag}."
+        f"{importlib.util.MAGIC_NUMBER.hex()}"
+    )
+    assert os.listdir(tmp_path) == [name]
+
+    def compile_source(*args, **kwargs):
+        raise AssertionError("cached bytecode was not used")
+
+    with monkeypatch.context() as m:
+        m.setattr(model_cache, "compile", compile_source, raising=False)
+        module = ModuleCache(cache_dir=str(tmp_path)).get_module(src)
+    assert module.Model.value == 1
+    sys.modules.pop(module.__name__)
+
+
+@pytest.mark.parametrize("content", [b"", b"invalid bytecode"])
+def test_corrupt_bytecode_is_recompiled(tmp_path, content):
+    src = module_source(1)
+    cache = ModuleCache(cache_dir=str(tmp_path))
+    path = cache._bytecode_path(source_hash(src))
+    with open(path, "wb") as f:
+        f.write(content)
+
+    module = cache.get_module(src)
+    assert module.Model.value == 1
+    with open(path, "rb") as f:
+        assert marshal.load(f).co_filename == module.__file__
+    cache.clear()
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, content: dict = None, etag: str = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {"ETag": etag} if etag else {}
+
+    def json(self) -> dict:
+        return self.content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.headers = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.headers.append(headers)
+        return self.responses.pop(0)
+
+
+def test_etag_cache():
+    session = FakeSession(
+        [
+            FakeResponse(200, {"model": 1}, etag='"1"'),
+            FakeResponse(304),
+            FakeResponse(200, {"model": 2}),
+            FakeResponse(200, {"model": 3}, etag='"3"'),
+        ]
+    )
+    cache = ETagCache(session)
+
+    assert cache.get_json("http://api/model", headers={"Authorization": "t"}) == {
+        "model": 1
+    }
+    assert session.headers[0] == {"Authorization": "t"}
+    # the cached content is returned if the resource did not change
+    assert cache.get_json("http://api/model") == {"model": 1}
+    assert session.headers[1] == {"If-None-Match": '"1"'}
+    # responses without etag are not cached and replace the cached content
+    assert cache.get_json("http://api/model") == {"model": 2}
+    assert cache.get_json("http://api/model") == {"model": 3}
+    assert session.headers[3] == {}